@@ -0,0 +1,34 @@
+"""Add job retries and dedup keys
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'))
+    op.add_column('jobs', sa.Column('dedup_key', sa.String(255), nullable=True))
+    op.create_index(
+        'uq_jobs_pending_dedup_key',
+        'jobs',
+        ['dedup_key'],
+        unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_jobs_pending_dedup_key', table_name='jobs')
+    op.drop_column('jobs', 'dedup_key')
+    op.drop_column('jobs', 'max_attempts')
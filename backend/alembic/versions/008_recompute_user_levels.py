@@ -0,0 +1,28 @@
+"""Queue a level recompute for the formula-based XP curve
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Users capped at level 15 by the old fixed table move up once the job runner picks this up.
+    op.execute('''
+        INSERT INTO jobs (id, job_type, payload, status, attempts, max_attempts, dedup_key, run_after, created_at, updated_at)
+        VALUES (gen_random_uuid(), 'recompute_user_levels', '{}', 'pending', 0, 5, 'recompute_user_levels', now(), now(), now())
+        ON CONFLICT DO NOTHING
+    ''')
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM jobs WHERE job_type = 'recompute_user_levels' AND status = 'pending'")
@@ -0,0 +1,26 @@
+"""Add rolling conversation summary to chat sessions
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('rolling_summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summarized_message_count', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('chat_sessions', 'summarized_message_count')
+    op.drop_column('chat_sessions', 'rolling_summary')
@@ -0,0 +1,39 @@
+"""Add semantic answer cache
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from pgvector.sqlalchemy import Vector
+
+from app.config import settings
+
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cached_answers',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('query', sa.Text(), nullable=False),
+        sa.Column('query_embedding', Vector(settings.embedding_dimension), nullable=False),
+        sa.Column('context_fingerprint', sa.String(64), nullable=False),
+        sa.Column('answer', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_index('ix_cached_answers_user_fingerprint', 'cached_answers', ['user_id', 'context_fingerprint'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cached_answers_user_fingerprint', table_name='cached_answers')
+    op.drop_table('cached_answers')
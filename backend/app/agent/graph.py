@@ -1,16 +1,42 @@
-from typing import AsyncGenerator, Optional
-from groq import AsyncGroq
+from typing import AsyncGenerator, Awaitable, Callable, List, Optional
+from uuid import UUID
+import asyncio
 import logging
+import time
 
 from app.config import settings
+from app.core import tracing
+from app.core.database import read_session_maker
 from app.services.embedding import embedding_service
-from app.services.vector_search import search_by_text
+from app.services.vector_search import search_by_text, search_similar_entries
+from app.services.answer_cache import answer_cache
+from app.services.conversation_memory import MemoryState, conversation_memory
+from app.services.latency import context_latency
+from app.services.llm_gateway import LLMUnavailableError, llm_gateway
+from app.services.llm_usage import llm_usage
+from app.services.model_routing import RequestClass, model_router
+from app.services.session_cache import session_context_cache
 from app.services.token_manager import token_manager
 from app.crud.goal import goal_crud
 from app.crud.entry import entry_crud
 
 logger = logging.getLogger(__name__)
 
+MAX_HISTORY_TOKENS = 16000
+VOICE_MAX_HISTORY_TOKENS = 4000
+
+# Sent instead of an answer while the LLM provider is failing (see llm_gateway).
+UNAVAILABLE_REPLY = "I'm having trouble gathering my thoughts right now. Could you try again in a minute?"
+VOICE_UNAVAILABLE_REPLY = "Sorry, I'm having a bit of trouble right now. Could you say that again in a moment?"
+
+# Seconds each context source may take before the turn goes ahead without it.
+# Similar entries include an embeddings API call, so they get the most room.
+CONTEXT_SOURCE_TIMEOUTS = {
+    "similar_entries": 3.0,
+    "goals": 1.5,
+    "recent_entries": 1.5,
+}
+
 SYSTEM_PROMPT = """You are JournalBuddy, a thoughtful and empathetic AI journaling companion. Your role is to:
 
 1. **Understand & Reflect**: Read the user's journal entry or message carefully. Acknowledge their feelings and thoughts with genuine empathy.
@@ -67,78 +93,156 @@ Remember: Goal-focused, concise, natural. Help them reflect, then wrap up."""
 
 class JournalAgent:
     def __init__(self):
-        self.client = AsyncGroq(api_key=settings.groq_api_key)
-        self.model = settings.groq_model
+        self._client = None
 
-    async def get_context(self, db, user_id: str, user_message: str) -> dict:
-        from uuid import UUID
-        user_uuid = UUID(user_id) if isinstance(user_id, str) else user_id
+    @property
+    def client(self):
+        # Created on first use so importing the chat router doesn't load the groq SDK.
+        if self._client is None:
+            from groq import AsyncGroq
 
-        context = {
-            "similar_entries": [],
-            "goals": [],
-            "recent_entries": [],
-        }
+            # Retries are left to the LLM gateway.
+            self._client = AsyncGroq(api_key=settings.groq_api_key, base_url=settings.groq_base_url or None, max_retries=0)
+        return self._client
 
-        try:
-            context["similar_entries"] = await search_by_text(
-                db, user_message, user_id, embedding_service, limit=3
-            )
-            logger.info(f"Found {len(context['similar_entries'])} similar entries")
-        except Exception as e:
-            logger.error(f"Error fetching similar entries: {e}")
+    async def _fetch_similar_entries(
+        self,
+        user_uuid: UUID,
+        user_message: str,
+        query_embedding: Optional[List[float]] = None,
+    ) -> list:
+        async with read_session_maker(user_uuid)() as db:
+            if query_embedding is not None:
+                return await search_similar_entries(db, query_embedding, str(user_uuid), limit=3)
+            return await search_by_text(db, user_message, str(user_uuid), embedding_service, limit=3)
 
-        try:
+    async def _fetch_goals(self, user_uuid: UUID) -> list:
+        async with read_session_maker(user_uuid)() as db:
             goals = await goal_crud.get_multi(db, user_uuid, status="active")
-            context["goals"] = [
-                {"title": g.title, "description": g.description}
-                for g in goals[:5]
-            ]
-            logger.info(f"Found {len(context['goals'])} goals")
-        except Exception as e:
-            logger.error(f"Error fetching goals: {e}")
+        return [
+            {"title": g.title, "description": g.description}
+            for g in goals[:5]
+        ]
 
-        try:
+    async def _fetch_recent_entries(self, user_uuid: UUID) -> list:
+        async with read_session_maker(user_uuid)() as db:
             entries = await entry_crud.get_recent(db, user_uuid, days=7, limit=3)
-            context["recent_entries"] = [
-                {
-                    "title": e.title,
-                    "content": e.content,
-                    "mood": e.mood,
-                    "date": e.created_at.strftime("%B %d"),
-                }
-                for e in entries
-            ]
-            logger.info(f"Found {len(context['recent_entries'])} recent entries")
-        except Exception as e:
-            logger.error(f"Error fetching recent entries: {e}")
+        return [
+            {
+                "title": e.title,
+                "content": e.content,
+                "mood": e.mood,
+                "date": e.created_at.strftime("%B %d"),
+            }
+            for e in entries
+        ]
+
+    async def _timed_source(self, source: str, fetch: Callable[[], Awaitable[list]]) -> Optional[list]:
+        """Run one context source within its timeout; None if it fails or is too slow."""
+        stats = context_latency[source]
+        timeout = CONTEXT_SOURCE_TIMEOUTS[source]
+        start = time.perf_counter()
+        with tracing.span(f"context.{source}"):
+            try:
+                result = await asyncio.wait_for(fetch(), timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                tracing.set_attributes({"context.timed_out": True})
+                logger.warning(f"Context source {source} timed out after {timeout}s")
+                return None
+            except Exception as e:
+                stats.errors += 1
+                logger.error(f"Error fetching {source}: {e}")
+                return None
+            tracing.set_attributes({"context.results": len(result)})
+
+        elapsed = time.perf_counter() - start
+        stats.record(elapsed)
+        logger.info(f"Found {len(result)} {source} in {elapsed * 1000:.0f}ms")
+        return result
+
+    async def _session_source(
+        self,
+        source: str,
+        fetch: Callable[[], Awaitable[list]],
+        user_uuid: UUID,
+        session_id: Optional[UUID],
+    ) -> list:
+        """A source that doesn't depend on the message, reused across a chat session's turns."""
+        if session_id is not None:
+            cached = session_context_cache.get(session_id, source)
+            if cached is not None:
+                tracing.add_event("context.cache_hit", {"context.source": source})
+                return cached
+
+        result = await self._timed_source(source, fetch)
+        if result is None:
+            return []
+        if session_id is not None:
+            session_context_cache.set(session_id, user_uuid, source, result)
+        return result
+
+    async def get_context(
+        self,
+        user_id: str,
+        user_message: str,
+        session_id: Optional[UUID] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> dict:
+        user_uuid = UUID(user_id) if isinstance(user_id, str) else user_id
 
-        return context
+        # Each source uses its own pooled session so the embedding call and the
+        # queries overlap; TTFT pays for the slowest source, not the sum.
+        # With a session_id, goals and recent entries come from the session cache
+        # after the first turn, leaving only the vector search.
+        with tracing.span("chat.get_context", {"user.id": user_uuid, "chat.session_id": session_id}):
+            similar_entries, goals, recent_entries = await asyncio.gather(
+                self._timed_source("similar_entries", lambda: self._fetch_similar_entries(user_uuid, user_message, query_embedding)),
+                self._session_source("goals", lambda: self._fetch_goals(user_uuid), user_uuid, session_id),
+                self._session_source("recent_entries", lambda: self._fetch_recent_entries(user_uuid), user_uuid, session_id),
+            )
+            tracing.set_attributes({
+                "context.similar_entries": len(similar_entries or []),
+                "context.goals": len(goals),
+                "context.recent_entries": len(recent_entries),
+            })
+        return {
+            "similar_entries": similar_entries or [],
+            "goals": goals,
+            "recent_entries": recent_entries,
+        }
 
-    def build_context_message(
+    def build_system_message(
         self,
+        system_prompt: str,
         context: dict,
         entry_context: Optional[dict] = None,
-        chat_history_tokens: int = 0,
-        user_message_tokens: int = 0,
     ) -> str:
-        system_tokens = token_manager.count_tokens(SYSTEM_PROMPT)
-        budget = token_manager.allocate_context_budget(
-            system_prompt_tokens=system_tokens,
-            chat_history_tokens=chat_history_tokens,
-            user_message_tokens=user_message_tokens,
-        )
+        """System prompt plus the context that stays the same for the whole session.
+
+        This is the prompt prefix, so it must be byte-identical from turn to turn
+        for the provider's prompt cache to apply: it uses the fixed budgets, not
+        ones that shrink as chat history grows, and nothing retrieved per message.
+        """
+        budget = token_manager.budget
+        parts = [system_prompt]
 
-        parts = []
+        if context["goals"]:
+            goals_text = "\n".join(
+                f"- {g['title']}" + (f": {g['description']}" if g.get('description') else "")
+                for g in context["goals"]
+            )
+            truncated_goals = token_manager.fit_to_tokens(
+                goals_text, budget.goals, suffix="\n[More goals...]"
+            ).text
+            parts.append(f"User's active goals:\n{truncated_goals}")
 
         if entry_context:
-            content = entry_context.get('content', '')
-            if token_manager.count_tokens(content) > budget["entry_context"]:
-                content = token_manager.truncate_to_tokens(
-                    content,
-                    budget["entry_context"],
-                    suffix="\n[Entry truncated...]"
-                )
+            content = token_manager.fit_to_tokens(
+                entry_context.get('content', ''),
+                budget.entry_context,
+                suffix="\n[Entry truncated...]",
+            ).text
 
             entry_text = f"The user is discussing this specific journal entry:\n"
             entry_text += f"Title: {entry_context.get('title', 'Untitled')}\n"
@@ -148,15 +252,34 @@ class JournalAgent:
             entry_text += f"Content:\n{content}"
             parts.append(entry_text)
 
-        if context["goals"]:
-            goals_text = "\n".join(
-                f"- {g['title']}" + (f": {g['description']}" if g.get('description') else "")
-                for g in context["goals"]
-            )
-            truncated_goals = token_manager.truncate_to_tokens(
-                goals_text, budget["goals"], suffix="\n[More goals...]"
+        if context["recent_entries"]:
+            truncated_recent = token_manager.truncate_entries(
+                context["recent_entries"],
+                budget.recent_entries,
+                content_key="content",
             )
-            parts.append(f"User's active goals:\n{truncated_goals}")
+            if truncated_recent:
+                recent_text = "\n\n".join(
+                    f"Entry from {e['date']} (mood: {e.get('mood', 'not specified')}):\n{e['content']}"
+                    for e in truncated_recent
+                )
+                parts.append(f"Recent journal entries:\n{recent_text}")
+
+        return "\n\n".join(parts)
+
+    def build_context_message(
+        self,
+        context: dict,
+        system_tokens: int = 0,
+        chat_history_tokens: int = 0,
+        user_message_tokens: int = 0,
+    ) -> str:
+        """Context retrieved for this message; goes after the history, just before the user's message."""
+        budget = token_manager.allocate_context_budget(
+            system_prompt_tokens=system_tokens,
+            chat_history_tokens=chat_history_tokens,
+            user_message_tokens=user_message_tokens,
+        )
 
         if context["similar_entries"]:
             truncated_similar = token_manager.truncate_entries(
@@ -169,44 +292,34 @@ class JournalAgent:
                     f"Entry from {e.get('created_at', 'unknown date')[:10]}:\n{e['content']}"
                     for e in truncated_similar
                 )
-                parts.append(f"Related past journal entries:\n{entries_text}")
-
-        if context["recent_entries"]:
-            truncated_recent = token_manager.truncate_entries(
-                context["recent_entries"],
-                budget["recent_entries"],
-                content_key="content",
-            )
-            if truncated_recent:
-                recent_text = "\n\n".join(
-                    f"Entry from {e['date']} (mood: {e.get('mood', 'not specified')}):\n{e['content']}"
-                    for e in truncated_recent
-                )
-                parts.append(f"Recent journal entries:\n{recent_text}")
-
-        if parts:
-            context_msg = "Here's some context about this user:\n\n" + "\n\n".join(parts)
-            logger.info(f"Built context message: {token_manager.count_tokens(context_msg)} tokens")
-            return context_msg
+                context_msg = f"Related past journal entries for the user's next message:\n{entries_text}"
+                logger.info(f"Built context message: {token_manager.count_tokens(context_msg)} tokens")
+                return context_msg
         return ""
 
     def _build_messages(
         self,
+        system_message: str,
         context_message: str,
         chat_history: list,
         user_message: str,
-        max_history_tokens: int = 16000,
+        memory_state: Optional[MemoryState] = None,
+        max_history_tokens: int = MAX_HISTORY_TOKENS,
     ) -> list:
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        # Ordered from least to most volatile so consecutive turns share the longest prefix.
+        memory_state = memory_state or MemoryState()
+        messages = [{"role": "system", "content": system_message}]
+
+        summary = conversation_memory.summary_text(memory_state)
+        if summary:
+            messages.append({"role": "system", "content": summary})
+
+        for msg in conversation_memory.recent(chat_history, memory_state, max_history_tokens):
+            messages.append({"role": msg["role"], "content": msg["content"]})
 
         if context_message:
             messages.append({"role": "system", "content": context_message})
 
-        if chat_history:
-            truncated_history = self._truncate_chat_history(chat_history, max_history_tokens)
-            for msg in truncated_history:
-                messages.append({"role": msg["role"], "content": msg["content"]})
-
         messages.append({"role": "user", "content": user_message})
 
         total_tokens = token_manager.count_messages_tokens(messages)
@@ -214,146 +327,202 @@ class JournalAgent:
 
         return messages
 
-    def _truncate_chat_history(self, chat_history: list, max_tokens: int) -> list:
-        if not chat_history:
-            return []
+    async def _prepare_messages(
+        self,
+        system_prompt: str,
+        user_id: str,
+        user_message: str,
+        chat_history: list,
+        entry_context: Optional[dict] = None,
+        memory_state: Optional[MemoryState] = None,
+        max_history_tokens: int = MAX_HISTORY_TOKENS,
+        session_id: Optional[UUID] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> list:
+        context = await self.get_context(user_id, user_message, session_id, query_embedding)
 
-        total_tokens = 0
-        result = []
+        system_message = self.build_system_message(system_prompt, context, entry_context)
+        chat_history_tokens = conversation_memory.prompt_tokens(
+            chat_history, memory_state or MemoryState(), max_history_tokens
+        )
+        context_message = self.build_context_message(
+            context,
+            system_tokens=token_manager.count_tokens(system_message),
+            chat_history_tokens=chat_history_tokens,
+            user_message_tokens=token_manager.count_tokens(user_message),
+        )
+        return self._build_messages(
+            system_message, context_message, chat_history, user_message, memory_state, max_history_tokens
+        )
 
-        for msg in reversed(chat_history):
-            msg_tokens = token_manager.count_tokens(msg.get("content", "")) + 4
-            if total_tokens + msg_tokens > max_tokens:
-                break
-            result.insert(0, msg)
-            total_tokens += msg_tokens
+    def _chat_route(self, messages: list):
+        return model_router.route(
+            RequestClass.TEXT_CHAT,
+            prompt_tokens=token_manager.count_messages_tokens(messages),
+        )
 
-        if len(result) < len(chat_history):
-            logger.info(f"Truncated chat history from {len(chat_history)} to {len(result)} messages ({total_tokens} tokens)")
+    async def _cacheable_query(
+        self,
+        user_message: str,
+        chat_history: list,
+        memory_state: Optional[MemoryState],
+    ) -> Optional[List[float]]:
+        """Embedding of the question if its answer may come from / go to the answer cache.
+
+        Computed up front so the same vector serves both the cache lookup and the
+        similar-entries search.
+        """
+        if not answer_cache.eligible(chat_history, memory_state):
+            return None
+        try:
+            return await asyncio.wait_for(
+                embedding_service.generate_embedding(user_message),
+                CONTEXT_SOURCE_TIMEOUTS["similar_entries"],
+            )
+        except Exception as e:
+            logger.warning(f"Skipping answer cache, query embedding failed: {e!r}")
+            return None
 
-        return result
+    async def _stream(self, source: str, request_class: RequestClass, **kwargs) -> AsyncGenerator[str, None]:
+        stream = llm_gateway.stream(
+            request_class, lambda: self.client.chat.completions.create(stream=True, **kwargs)
+        )
+        async for chunk in stream:
+            # groq attaches usage to the final chunk only.
+            llm_usage.record_chunk(source, chunk)
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
 
     async def chat(
         self,
-        db,
         user_id: str,
         user_message: str,
         chat_history: list,
         entry_context: Optional[dict] = None,
+        memory_state: Optional[MemoryState] = None,
+        session_id: Optional[UUID] = None,
     ) -> str:
-        context = await self.get_context(db, user_id, user_message)
-
-        chat_history_tokens = sum(
-            token_manager.count_tokens(msg.get("content", "")) + 4
-            for msg in chat_history
-        )
-        user_message_tokens = token_manager.count_tokens(user_message)
-
-        context_message = self.build_context_message(
-            context,
+        query_embedding = await self._cacheable_query(user_message, chat_history, memory_state)
+        messages = await self._prepare_messages(
+            SYSTEM_PROMPT,
+            user_id,
+            user_message,
+            chat_history,
             entry_context,
-            chat_history_tokens=chat_history_tokens,
-            user_message_tokens=user_message_tokens,
-        )
-        messages = self._build_messages(context_message, chat_history, user_message)
-
-        completion = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=1,
-            max_tokens=8192,
-            top_p=1,
-            stream=False,
+            memory_state,
+            session_id=session_id,
+            query_embedding=query_embedding,
         )
-        return completion.choices[0].message.content
+        route = self._chat_route(messages)
+        if query_embedding is not None:
+            fingerprint = answer_cache.fingerprint(messages, route.model)
+            cached = await answer_cache.lookup(UUID(user_id), query_embedding, fingerprint)
+            if cached is not None:
+                return cached
+
+        try:
+            completion = await llm_gateway.complete(
+                RequestClass.TEXT_CHAT,
+                lambda: self.client.chat.completions.create(
+                    messages=messages,
+                    top_p=1,
+                    stream=False,
+                    **route.kwargs(),
+                ),
+            )
+        except LLMUnavailableError as e:
+            logger.error(f"Chat unavailable: {e}")
+            return UNAVAILABLE_REPLY
+        llm_usage.record_usage("chat", completion.usage)
+        content = completion.choices[0].message.content
+        if query_embedding is not None and content:
+            await answer_cache.store(UUID(user_id), user_message, query_embedding, fingerprint, content)
+        return content
 
     async def chat_stream(
         self,
-        db,
         user_id: str,
         user_message: str,
         chat_history: list,
         entry_context: Optional[dict] = None,
+        memory_state: Optional[MemoryState] = None,
+        session_id: Optional[UUID] = None,
     ) -> AsyncGenerator[str, None]:
-        context = await self.get_context(db, user_id, user_message)
-
-        chat_history_tokens = sum(
-            token_manager.count_tokens(msg.get("content", "")) + 4
-            for msg in chat_history
-        )
-        user_message_tokens = token_manager.count_tokens(user_message)
-
-        context_message = self.build_context_message(
-            context,
+        query_embedding = await self._cacheable_query(user_message, chat_history, memory_state)
+        messages = await self._prepare_messages(
+            SYSTEM_PROMPT,
+            user_id,
+            user_message,
+            chat_history,
             entry_context,
-            chat_history_tokens=chat_history_tokens,
-            user_message_tokens=user_message_tokens,
+            memory_state,
+            session_id=session_id,
+            query_embedding=query_embedding,
         )
-        logger.info(f"Context message: {token_manager.count_tokens(context_message)} tokens")
-        messages = self._build_messages(context_message, chat_history, user_message)
-
-        stream = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=1,
-            max_tokens=8192,
-            top_p=1,
-            stream=True,
-        )
-
-        async for chunk in stream:
-            content = chunk.choices[0].delta.content
-            if content:
+        route = self._chat_route(messages)
+        if query_embedding is not None:
+            fingerprint = answer_cache.fingerprint(messages, route.model)
+            cached = await answer_cache.lookup(UUID(user_id), query_embedding, fingerprint)
+            if cached is not None:
+                for piece in answer_cache.chunks(cached):
+                    yield piece
+                return
+
+        full_response = ""
+        try:
+            async for content in self._stream(
+                "chat_stream",
+                RequestClass.TEXT_CHAT,
+                messages=messages,
+                top_p=1,
+                **route.kwargs(),
+            ):
+                full_response += content
                 yield content
+        except LLMUnavailableError as e:
+            # Only raised before the first chunk, so nothing has been sent yet.
+            logger.error(f"Chat unavailable: {e}")
+            yield UNAVAILABLE_REPLY
+            return
+
+        if query_embedding is not None and full_response:
+            await answer_cache.store(UUID(user_id), user_message, query_embedding, fingerprint, full_response)
 
     async def voice_chat_stream(
         self,
-        db,
         user_id: str,
         user_message: str,
         chat_history: list,
+        memory_state: Optional[MemoryState] = None,
     ) -> AsyncGenerator[str, None]:
-        context = await self.get_context(db, user_id, user_message)
-
-        chat_history_tokens = sum(
-            token_manager.count_tokens(msg.get("content", "")) + 4
-            for msg in chat_history
-        )
-        user_message_tokens = token_manager.count_tokens(user_message)
-
-        context_message = self.build_context_message(
-            context,
-            None,
-            chat_history_tokens=chat_history_tokens,
-            user_message_tokens=user_message_tokens,
+        messages = await self._prepare_messages(
+            VOICE_SYSTEM_PROMPT,
+            user_id,
+            user_message,
+            chat_history,
+            memory_state=memory_state,
+            max_history_tokens=VOICE_MAX_HISTORY_TOKENS,
         )
 
-        messages = [{"role": "system", "content": VOICE_SYSTEM_PROMPT}]
-        if context_message:
-            messages.append({"role": "system", "content": context_message})
-
-        if chat_history:
-            truncated_history = self._truncate_chat_history(chat_history, 4000)
-            for msg in truncated_history:
-                messages.append({"role": msg["role"], "content": msg["content"]})
+        prompt_tokens = token_manager.count_messages_tokens(messages)
+        logger.info(f"Voice chat - Total tokens: {prompt_tokens}")
+        route = model_router.route(RequestClass.VOICE_TURN, prompt_tokens=prompt_tokens)
 
-        messages.append({"role": "user", "content": user_message})
-
-        logger.info(f"Voice chat - Total tokens: {token_manager.count_messages_tokens(messages)}")
-
-        stream = await self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.8,
-            max_tokens=150,
-            top_p=1,
-            stream=True,
-        )
-
-        async for chunk in stream:
-            content = chunk.choices[0].delta.content
-            if content:
+        try:
+            async for content in self._stream(
+                "voice_chat_stream",
+                RequestClass.VOICE_TURN,
+                messages=messages,
+                top_p=1,
+                **route.kwargs(),
+            ):
                 yield content
+        except LLMUnavailableError as e:
+            logger.error(f"Voice chat unavailable: {e}")
+            yield VOICE_UNAVAILABLE_REPLY
 
 
 journal_agent = JournalAgent()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# How each voice tool touches shared state:
+# - "pure":  no I/O at all, always safe to run concurrently
+# - "read":  only reads user data, safe to run concurrently
+# - "write": mutates user data, serialized in the order the model emitted them
+#            (e.g. the journal entry is saved before a later goal update)
+TOOL_SIDE_EFFECTS: Dict[str, str] = {
+    "express_emotion": "pure",
+    "end_conversation": "pure",
+    "recall_memory": "read",
+    "update_goal_progress": "write",
+    "save_session_summary": "write",
+    "create_journal_entry": "write",
+}
+
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "recall_memory": 8.0,
+    "create_journal_entry": 20.0,
+}
+
+DEFAULT_TOOL_TIMEOUT = 10.0
+
+
+@dataclass
+class ToolResult:
+    index: int
+    tool_call: dict
+    content: str
+
+    @property
+    def name(self) -> str:
+        return self.tool_call["name"]
+
+
+class ToolExecutor:
+    """Runs one model turn's tool calls, overlapping independent ones.
+
+    Pure and read tools run concurrently; write tools are serialized in the
+    order the model emitted them.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[..., Awaitable[str]]]):
+        self.handlers = handlers
+        self._write_lock = asyncio.Lock()
+
+    async def _run_one(self, index: int, tool_call: dict) -> ToolResult:
+        tool_name = tool_call["name"]
+        handler = self.handlers.get(tool_name)
+        if handler is None:
+            return ToolResult(index, tool_call, "Unknown tool")
+
+        if TOOL_SIDE_EFFECTS.get(tool_name, "write") == "write":
+            async with self._write_lock:
+                content = await self._invoke(tool_name, handler, tool_call["args"])
+        else:
+            content = await self._invoke(tool_name, handler, tool_call["args"])
+
+        return ToolResult(index, tool_call, content)
+
+    async def _invoke(
+        self,
+        tool_name: str,
+        handler: Callable[..., Awaitable[str]],
+        args: dict,
+    ) -> str:
+        timeout = TOOL_TIMEOUTS.get(tool_name, DEFAULT_TOOL_TIMEOUT)
+        try:
+            return await asyncio.wait_for(handler(**args), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {tool_name} timed out after {timeout}s")
+            return f"{tool_name} timed out"
+        except Exception as e:
+            logger.error(f"Tool {tool_name} failed: {e}", exc_info=True)
+            return f"{tool_name} failed: {e}"
+
+    async def run(self, tool_calls: List[dict]) -> AsyncGenerator[ToolResult, None]:
+        """Yield results as each tool finishes (not necessarily in call order)."""
+        # Tasks are created in call order, so writers queue on the lock in that order too.
+        tasks = [
+            asyncio.create_task(self._run_one(i, tool_call))
+            for i, tool_call in enumerate(tool_calls)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -1,22 +1,31 @@
 import json
 import logging
-from typing import Annotated, TypedDict, Literal, AsyncGenerator, List, Dict
+import re
+from typing import AsyncGenerator, List, Dict, Optional
 from uuid import UUID
 
-import tiktoken
-from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
 from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage, BaseMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage, ToolMessage, BaseMessage
 from langchain_core.tools import tool
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agent.tool_executor import ToolExecutor
 from app.config import settings
+from app.core import tracing
+from app.core.database import async_session_maker, read_session_maker
 from app.crud.goal import goal_crud
 from app.crud.chat import chat_crud
 from app.crud.entry import entry_crud
-from app.models.goal import GoalProgressUpdate
+from app.models.goal import Goal, GoalProgressUpdate
+from app.services.conversation_memory import MemoryState, conversation_memory
 from app.services.embedding import embedding_service
+from app.services.jobs import job_service, enqueue_entry_jobs
+from app.services.llm_gateway import LLMUnavailableError, llm_gateway
+from app.services.llm_usage import llm_usage
+from app.services.model_routing import RequestClass, model_router
+from app.services.message_buffer import MessageWriteBuffer
+from app.services.rate_limiter import Priority
+from app.services.token_manager import token_manager
 from app.services.vector_search import search_by_text
 
 logger = logging.getLogger(__name__)
@@ -25,70 +34,53 @@ MAX_CONTEXT_TOKENS = 64000
 RESPONSE_RESERVE_TOKENS = 1000
 
 
-class ConversationMemory:
-    def __init__(self, max_tokens: int = MAX_CONTEXT_TOKENS):
-        self.max_tokens = max_tokens
-        try:
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
-        except Exception:
-            self.tokenizer = tiktoken.get_encoding("gpt2")
-
-    def count_tokens(self, text: str) -> int:
-        if not text:
-            return 0
-        return len(self.tokenizer.encode(text))
-
-    def count_message_tokens(self, message: BaseMessage) -> int:
-        content = message.content if isinstance(message.content, str) else str(message.content)
-        tokens = self.count_tokens(content) + 4
-        if hasattr(message, 'tool_calls') and message.tool_calls:
-            tokens += 50
-        return tokens
-
-    def trim_messages_to_fit(
-        self,
-        system_messages: List[BaseMessage],
-        chat_history: List[Dict],
-        current_message: str,
-        reserve_tokens: int = RESPONSE_RESERVE_TOKENS
-    ) -> List[BaseMessage]:
-        available_tokens = self.max_tokens - reserve_tokens
-
-        system_tokens = sum(self.count_message_tokens(m) for m in system_messages)
-        current_msg_tokens = self.count_tokens(current_message) + 4
-
-        remaining_tokens = available_tokens - system_tokens - current_msg_tokens
+def _count_message_tokens(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    tokens = token_manager.count_tokens(content) + 4
+    if hasattr(message, 'tool_calls') and message.tool_calls:
+        tokens += 50
+    return tokens
 
-        if remaining_tokens <= 0:
-            logger.warning(f"System prompt too large: {system_tokens} tokens, available: {available_tokens}")
-            return system_messages + [HumanMessage(content=current_message)]
 
-        history_messages = []
-        total_history_tokens = 0
+def build_voice_messages(
+    system_messages: List[BaseMessage],
+    chat_history: List[Dict],
+    current_message: str,
+    memory_state: MemoryState,
+    reserve_tokens: int = RESPONSE_RESERVE_TOKENS,
+    context_messages: Optional[List[BaseMessage]] = None,
+) -> List[BaseMessage]:
+    """System prompt, rolling summary, recent turns, per-turn context and the new message, within MAX_CONTEXT_TOKENS.
 
-        for msg in reversed(chat_history):
-            content = msg.get("content", "")
-            role = msg.get("role", "user")
-            msg_tokens = self.count_tokens(content) + 4
+    Ordered from least to most volatile so consecutive turns share the longest
+    prompt prefix; ``context_messages`` (retrieved for this message) go last.
+    """
+    available_tokens = MAX_CONTEXT_TOKENS - reserve_tokens
+    context_messages = context_messages or []
 
-            if total_history_tokens + msg_tokens > remaining_tokens:
-                break
-
-            if role == "user":
-                history_messages.insert(0, HumanMessage(content=content))
-            else:
-                history_messages.insert(0, AIMessage(content=content))
+    summary = conversation_memory.summary_text(memory_state)
+    if summary:
+        system_messages = system_messages + [SystemMessage(content=summary)]
 
-            total_history_tokens += msg_tokens
+    system_tokens = sum(_count_message_tokens(m) for m in system_messages + context_messages)
+    current_msg_tokens = token_manager.count_tokens(current_message) + 4
+    remaining_tokens = available_tokens - system_tokens - current_msg_tokens
 
-        logger.info(f"Token-based memory: {len(chat_history)} msgs -> {len(history_messages)} kept. "
-                   f"Tokens: system={system_tokens}, history={total_history_tokens}, "
-                   f"current={current_msg_tokens}, total={system_tokens + total_history_tokens + current_msg_tokens}/{available_tokens}")
+    if remaining_tokens <= 0:
+        logger.warning(f"System prompt too large: {system_tokens} tokens, available: {available_tokens}")
+        return system_messages + context_messages + [HumanMessage(content=current_message)]
 
-        return system_messages + history_messages + [HumanMessage(content=current_message)]
+    recent = conversation_memory.recent(chat_history, memory_state, remaining_tokens)
+    history_messages = [
+        HumanMessage(content=msg.get("content", "")) if msg.get("role", "user") == "user"
+        else AIMessage(content=msg.get("content", ""))
+        for msg in recent
+    ]
 
+    logger.info(f"Conversation memory: {len(chat_history)} msgs -> summary of {memory_state.summarized_count} "
+                f"+ {len(history_messages)} recent. Tokens: system={system_tokens}, current={current_msg_tokens}")
 
-conversation_memory = ConversationMemory()
+    return system_messages + history_messages + context_messages + [HumanMessage(content=current_message)]
 
 VOICE_SYSTEM_PROMPT = """You are JournalBuddy - a thoughtful friend who helps people reflect on their day through natural conversation.
 
@@ -195,26 +187,25 @@ This is their evening reflection - a moment to process the day.
 - Help them reflect on what happened and how they're feeling"""
 
 
-class AgentState(TypedDict):
-    messages: Annotated[list, add_messages]
-    user_id: str
-    session_id: str
-    goals: list
-    context: str
-    should_end: bool
-    summary_saved: bool
-
-
 class VoiceAgentTools:
-    def __init__(self, db: AsyncSession, user_id: str, session_id: str, journal_type: str = None):
-        self.db = db
+    def __init__(
+        self,
+        user_id: str,
+        session_id: str,
+        journal_type: str = None,
+        message_buffer: Optional[MessageWriteBuffer] = None,
+    ):
         self.user_id = UUID(user_id)
         self.session_id = UUID(session_id) if session_id else None
         self.journal_type = journal_type
+        self.message_buffer = message_buffer
         self._goals_cache = {}
 
-    async def load_goals(self):
-        goals = await goal_crud.get_multi(self.db, self.user_id, status="active")
+    # Each tool checks out its own short-lived session, so a voice conversation only
+    # holds a pooled connection while a query is actually running.
+
+    async def load_goals(self, db: AsyncSession):
+        goals = await goal_crud.get_multi(db, self.user_id, status="active")
         self._goals_cache = {str(g.id): g for g in goals}
         return [{"id": str(g.id), "title": g.title, "progress": g.progress} for g in goals]
 
@@ -231,18 +222,24 @@ class VoiceAgentTools:
         if new_progress < 0 or new_progress > 100:
             return "Progress must be between 0 and 100"
 
-        previous_progress = goal.progress
-        goal.progress = new_progress
+        async with async_session_maker() as db:
+            goal = await db.get(Goal, goal.id)
+            if not goal:
+                return f"Could not find goal matching '{goal_title}'"
 
-        progress_update = GoalProgressUpdate(
-            goal_id=goal.id,
-            session_id=self.session_id,
-            previous_progress=previous_progress,
-            new_progress=new_progress,
-            notes=notes,
-        )
-        self.db.add(progress_update)
-        await self.db.commit()
+            previous_progress = goal.progress
+            goal.progress = new_progress
+
+            progress_update = GoalProgressUpdate(
+                goal_id=goal.id,
+                session_id=self.session_id,
+                previous_progress=previous_progress,
+                new_progress=new_progress,
+                notes=notes,
+            )
+            db.add(progress_update)
+            await db.commit()
+        self._goals_cache[str(goal.id)] = goal
 
         logger.info(f"Updated goal '{goal.title}' progress: {previous_progress}% -> {new_progress}%")
         return f"Updated '{goal.title}' progress from {previous_progress}% to {new_progress}%"
@@ -251,15 +248,11 @@ class VoiceAgentTools:
         if not self.session_id:
             return "No session to save"
 
-        session = await self.db.get(
-            __import__('app.models.chat', fromlist=['ChatSession']).ChatSession,
-            self.session_id
-        )
+        async with async_session_maker() as db:
+            session = await chat_crud.update_session_summary(
+                db, self.session_id, summary, key_topics, goal_updates
+            )
         if session:
-            session.summary = summary
-            session.key_topics = key_topics
-            session.goal_updates = goal_updates
-            await self.db.commit()
             logger.info(f"Saved session summary for {self.session_id}")
             return "Session summary saved"
         return "Session not found"
@@ -276,9 +269,10 @@ class VoiceAgentTools:
 
     async def recall_memory(self, query: str) -> str:
         try:
-            similar_entries = await search_by_text(
-                self.db, query, str(self.user_id), embedding_service, limit=3
-            )
+            async with read_session_maker(self.user_id)() as db:
+                similar_entries = await search_by_text(
+                    db, query, str(self.user_id), embedding_service, limit=3, priority=Priority.VOICE
+                )
             if not similar_entries:
                 return "No relevant past entries found."
 
@@ -298,9 +292,7 @@ class VoiceAgentTools:
 
     async def create_journal_entry(self, title: str, content: str, mood: str) -> str:
         from app.schemas.entry import EntryCreate
-        from app.services.gamification import gamification_service
-        from app.services.embedding import embedding_service
-        from app.models.chat import ChatSession, ChatMessage
+        from app.models.chat import ChatMessage
         from sqlalchemy import select
 
         valid_moods = ["great", "good", "okay", "bad", "terrible"]
@@ -309,87 +301,78 @@ class VoiceAgentTools:
 
         transcript = None
         logger.info(f"create_journal_entry called. session_id={self.session_id}")
-        if self.session_id:
-            try:
-                result = await self.db.execute(
-                    select(ChatMessage)
-                    .where(ChatMessage.session_id == self.session_id)
-                    .order_by(ChatMessage.created_at)
-                )
-                messages = result.scalars().all()
-                logger.info(f"Found {len(messages)} messages for session {self.session_id}")
-                if messages:
-                    transcript_lines = []
-                    for msg in messages:
-                        speaker = "You" if msg.role == "user" else "JournalBuddy"
-                        transcript_lines.append(f"{speaker}: {msg.content}")
-                    transcript = "\n\n".join(transcript_lines)
-                    logger.info(f"Built transcript with {len(messages)} messages, length={len(transcript)}")
-                else:
-                    logger.warning(f"No messages found for session {self.session_id}")
-            except Exception as e:
-                logger.error(f"Failed to build transcript: {e}", exc_info=True)
-        else:
-            logger.warning("No session_id available, cannot build transcript")
-
-        entry_data = EntryCreate(
-            title=title,
-            content=content,
-            transcript=transcript,
-            mood=mood.lower(),
-            journal_type=self.journal_type,
-        )
-
-        try:
-            entry = await entry_crud.create(self.db, entry_data, self.user_id)
-            logger.info(f"Created journal entry: {entry.id} with title '{title}'")
-
-            if self.journal_type == "morning":
-                await gamification_service.award_xp(self.db, self.user_id, "morning_journal", entry.id)
-            elif self.journal_type == "evening":
-                await gamification_service.award_xp(self.db, self.user_id, "evening_journal", entry.id)
+        if self.message_buffer:
+            # Buffered messages must be in the table before the transcript is built from it.
+            await self.message_buffer.flush()
+
+        async with async_session_maker() as db:
+            if self.session_id:
+                try:
+                    result = await db.execute(
+                        select(ChatMessage)
+                        .where(ChatMessage.session_id == self.session_id)
+                        .order_by(ChatMessage.created_at)
+                    )
+                    messages = result.scalars().all()
+                    logger.info(f"Found {len(messages)} messages for session {self.session_id}")
+                    if messages:
+                        transcript_lines = []
+                        for msg in messages:
+                            speaker = "You" if msg.role == "user" else "JournalBuddy"
+                            transcript_lines.append(f"{speaker}: {msg.content}")
+                        transcript = "\n\n".join(transcript_lines)
+                        logger.info(f"Built transcript with {len(messages)} messages, length={len(transcript)}")
+                    else:
+                        logger.warning(f"No messages found for session {self.session_id}")
+                except Exception as e:
+                    logger.error(f"Failed to build transcript: {e}", exc_info=True)
             else:
-                await gamification_service.award_xp(self.db, self.user_id, "entry_created", entry.id)
-
-            await gamification_service.check_achievements(self.db, self.user_id)
-            logger.info(f"Awarded XP for voice journal entry: {entry.id}")
+                logger.warning("No session_id available, cannot build transcript")
+
+            entry_data = EntryCreate(
+                title=title,
+                content=content,
+                transcript=transcript,
+                mood=mood.lower(),
+                journal_type=self.journal_type,
+            )
 
             try:
-                embedding = await embedding_service.generate_embedding(content)
-                entry.embedding = embedding
-                await self.db.commit()
-                logger.info(f"Generated embedding for voice journal entry: {entry.id}")
-            except Exception as embed_err:
-                logger.error(f"Failed to generate embedding: {embed_err}")
-
-            return f"Journal entry created: '{title}'"
-        except Exception as e:
-            logger.error(f"Failed to create journal entry: {e}")
-            return f"Failed to create journal entry: {e}"
+                entry = await entry_crud.create(db, entry_data, self.user_id, commit=False)
+                # XP, achievements and the embedding run after commit so the farewell isn't held up.
+                await enqueue_entry_jobs(db, entry)
+                await db.commit()
+                job_service.notify()
+                logger.info(f"Created journal entry: {entry.id} with title '{title}'")
+
+                return f"Journal entry created: '{title}'"
+            except Exception as e:
+                logger.error(f"Failed to create journal entry: {e}")
+                return f"Failed to create journal entry: {e}"
 
 
 class VoiceAgent:
     def __init__(self):
         self.llm = ChatGroq(
             api_key=settings.groq_api_key,
-            model=settings.groq_model,
-            temperature=0.8,
-            max_tokens=200,
+            base_url=settings.groq_base_url or None,
+            max_retries=0,
+            **model_router.route(RequestClass.VOICE_TURN).kwargs(),
         )
 
-    async def get_context(self, db: AsyncSession, user_id: str, user_message: str) -> tuple[list, str]:
+    async def get_context(self, db: AsyncSession, user_id: str, user_message: str) -> tuple[list, str, str]:
+        """Active goals, the goals section for the system prompt, and entries retrieved for this message."""
         user_uuid = UUID(user_id)
 
-        goals = await goal_crud.get_multi(db, user_uuid, status="active")
-        goals_list = [{"id": str(g.id), "title": g.title, "progress": g.progress, "description": g.description} for g in goals[:5]]
-
-        context_parts = []
-        if goals_list:
-            goals_text = "\n".join(f"- {g['title']} ({g['progress']}% complete)" for g in goals_list)
-            context_parts.append(f"User's active goals:\n{goals_text}")
-
+        # Similar entries first: the embedding call then runs before this session
+        # has checked out a connection, so none is held idle during it.
+        entries_part = ""
         try:
-            similar_entries = await search_by_text(db, user_message, user_id, embedding_service, limit=3)
+            with tracing.span("voice.similar_entries"):
+                similar_entries = await search_by_text(
+                    db, user_message, user_id, embedding_service, limit=3, priority=Priority.VOICE
+                )
+                tracing.set_attributes({"context.results": len(similar_entries)})
             if similar_entries:
                 entries_text = []
                 for e in similar_entries:
@@ -400,12 +383,23 @@ class VoiceAgent:
                     mood_str = f" (feeling {mood})" if mood else ""
                     entries_text.append(f"- [{date}] {title}{mood_str}: {content}...")
 
-                context_parts.append(f"Relevant past entries:\n" + "\n".join(entries_text))
+                entries_part = f"Relevant past entries:\n" + "\n".join(entries_text)
                 logger.info(f"Proactive memory: found {len(similar_entries)} similar entries")
         except Exception as e:
             logger.error(f"Error fetching similar entries: {e}")
+            await db.rollback()
+
+        with tracing.span("voice.goals"):
+            goals = await goal_crud.get_multi(db, user_uuid, status="active")
+            tracing.set_attributes({"context.results": len(goals)})
+        goals_list = [{"id": str(g.id), "title": g.title, "progress": g.progress, "description": g.description} for g in goals[:5]]
+
+        goals_part = ""
+        if goals_list:
+            goals_text = "\n".join(f"- {g['title']} ({g['progress']}% complete)" for g in goals_list)
+            goals_part = f"User's active goals:\n{goals_text}"
 
-        return goals_list, "\n\n".join(context_parts)
+        return goals_list, goals_part, entries_part
 
     def _create_tools(self, tool_handler: VoiceAgentTools, is_journal: bool = False):
         @tool
@@ -487,20 +481,33 @@ class VoiceAgent:
 
     async def chat_stream(
         self,
-        db: AsyncSession,
         user_id: str,
         session_id: str,
         user_message: str,
         chat_history: list,
         journal_type: str = None,
+        message_buffer: Optional[MessageWriteBuffer] = None,
+        memory_state: Optional[MemoryState] = None,
     ) -> AsyncGenerator[str, None]:
         is_journal = journal_type in ["morning", "evening"]
-        tool_handler = VoiceAgentTools(db, user_id, session_id, journal_type=journal_type)
-        await tool_handler.load_goals()
-
-        goals, context = await self.get_context(db, user_id, user_message)
+        tool_handler = VoiceAgentTools(
+            user_id, session_id, journal_type=journal_type, message_buffer=message_buffer
+        )
+        async with read_session_maker(user_id)() as db:
+            goals, goals_context, retrieved_context = await self.get_context(db, user_id, user_message)
+            await tool_handler.load_goals(db)
         tools = self._create_tools(tool_handler, is_journal=is_journal)
         llm_with_tools = self.llm.bind_tools(tools, tool_choice="auto")
+        tool_executor = ToolExecutor(
+            {
+                "update_goal_progress": tool_handler.update_goal_progress,
+                "save_session_summary": tool_handler.save_session_summary,
+                "create_journal_entry": tool_handler.create_journal_entry,
+                "recall_memory": tool_handler.recall_memory,
+                "express_emotion": tool_handler.express_emotion,
+                "end_conversation": tool_handler.end_conversation,
+            },
+        )
 
         if is_journal:
             guidance = MORNING_GUIDANCE if journal_type == "morning" else EVENING_GUIDANCE
@@ -511,36 +518,76 @@ class VoiceAgent:
         else:
             system_prompt = VOICE_SYSTEM_PROMPT
 
-        system_messages = [SystemMessage(content=system_prompt)]
-        if context and not is_journal:
-            system_messages.append(SystemMessage(content=f"Context about this user:\n{context}"))
-
-        messages = conversation_memory.trim_messages_to_fit(
-            system_messages=system_messages,
-            chat_history=chat_history,
-            current_message=user_message
+        # Goals change rarely and belong to the cacheable prefix; retrieved entries
+        # differ every turn, so they go right before the user's message.
+        context_messages = []
+        if goals_context and not is_journal:
+            system_prompt += f"\n\nContext about this user:\n{goals_context}"
+        if retrieved_context and not is_journal:
+            context_messages.append(SystemMessage(content=f"Context for the user's next message:\n{retrieved_context}"))
+
+        messages = build_voice_messages(
+            [SystemMessage(content=system_prompt)],
+            chat_history,
+            user_message,
+            memory_state or MemoryState(),
+            context_messages=context_messages,
         )
 
         max_iterations = 5
         for iteration in range(max_iterations):
+            response = None
+            held_text = ""
+            streamed_text = False
             try:
-                logger.info(f"Sending to LLM (iteration {iteration}), message count: {len(messages)}")
-                response = await llm_with_tools.ainvoke(messages)
+                logger.info(f"Streaming from LLM (iteration {iteration}), message count: {len(messages)}")
+                stream = llm_gateway.stream(RequestClass.VOICE_TURN, lambda: llm_with_tools.astream(messages))
+                async for chunk in stream:
+                    response = chunk if response is None else response + chunk
+                    delta = chunk.content if isinstance(chunk.content, str) else ""
+                    if not delta:
+                        continue
+
+                    # Hold back everything from the first brace onwards so a raw JSON
+                    # tool call emitted as text (model misbehavior) is never spoken.
+                    if held_text:
+                        held_text += delta
+                        continue
+                    brace = delta.find("{")
+                    if brace != -1:
+                        delta, held_text = delta[:brace], delta[brace:]
+
+                    if delta:
+                        streamed_text = True
+                        yield delta
+
+                if response is None:
+                    response = AIMessageChunk(content="")
+                llm_usage.record_usage_metadata("voice_agent", response.usage_metadata)
                 logger.info(f"LLM response: content_len={len(response.content) if response.content else 0}, tool_calls={len(response.tool_calls) if response.tool_calls else 0}")
+            except LLMUnavailableError as e:
+                # The gateway already retried (or the circuit is open); don't make them wait longer.
+                logger.error(f"LLM unavailable on iteration {iteration}: {e}")
+                if not streamed_text:
+                    yield "Sorry, I'm having a bit of trouble right now. Could you say that again in a moment?"
+                return
             except Exception as e:
+                # Failed mid-stream, which the gateway can't retry.
                 logger.error(f"LLM error on iteration {iteration}: {e}", exc_info=True)
+                if streamed_text:
+                    # Part of the reply has already been spoken; retrying would repeat it.
+                    return
                 if iteration < max_iterations - 1:
                     continue
                 yield "I'm here listening. Could you tell me more?"
                 return
 
             if not response.tool_calls:
-                content = response.content.strip() if response.content else ""
+                content = held_text.strip()
 
                 if content:
                     # Check if LLM output raw JSON tool call (model misbehavior)
                     # Pattern: {"farewell_message":"..."} or {"title":"...", "content":"..."}
-                    import re
                     json_match = re.search(r'\{["\'](?:farewell_message|title)["\']:', content)
                     if json_match:
                         # Extract JSON and remaining text
@@ -592,7 +639,7 @@ class VoiceAgent:
                             yield content
                     else:
                         yield content
-                else:
+                elif not streamed_text:
                     logger.warning(f"LLM returned empty response on iteration {iteration}, user_message was: {user_message[:50]}")
                     if iteration == 0:
                         if is_journal:
@@ -605,39 +652,28 @@ class VoiceAgent:
             farewell_message = ""
 
             for tool_call in response.tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["args"]
-
-                logger.info(f"Tool call: {tool_name} with args: {tool_args}")
-
-                yield f"__TOOL_START:{tool_name}__"
-
-                if tool_name == "update_goal_progress":
-                    result = await tool_handler.update_goal_progress(**tool_args)
-                elif tool_name == "save_session_summary":
-                    result = await tool_handler.save_session_summary(**tool_args)
-                elif tool_name == "create_journal_entry":
-                    result = await tool_handler.create_journal_entry(**tool_args)
-                elif tool_name == "recall_memory":
-                    result = await tool_handler.recall_memory(**tool_args)
-                elif tool_name == "express_emotion":
-                    result = await tool_handler.express_emotion(**tool_args)
-                    if result.startswith("EMOTION:"):
-                        emotion = result.replace("EMOTION:", "")
-                        yield f"__EMOTION:{emotion}__"
-                        result = f"Showing {emotion} expression"
-                elif tool_name == "end_conversation":
-                    result = await tool_handler.end_conversation(**tool_args)
-                    if result.startswith("END_CONVERSATION:"):
-                        end_conversation_called = True
-                        farewell_message = result.replace("END_CONVERSATION:", "")
-                        result = "Conversation ended"
-                else:
-                    result = "Unknown tool"
+                logger.info(f"Tool call: {tool_call['name']} with args: {tool_call['args']}")
+                yield f"__TOOL_START:{tool_call['name']}__"
+
+            results: List[str] = [""] * len(response.tool_calls)
+            async for tool_result in tool_executor.run(response.tool_calls):
+                tool_name = tool_result.name
+                result = tool_result.content
+
+                if tool_name == "express_emotion" and result.startswith("EMOTION:"):
+                    emotion = result.replace("EMOTION:", "")
+                    yield f"__EMOTION:{emotion}__"
+                    result = f"Showing {emotion} expression"
+                elif tool_name == "end_conversation" and result.startswith("END_CONVERSATION:"):
+                    end_conversation_called = True
+                    farewell_message = result.replace("END_CONVERSATION:", "")
+                    result = "Conversation ended"
 
                 yield f"__TOOL_DONE:{tool_name}__"
+                results[tool_result.index] = result
 
-                messages.append(AIMessage(content=response.content or "", tool_calls=[tool_call]))
+            messages.append(AIMessage(content=response.content or "", tool_calls=response.tool_calls))
+            for tool_call, result in zip(response.tool_calls, results):
                 messages.append(ToolMessage(content=result, tool_call_id=tool_call["id"]))
 
             if end_conversation_called:
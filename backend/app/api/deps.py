@@ -5,7 +5,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, read_session_maker
 from app.core.security import decode_token
 from app.crud.user import user_crud
 from app.models.user import User
@@ -13,36 +13,71 @@ from app.models.user import User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    token: Annotated[str, Depends(oauth2_scheme)],
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _token_user_id(token: str) -> UUID:
     payload = decode_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     user_id = payload.get("sub")
     token_type = payload.get("type")
 
     if user_id is None or token_type != "access":
-        raise credentials_exception
+        raise _credentials_exception()
 
     try:
-        user = await user_crud.get_by_id(db, UUID(user_id))
+        return UUID(user_id)
     except ValueError:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    if user is None:
-        raise credentials_exception
 
+async def _load_user(db: AsyncSession, user_id: UUID) -> User:
+    user = await user_crud.get_by_id(db, user_id)
+    if user is None:
+        raise _credentials_exception()
     return user
 
 
+async def get_current_user(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> User:
+    return await _load_user(db, _token_user_id(token))
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 Database = Annotated[AsyncSession, Depends(get_db)]
+
+
+async def _read_session(token: Annotated[str, Depends(oauth2_scheme)]):
+    # Opened once per request and shared by ReadUser and ReadDatabase.
+    async with read_session_maker(_token_user_id(token))() as session:
+        yield session
+
+
+async def get_read_user(
+    db: Annotated[AsyncSession, Depends(_read_session)],
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> User:
+    """The current user, loaded on the read session so read-only routes never touch the primary."""
+    return await _load_user(db, _token_user_id(token))
+
+
+ReadUser = Annotated[User, Depends(get_read_user)]
+
+
+async def get_read_db(
+    current_user: ReadUser,
+    db: Annotated[AsyncSession, Depends(_read_session)],
+) -> AsyncSession:
+    return db
+
+
+ReadDatabase = Annotated[AsyncSession, Depends(get_read_db)]
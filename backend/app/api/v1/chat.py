@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 import json
 
@@ -12,10 +12,60 @@ from app.models.chat import ChatSession, ChatMessage
 from app.models.entry import Entry
 from app.schemas.chat import ChatSessionCreate, ChatSessionResponse, ChatMessageCreate, ChatMessageResponse, VoiceSessionResponse
 from app.agent.graph import journal_agent
+from app.services.conversation_memory import MemoryState, conversation_memory, memory_state_for
+from app.services.jobs import job_service, enqueue_session_summary
+from app.services.session_cache import session_context_cache
+from app.services.token_manager import token_manager
 
 router = APIRouter()
 
 
+async def _load_memory(db, session: ChatSession) -> Tuple[List[dict], MemoryState]:
+    """Load only the messages not yet folded into the session's rolling summary."""
+    state = memory_state_for(session)
+    result = await db.execute(
+        select(ChatMessage.role, ChatMessage.content, ChatMessage.token_count)
+        .where(ChatMessage.session_id == session.id)
+        .order_by(ChatMessage.created_at)
+        .offset(state.summarized_count)
+    )
+    chat_history = [
+        {"role": role, "content": content, "token_count": token_count}
+        for role, content, token_count in result.all()
+    ]
+    # Indexes in the returned history start after the summarized messages.
+    return chat_history, MemoryState(summary=state.summary, summarized_count=0)
+
+
+async def _entry_context(db, session: ChatSession) -> Optional[dict]:
+    """The entry a session discusses, cached for the session's later messages."""
+    if not session.entry_id:
+        return None
+    entry_context = session_context_cache.get(session.id, "entry_context")
+    if entry_context is not None:
+        return entry_context
+
+    entry_result = await db.execute(
+        select(Entry).where(Entry.id == session.entry_id)
+    )
+    entry = entry_result.scalar_one_or_none()
+    if not entry:
+        return None
+    entry_context = {
+        "title": entry.title,
+        "content": entry.content,
+        "mood": entry.mood,
+        "created_at": entry.created_at.strftime("%B %d, %Y"),
+    }
+    session_context_cache.set(session.id, session.user_id, "entry_context", entry_context)
+    return entry_context
+
+
+async def _queue_summary_if_needed(db, session: ChatSession, chat_history: List[dict], state: MemoryState) -> None:
+    if conversation_memory.needs_summary(chat_history, state):
+        await enqueue_session_summary(db, session)
+
+
 @router.get("/sessions", response_model=List[ChatSessionResponse])
 async def list_chat_sessions(
     current_user: CurrentUser,
@@ -130,6 +180,7 @@ async def delete_chat_session(
 
     await db.delete(session)
     await db.commit()
+    session_context_cache.invalidate_session(session_id)
     return {"success": True}
 
 
@@ -143,7 +194,6 @@ async def send_message(
     result = await db.execute(
         select(ChatSession)
         .where(ChatSession.id == session_id, ChatSession.user_id == current_user.id)
-        .options(selectinload(ChatSession.messages))
     )
     session = result.scalar_one_or_none()
 
@@ -153,42 +203,29 @@ async def send_message(
             detail="Chat session not found",
         )
 
+    chat_history, memory_state = await _load_memory(db, session)
+
     user_message = ChatMessage(
         session_id=session_id,
         role="user",
         content=message_in.content,
+        token_count=token_manager.count_tokens(message_in.content),
     )
     db.add(user_message)
     await db.commit()
 
-    chat_history = [
-        {"role": msg.role, "content": msg.content}
-        for msg in session.messages
-    ]
-
-    entry_context = None
-    if session.entry_id:
-        entry_result = await db.execute(
-            select(Entry).where(Entry.id == session.entry_id)
-        )
-        entry = entry_result.scalar_one_or_none()
-        if entry:
-            entry_context = {
-                "title": entry.title,
-                "content": entry.content,
-                "mood": entry.mood,
-                "created_at": entry.created_at.strftime("%B %d, %Y"),
-            }
+    entry_context = await _entry_context(db, session)
 
     async def generate():
         full_response = ""
         try:
             async for chunk in journal_agent.chat_stream(
-                db,
                 str(current_user.id),
                 message_in.content,
                 chat_history,
                 entry_context=entry_context,
+                memory_state=memory_state,
+                session_id=session_id,
             ):
                 full_response += chunk
                 yield f"data: {json.dumps({'content': chunk})}\n\n"
@@ -197,9 +234,15 @@ async def send_message(
                 session_id=session_id,
                 role="assistant",
                 content=full_response,
+                token_count=token_manager.count_tokens(full_response),
             )
             db.add(assistant_message)
+            await _queue_summary_if_needed(db, session, chat_history + [
+                {"role": "user", "content": message_in.content},
+                {"role": "assistant", "content": full_response},
+            ], memory_state)
             await db.commit()
+            job_service.notify()
 
             yield f"data: {json.dumps({'done': True})}\n\n"
 
@@ -226,7 +269,6 @@ async def send_message_sync(
     result = await db.execute(
         select(ChatSession)
         .where(ChatSession.id == session_id, ChatSession.user_id == current_user.id)
-        .options(selectinload(ChatSession.messages))
     )
     session = result.scalar_one_or_none()
 
@@ -236,48 +278,41 @@ async def send_message_sync(
             detail="Chat session not found",
         )
 
+    chat_history, memory_state = await _load_memory(db, session)
+
     user_message = ChatMessage(
         session_id=session_id,
         role="user",
         content=message_in.content,
+        token_count=token_manager.count_tokens(message_in.content),
     )
     db.add(user_message)
     await db.commit()
 
-    chat_history = [
-        {"role": msg.role, "content": msg.content}
-        for msg in session.messages
-    ]
-
-    entry_context = None
-    if session.entry_id:
-        entry_result = await db.execute(
-            select(Entry).where(Entry.id == session.entry_id)
-        )
-        entry = entry_result.scalar_one_or_none()
-        if entry:
-            entry_context = {
-                "title": entry.title,
-                "content": entry.content,
-                "mood": entry.mood,
-                "created_at": entry.created_at.strftime("%B %d, %Y"),
-            }
+    entry_context = await _entry_context(db, session)
 
     response_content = await journal_agent.chat(
-        db,
         str(current_user.id),
         message_in.content,
         chat_history,
         entry_context=entry_context,
+        memory_state=memory_state,
+        session_id=session_id,
     )
 
     assistant_message = ChatMessage(
         session_id=session_id,
         role="assistant",
         content=response_content,
+        token_count=token_manager.count_tokens(response_content),
     )
     db.add(assistant_message)
+    await _queue_summary_if_needed(db, session, chat_history + [
+        {"role": "user", "content": message_in.content},
+        {"role": "assistant", "content": response_content},
+    ], memory_state)
     await db.commit()
+    job_service.notify()
     await db.refresh(assistant_message)
 
     return assistant_message
@@ -1,21 +1,26 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 import logging
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, File, HTTPException, UploadFile, status
 from sqlalchemy import select
 
-from app.api.deps import Database, CurrentUser
+from app.api.deps import Database, ReadDatabase, ReadUser, CurrentUser
 from app.crud.entry import entry_crud
-from app.schemas.entry import EntryCreate, EntryUpdate, EntryResponse, EntryListResponse, SimilarEntryResponse
+from app.schemas.entry import (
+    EntryCreate, EntryUpdate, EntryResponse, EntryListResponse, SimilarEntryResponse, EntryImportResult,
+)
 from app.services.embedding import embedding_service
 from app.services.vector_search import search_similar_entries
-from app.services.gamification import gamification_service
-from app.core.database import async_session_maker
+from app.services.jobs import job_service, enqueue_entry_jobs
+from app.services.journal_import import ImportFormat, import_service
+from app.services.rate_limiter import Priority
 from app.models.entry import Entry
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+UPLOAD_READ_SIZE = 64 * 1024
+
 
 @router.get("", response_model=EntryListResponse)
 async def list_entries(
@@ -42,49 +47,36 @@ async def create_entry(
     entry_in: EntryCreate,
     current_user: CurrentUser,
     db: Database,
-    background_tasks: BackgroundTasks,
 ):
-    entry = await entry_crud.create(db, entry_in, current_user.id)
-    background_tasks.add_task(generate_entry_embedding, entry.id, entry.content)
-    background_tasks.add_task(award_entry_xp, current_user.id, entry.id, entry_in.journal_type)
+    entry = await entry_crud.create(db, entry_in, current_user.id, commit=False)
+    await enqueue_entry_jobs(db, entry)
+    await db.commit()
+    job_service.notify()
     return entry
 
 
-async def award_entry_xp(user_id: UUID, entry_id: UUID, journal_type: Optional[str]):
-    logger.info(f"Awarding XP for entry {entry_id}, type: {journal_type}")
-    try:
-        async with async_session_maker() as db:
-            if journal_type == "morning":
-                await gamification_service.award_xp(db, user_id, "morning_journal", entry_id)
-            elif journal_type == "evening":
-                await gamification_service.award_xp(db, user_id, "evening_journal", entry_id)
-            else:
-                await gamification_service.award_xp(db, user_id, "entry_created", entry_id)
-
-            await gamification_service.check_achievements(db, user_id)
-            logger.info(f"XP awarded for entry {entry_id}")
-    except Exception as e:
-        logger.error(f"Error awarding XP for entry {entry_id}: {e}")
-
-
-async def generate_entry_embedding(entry_id: UUID, content: str):
-    logger.info(f"Generating embedding for entry {entry_id}")
-    try:
-        embedding = await embedding_service.generate_embedding(content)
-        logger.info(f"Generated embedding of length {len(embedding)} for entry {entry_id}")
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(Entry).where(Entry.id == entry_id)
-            )
-            entry = result.scalar_one_or_none()
-            if entry:
-                entry.embedding = embedding
-                await db.commit()
-                logger.info(f"Saved embedding for entry {entry_id}")
-            else:
-                logger.warning(f"Entry {entry_id} not found when saving embedding")
-    except Exception as e:
-        logger.error(f"Error generating embedding for entry {entry_id}: {e}")
+async def _read_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    # Through UploadFile's async API (the spooled file may be on disk), a piece at a time.
+    while chunk := await file.read(UPLOAD_READ_SIZE):
+        yield chunk
+
+
+@router.post("/import", response_model=EntryImportResult)
+async def import_entries(
+    current_user: CurrentUser,
+    db: Database,
+    file: UploadFile = File(...),
+    format: Optional[ImportFormat] = None,
+):
+    """Bulk-import entries from NDJSON (including /export files) or CSV.
+
+    CSV needs a ``content`` column; ``title``, ``mood``, ``journal_type``,
+    ``transcript`` and ``created_at`` are optional. The format defaults to the
+    file extension.
+    """
+    if format is None:
+        format = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+    return await import_service.import_entries(db, current_user.id, _read_upload(file), format=format)
 
 
 @router.get("/debug/embedding-status")
@@ -134,7 +126,7 @@ async def regenerate_all_embeddings(
 
     for entry in entries:
         try:
-            embedding = await embedding_service.generate_embedding(entry.content)
+            embedding = await embedding_service.generate_embedding(entry.content, priority=Priority.BACKGROUND)
             entry.embedding = embedding
             regenerated += 1
             logger.info(f"Regenerated embedding for entry {entry.id}")
@@ -172,7 +164,6 @@ async def update_entry(
     entry_in: EntryUpdate,
     current_user: CurrentUser,
     db: Database,
-    background_tasks: BackgroundTasks,
 ):
     entry = await entry_crud.get_by_id(db, entry_id, current_user.id)
     if not entry:
@@ -181,11 +172,14 @@ async def update_entry(
             detail="Entry not found",
         )
 
-    entry = await entry_crud.update(db, entry, entry_in)
+    entry = await entry_crud.update(db, entry, entry_in, commit=False)
 
     if entry_in.content:
-        background_tasks.add_task(generate_entry_embedding, entry.id, entry.content)
+        await enqueue_entry_jobs(db, entry, award_xp=False)
 
+    await db.commit()
+    await db.refresh(entry)
+    job_service.notify()
     return entry
 
 
@@ -208,8 +202,8 @@ async def delete_entry(
 @router.get("/{entry_id}/similar", response_model=List[SimilarEntryResponse])
 async def get_similar_entries(
     entry_id: UUID,
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
     limit: int = 5,
 ):
     entry = await entry_crud.get_by_id(db, entry_id, current_user.id)
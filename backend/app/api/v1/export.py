@@ -0,0 +1,38 @@
+from datetime import datetime
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import CurrentUser
+from app.services.export import ExportFormat, export_service
+
+router = APIRouter()
+
+
+@router.get("")
+async def export_journal(
+    current_user: CurrentUser,
+    format: ExportFormat = "ndjson",
+    include_embeddings: bool = False,
+):
+    """Download the user's entries, goals, chats and summaries as NDJSON or a zip of CSVs.
+
+    Embeddings, when included, are base64-encoded little-endian float32 arrays.
+    """
+    # The stream opens its own session: request-scoped ones close before the body is sent.
+    records = export_service.iter_records(current_user.id, include_embeddings=include_embeddings)
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+
+    if format == "csv":
+        body = export_service.csv_zip_chunks(records)
+        media_type = "application/zip"
+        filename = f"journalbuddy-export-{stamp}.zip"
+    else:
+        body = export_service.ndjson_chunks(current_user.id, records)
+        media_type = "application/x-ndjson"
+        filename = f"journalbuddy-export-{stamp}.ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
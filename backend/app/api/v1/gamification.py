@@ -2,7 +2,7 @@ from typing import List
 from datetime import datetime
 from fastapi import APIRouter
 
-from app.api.deps import Database, CurrentUser
+from app.api.deps import Database, ReadDatabase, ReadUser, CurrentUser
 from app.schemas.gamification import GamificationStats, AchievementResponse, ScheduleStatus, XPEventResponse
 from app.services.gamification import gamification_service
 from app.services.schedule import schedule_service
@@ -12,8 +12,8 @@ router = APIRouter()
 
 @router.get("/stats", response_model=GamificationStats)
 async def get_gamification_stats(
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
 ):
     stats = await gamification_service.get_gamification_stats(db, current_user.id)
     return stats
@@ -21,8 +21,8 @@ async def get_gamification_stats(
 
 @router.get("/achievements", response_model=List[AchievementResponse])
 async def get_achievements(
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
 ):
     achievements = await gamification_service.get_achievements(db, current_user.id)
     return achievements
@@ -30,8 +30,8 @@ async def get_achievements(
 
 @router.get("/schedule-status", response_model=ScheduleStatus)
 async def get_schedule_status(
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
     hour: int = None,
 ):
     current_hour = hour if hour is not None else datetime.utcnow().hour
@@ -41,8 +41,8 @@ async def get_schedule_status(
 
 @router.get("/xp-history", response_model=List[XPEventResponse])
 async def get_xp_history(
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
     limit: int = 20,
 ):
     from sqlalchemy import select
@@ -1,15 +1,12 @@
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
-import logging
+from fastapi import APIRouter, HTTPException, status
 
 from app.api.deps import Database, CurrentUser
 from app.crud.goal import goal_crud
 from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
-from app.services.gamification import gamification_service
-from app.core.database import async_session_maker
+from app.services.jobs import job_service, enqueue_goal_xp
 
-logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
@@ -28,22 +25,14 @@ async def create_goal(
     goal_in: GoalCreate,
     current_user: CurrentUser,
     db: Database,
-    background_tasks: BackgroundTasks,
 ):
-    goal = await goal_crud.create(db, goal_in, current_user.id)
-    background_tasks.add_task(award_goal_created_xp, current_user.id, goal.id)
+    goal = await goal_crud.create(db, goal_in, current_user.id, commit=False)
+    await enqueue_goal_xp(db, goal, "goal_created")
+    await db.commit()
+    job_service.notify()
     return goal
 
 
-async def award_goal_created_xp(user_id: UUID, goal_id: UUID):
-    try:
-        async with async_session_maker() as db:
-            await gamification_service.award_xp(db, user_id, "goal_created", goal_id)
-            await gamification_service.check_achievements(db, user_id)
-    except Exception as e:
-        logger.error(f"Error awarding XP for goal creation: {e}")
-
-
 @router.get("/{goal_id}", response_model=GoalResponse)
 async def get_goal(
     goal_id: UUID,
@@ -65,7 +54,6 @@ async def update_goal(
     goal_in: GoalUpdate,
     current_user: CurrentUser,
     db: Database,
-    background_tasks: BackgroundTasks,
 ):
     goal = await goal_crud.get_by_id(db, goal_id, current_user.id)
     if not goal:
@@ -75,24 +63,17 @@ async def update_goal(
         )
 
     old_status = goal.status
-    goal = await goal_crud.update(db, goal, goal_in)
+    goal = await goal_crud.update(db, goal, goal_in, commit=False)
 
     if goal_in.status == "completed" and old_status != "completed":
-        background_tasks.add_task(award_goal_completed_xp, current_user.id, goal.id)
+        await enqueue_goal_xp(db, goal, "goal_completed")
 
+    await db.commit()
+    await db.refresh(goal)
+    job_service.notify()
     return goal
 
 
-async def award_goal_completed_xp(user_id: UUID, goal_id: UUID):
-    try:
-        async with async_session_maker() as db:
-            await gamification_service.award_xp(db, user_id, "goal_completed", goal_id)
-            await gamification_service.check_achievements(db, user_id)
-            logger.info(f"Awarded XP for completing goal {goal_id}")
-    except Exception as e:
-        logger.error(f"Error awarding XP for goal completion: {e}")
-
-
 @router.delete("/{goal_id}")
 async def delete_goal(
     goal_id: UUID,
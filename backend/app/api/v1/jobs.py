@@ -0,0 +1,53 @@
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select, func
+
+from app.api.deps import Database, CurrentUser
+from app.models.job import Job
+from app.schemas.job import JobResponse, JobListResponse, JobStatus
+
+router = APIRouter()
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    current_user: CurrentUser,
+    db: Database,
+    status_filter: Optional[JobStatus] = None,
+    limit: int = 50,
+):
+    """List the current user's background jobs, newest first, with per-status counts."""
+    query = select(Job).where(Job.user_id == current_user.id)
+    if status_filter:
+        query = query.where(Job.status == status_filter)
+    result = await db.execute(query.order_by(Job.created_at.desc()).limit(limit))
+    jobs = result.scalars().all()
+
+    counts_result = await db.execute(
+        select(Job.status, func.count(Job.id))
+        .where(Job.user_id == current_user.id)
+        .group_by(Job.status)
+    )
+    counts = {job_status: count for job_status, count in counts_result.all()}
+
+    return JobListResponse(
+        jobs=[JobResponse.model_validate(j) for j in jobs],
+        counts=counts,
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    current_user: CurrentUser,
+    db: Database,
+):
+    """Get the status of a single background job."""
+    result = await db.execute(
+        select(Job).where(Job.id == job_id, Job.user_id == current_user.id)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JobResponse.model_validate(job)
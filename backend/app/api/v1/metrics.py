@@ -1,11 +1,26 @@
 from fastapi import APIRouter
 from sqlalchemy import select
 
-from app.api.deps import Database, CurrentUser
+from app.api.deps import ReadDatabase, ReadUser, CurrentUser
+from app.core.database import engine, replica_engines, pool_status
 from app.crud.entry import entry_crud
 from app.crud.goal import goal_crud
-from app.schemas.metrics import MetricsResponse
+from app.schemas.metrics import (
+    MetricsResponse,
+    PoolMetricsResponse,
+    DBPoolMetricsResponse,
+    LLMCacheMetricsResponse,
+    LLMCallMetrics,
+    ContextLatencyMetricsResponse,
+    SourceLatencyMetrics,
+    LLMGatewayMetricsResponse,
+    RateLimitMetricsResponse,
+)
+from app.services.latency import context_latency
+from app.services.llm_gateway import llm_gateway
+from app.services.llm_usage import llm_usage
 from app.services.metrics import calculate_streak
+from app.services.rate_limiter import rate_limiter
 from app.services.schedule import schedule_service
 from app.models.user import User
 
@@ -13,7 +28,7 @@ router = APIRouter()
 
 
 @router.get("", response_model=MetricsResponse)
-async def get_metrics(current_user: CurrentUser, db: Database):
+async def get_metrics(current_user: ReadUser, db: ReadDatabase):
     total_entries = await entry_crud.count_by_user(db, current_user.id)
     entries_this_week = await entry_crud.count_this_week(db, current_user.id)
     entries_this_month = await entry_crud.count_this_month(db, current_user.id)
@@ -48,3 +63,38 @@ async def get_metrics(current_user: CurrentUser, db: Database):
         morning_completed_today=morning_completed,
         evening_completed_today=evening_completed,
     )
+
+
+@router.get("/db-pool", response_model=DBPoolMetricsResponse)
+async def get_db_pool_metrics(current_user: CurrentUser):
+    """Connection pool usage and checkout wait times for this process."""
+    return DBPoolMetricsResponse(
+        primary=PoolMetricsResponse(**pool_status(engine)),
+        replicas=[PoolMetricsResponse(**pool_status(e)) for e in replica_engines],
+    )
+
+
+@router.get("/llm-cache", response_model=LLMCacheMetricsResponse)
+async def get_llm_cache_metrics(current_user: CurrentUser):
+    """LLM token usage per call site in this process, and how much of each prompt hit the provider's cache."""
+    return LLMCacheMetricsResponse(calls=[LLMCallMetrics(**c) for c in llm_usage.snapshot()])
+
+
+@router.get("/context-latency", response_model=ContextLatencyMetricsResponse)
+async def get_context_latency_metrics(current_user: CurrentUser):
+    """Latency, timeouts and errors of each chat context source in this process."""
+    return ContextLatencyMetricsResponse(
+        sources=[SourceLatencyMetrics(**s) for s in context_latency.snapshot()]
+    )
+
+
+@router.get("/llm-gateway", response_model=LLMGatewayMetricsResponse)
+async def get_llm_gateway_metrics(current_user: CurrentUser):
+    """Circuit breaker state, time to first token per request class, and hedged requests."""
+    return LLMGatewayMetricsResponse(**llm_gateway.snapshot())
+
+
+@router.get("/rate-limits", response_model=RateLimitMetricsResponse)
+async def get_rate_limit_metrics(current_user: CurrentUser):
+    """Client-side request budget per AI provider: tokens left, queue depth and wait per priority."""
+    return RateLimitMetricsResponse(buckets=rate_limiter.snapshot())
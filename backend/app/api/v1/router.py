@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1 import auth, users, entries, goals, chat, metrics, transcribe, gamification, voice, summaries
+from app.api.v1 import auth, users, entries, goals, chat, metrics, transcribe, gamification, voice, summaries, jobs, export
 
 api_router = APIRouter()
 
@@ -14,3 +14,5 @@ api_router.include_router(transcribe.router, prefix="/transcribe", tags=["transc
 api_router.include_router(gamification.router, prefix="/gamification", tags=["gamification"])
 api_router.include_router(voice.router, prefix="/voice", tags=["voice"])
 api_router.include_router(summaries.router, prefix="/summaries", tags=["summaries"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
@@ -1,7 +1,7 @@
 from uuid import UUID
 from fastapi import APIRouter, HTTPException, status
 
-from app.api.deps import Database, CurrentUser
+from app.api.deps import Database, ReadDatabase, ReadUser, CurrentUser
 from app.services.auto_summary import auto_summary_service
 from app.schemas.auto_summary import (
     AutoSummaryResponse,
@@ -14,8 +14,8 @@ router = APIRouter()
 
 @router.get("", response_model=AutoSummaryListResponse)
 async def list_summaries(
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
     limit: int = 10,
 ):
     """List all auto-generated summaries for the current user."""
@@ -29,8 +29,8 @@ async def list_summaries(
 @router.get("/{summary_id}", response_model=AutoSummaryResponse)
 async def get_summary(
     summary_id: UUID,
-    current_user: CurrentUser,
-    db: Database,
+    current_user: ReadUser,
+    db: ReadDatabase,
 ):
     """Get a specific summary by ID."""
     summary = await auto_summary_service.get_summary_by_id(db, summary_id, current_user.id)
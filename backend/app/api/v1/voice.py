@@ -3,25 +3,32 @@ import json
 import logging
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.core.database import get_db
+from app.core import tracing
+from app.core.database import async_session_maker
 from app.core.security import get_user_from_token
 from app.services.deepgram_service import DeepgramStreamManager
 from app.services.cartesia_service import CartesiaStreamManager
-from app.agent.voice_agent import voice_agent
 from app.crud.chat import chat_crud
+from app.services.message_buffer import MessageWriteBuffer
+from app.services.conversation_memory import MemoryState, conversation_memory
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 class VoiceChatSession:
-    def __init__(self, websocket: WebSocket, user_id: str, db: AsyncSession, journal_type: Optional[str] = None):
+    """One voice conversation over a websocket.
+
+    Holds no database session of its own: every turn and tool checks out a
+    short-lived session, so pooled connections scale with active turns rather
+    than open sockets.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str, journal_type: Optional[str] = None):
         self.websocket = websocket
         self.user_id = user_id
-        self.db = db
         self.journal_type = journal_type
         self.deepgram = DeepgramStreamManager()
         self.cartesia = CartesiaStreamManager()
@@ -32,29 +39,25 @@ class VoiceChatSession:
         self._last_interrupt_time: float = 0
         self._interrupt_cooldown: float = 1.0
         self.db_session_id: Optional[UUID] = None
+        self.message_buffer: Optional[MessageWriteBuffer] = None
         self.should_end_conversation = False
+        self.memory_state = MemoryState()
+        self._summary_task: Optional[asyncio.Task] = None
 
     async def create_db_session(self):
-        session = await chat_crud.create_session(
-            self.db,
-            UUID(self.user_id),
-            session_type="voice",
-        )
+        async with async_session_maker() as db:
+            session = await chat_crud.create_session(
+                db,
+                UUID(self.user_id),
+                session_type="voice",
+            )
         self.db_session_id = session.id
+        self.message_buffer = MessageWriteBuffer(session.id)
         logger.info(f"Created voice chat session: {self.db_session_id}")
 
-    async def save_message(self, role: str, content: str):
-        if self.db_session_id and content.strip():
-            try:
-                await chat_crud.add_message(
-                    self.db,
-                    self.db_session_id,
-                    role,
-                    content,
-                )
-            except Exception as e:
-                logger.warning(f"Failed to save message, rolling back: {e}")
-                await self.db.rollback()
+    def save_message(self, role: str, content: str):
+        if self.message_buffer and content.strip():
+            self.message_buffer.append(role, content)
 
     async def send_message(self, msg_type: str, data: dict = None):
         try:
@@ -83,7 +86,7 @@ class VoiceChatSession:
             return
 
         self.chat_history.append({"role": "user", "content": transcript})
-        await self.save_message("user", transcript)
+        self.save_message("user", transcript)
 
         await self.send_message("user_transcript", {"text": transcript})
         await self.send_message("assistant_thinking")
@@ -93,6 +96,15 @@ class VoiceChatSession:
         )
 
     async def generate_response(self, user_message: str):
+        with tracing.span("voice.turn", {
+            "user.id": self.user_id,
+            "voice.session_id": self.db_session_id,
+            "voice.turn": len(self.chat_history),
+            "voice.user_chars": len(user_message),
+        }):
+            await self._generate_response(user_message)
+
+    async def _generate_response(self, user_message: str):
         try:
             self.is_speaking = True
             self._cancelled = False
@@ -102,15 +114,19 @@ class VoiceChatSession:
             end_signal_received = False
             has_sent_text = False
 
+            # Imported on first use: langchain is heavy and only voice turns need it.
+            from app.agent.voice_agent import voice_agent
+
             async def text_generator():
                 nonlocal full_response, end_signal_received, has_sent_text
                 async for chunk in voice_agent.chat_stream(
-                    self.db,
                     self.user_id,
                     str(self.db_session_id) if self.db_session_id else "",
                     user_message,
                     self.chat_history[:-1],
                     journal_type=self.journal_type,
+                    message_buffer=self.message_buffer,
+                    memory_state=self.memory_state,
                 ):
                     if self._cancelled:
                         return
@@ -130,29 +146,43 @@ class VoiceChatSession:
                         emotion = chunk.replace("__EMOTION:", "").replace("__", "")
                         await self.send_message("emotion", {"emotion": emotion})
                         continue
-                    if chunk and chunk.strip():
+                    if chunk:
+                        # Token deltas are forwarded as-is, including whitespace-only
+                        # ones, so words are not glued together downstream.
                         full_response += chunk
-                        has_sent_text = True
-                        logger.info(f"Sending assistant_text chunk: {chunk[:50]}...")
+                        if chunk.strip() and not has_sent_text:
+                            has_sent_text = True
+                            tracing.add_event("voice.first_text")
+                        logger.debug(f"Sending assistant_text chunk: {chunk[:50]}...")
                         await self.send_message("assistant_text", {"text": chunk, "is_final": False})
                         yield chunk
 
             await self.send_message("assistant_speaking")
 
+            audio_bytes = 0
             async for audio_chunk in self.cartesia.synthesize_streaming(text_generator()):
                 if self._cancelled:
                     break
+                if not audio_bytes:
+                    tracing.add_event("voice.first_audio")
+                audio_bytes += len(audio_chunk)
                 try:
                     await self.websocket.send_bytes(audio_chunk)
                 except Exception as e:
                     logger.warning(f"Failed to send audio chunk: {e}")
                     break
 
+            tracing.set_attributes({
+                "voice.response_chars": len(full_response),
+                "voice.audio_bytes": audio_bytes,
+                "voice.cancelled": self._cancelled,
+            })
             if not self._cancelled:
                 logger.info(f"Response complete. full_response length: {len(full_response)}, has_sent_text: {has_sent_text}")
                 if full_response.strip():
                     self.chat_history.append({"role": "assistant", "content": full_response})
-                    await self.save_message("assistant", full_response)
+                    self.save_message("assistant", full_response)
+                    self.maybe_summarize()
 
                 if has_sent_text:
                     logger.info("Sending is_final=True")
@@ -163,11 +193,8 @@ class VoiceChatSession:
                     await self.send_message("conversation_ended")
 
         except Exception as e:
+            tracing.set_attributes({"voice.error": repr(e)})
             logger.error(f"Error generating response: {e}")
-            try:
-                await self.db.rollback()
-            except Exception:
-                pass
             await self.send_message("error", {"message": str(e)})
         finally:
             self.is_speaking = False
@@ -186,11 +213,6 @@ class VoiceChatSession:
             except asyncio.CancelledError:
                 pass
 
-        try:
-            await self.db.rollback()
-        except Exception as e:
-            logger.debug(f"Rollback during interrupt: {e}")
-
         self.is_speaking = False
         await self.send_message("interrupted")
 
@@ -255,10 +277,10 @@ class VoiceChatSession:
         try:
             from app.models.chat import ChatSession
             from app.models.entry import Entry
-            from app.services.embedding import embedding_service
-            from sqlalchemy import select
+            from app.services.jobs import job_service, enqueue_entry_jobs
 
-            session = await self.db.get(ChatSession, self.db_session_id)
+            async with async_session_maker() as db:
+                session = await db.get(ChatSession, self.db_session_id)
             if session and session.entry_id:
                 logger.info(f"Entry already exists for session {self.db_session_id}, skipping auto-save")
                 return
@@ -270,12 +292,15 @@ class VoiceChatSession:
 
             from langchain_groq import ChatGroq
             from app.config import settings
+            from app.services.llm_gateway import llm_gateway
+            from app.services.model_routing import RequestClass, model_router
 
+            # Title/mood/topic extraction: the fast model is plenty and the user is waiting on close.
             llm = ChatGroq(
                 api_key=settings.groq_api_key,
-                model=settings.groq_model,
-                temperature=0.3,
-                max_tokens=500,
+                base_url=settings.groq_base_url or None,
+                max_retries=0,
+                **model_router.route(RequestClass.SESSION_EXTRACTION).kwargs(),
             )
 
             prompt = f"""Analyze this voice conversation and create a journal entry summary.
@@ -289,7 +314,7 @@ CONTENT: [2-3 paragraphs flowing summary of what the user shared, written in thi
 MOOD: [One of: great, good, okay, bad, terrible - based on user's overall sentiment]
 TOPICS: [comma-separated key topics, max 5]"""
 
-            response = await llm.ainvoke(prompt)
+            response = await llm_gateway.complete(RequestClass.SESSION_EXTRACTION, lambda: llm.ainvoke(prompt))
             content = response.content
 
             title = "Voice Conversation"
@@ -334,32 +359,48 @@ TOPICS: [comma-separated key topics, max 5]"""
                     mood=mood,
                     journal_type=self.journal_type,
                 )
-                self.db.add(entry)
-                await self.db.flush()
-
-                if session:
-                    session.entry_id = entry.id
-                    session.summary = entry_content[:500]
-                    session.key_topics = topics
-
-                await self.db.commit()
+                async with async_session_maker() as db:
+                    db.add(entry)
+                    await db.flush()
+
+                    session = await db.get(ChatSession, self.db_session_id)
+                    if session:
+                        session.entry_id = entry.id
+                        session.summary = entry_content[:500]
+                        session.key_topics = topics
+
+                    await enqueue_entry_jobs(db, entry, award_xp=False)
+                    await db.commit()
+                job_service.notify()
                 logger.info(f"Auto-created journal entry {entry.id} for session {self.db_session_id}")
 
-                try:
-                    embedding = await embedding_service.generate_embedding(entry_content)
-                    entry.embedding = embedding
-                    await self.db.commit()
-                except Exception as emb_err:
-                    logger.error(f"Failed to generate embedding: {emb_err}")
-
         except Exception as e:
             logger.error(f"Failed to auto-save session summary: {e}")
-            try:
-                await self.db.rollback()
-            except Exception:
-                pass
+
+    def maybe_summarize(self):
+        """Fold old turns into the rolling summary without holding up the conversation."""
+        if self._summary_task and not self._summary_task.done():
+            return
+        if conversation_memory.needs_summary(self.chat_history, self.memory_state):
+            self._summary_task = asyncio.create_task(self._summarize())
+
+    async def _summarize(self):
+        try:
+            # chat_history only grows, so indices in the new state stay valid.
+            state = await conversation_memory.summarize(self.chat_history, self.memory_state)
+            if state is self.memory_state:
+                return
+            self.memory_state = state
+            if self.db_session_id:
+                await conversation_memory.save(self.db_session_id, state)
+        except Exception as e:
+            logger.error(f"Error summarizing voice conversation: {e}")
 
     async def close(self):
+        if self._summary_task and not self._summary_task.done():
+            self._summary_task.cancel()
+        if self.message_buffer:
+            await self.message_buffer.close()
         await self.save_session_summary_on_close()
         await self.deepgram.close()
 
@@ -369,20 +410,20 @@ async def voice_chat(
     websocket: WebSocket,
     token: str = None,
     journal_type: str = None,
-    db: AsyncSession = Depends(get_db),
 ):
     await websocket.accept()
 
     user = None
     if token:
-        user = await get_user_from_token(token, db)
+        async with async_session_maker() as db:
+            user = await get_user_from_token(token, db)
 
     if not user:
         await websocket.send_json({"type": "error", "data": {"message": "Authentication required"}})
         await websocket.close(code=4001)
         return
 
-    session = VoiceChatSession(websocket, str(user.id), db, journal_type=journal_type)
+    session = VoiceChatSession(websocket, str(user.id), journal_type=journal_type)
 
     try:
         await session.create_db_session()
@@ -412,7 +453,7 @@ async def voice_chat(
                 break
 
         session.chat_history.append({"role": "assistant", "content": greeting})
-        await session.save_message("assistant", greeting)
+        session.save_message("assistant", greeting)
         await session.send_message("assistant_text", {"text": "", "is_final": True})
         await session.send_message("assistant_done")
 
@@ -1,10 +1,194 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import itertools
+import time
+from collections import deque
+from typing import Dict, List, Optional, Union
+from uuid import UUID, uuid4
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+class PoolWaitStats:
+    """Checkout counters and recent queue wait times for one pool, plus time spent opening connections."""
+
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits: deque = deque(maxlen=window)
+        self.connects = 0
+        self.total_connect = 0.0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.recent_waits.append(wait)
+
+    def record_connect(self, seconds: float) -> None:
+        self.connects += 1
+        self.total_connect += seconds
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent_waits:
+            return 0.0
+        ordered = sorted(self.recent_waits)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        # As in QueuePool._do_get: only once the overflow is used up does a checkout
+        # block on the queue. Otherwise it takes an idle connection or opens a new
+        # one, and opening one (connect, TLS) is not contention.
+        queued = self._max_overflow > -1 and self._overflow >= self._max_overflow
+        overflow = self._overflow
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        elapsed = time.perf_counter() - start
+        self.wait_stats.record(elapsed if queued else 0.0)
+        if self._overflow > overflow:
+            self.wait_stats.record_connect(elapsed)
+        return conn
+
+
+def _connect_args() -> dict:
+    server_settings = {"application_name": settings.db_application_name}
+    if settings.db_pgbouncer:
+        # Transaction pooling hands each transaction a different server connection, so
+        # prepared statements can't be cached or reused by name, and PgBouncer rejects
+        # startup parameters it doesn't track (such as jit).
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            "server_settings": server_settings,
+        }
+
+    if not settings.db_jit:
+        # JIT compilation costs more than it saves on our short OLTP queries.
+        server_settings["jit"] = "off"
+    return {
+        # SQLAlchemy prepares statements itself, so its cache is the one that matters;
+        # asyncpg's own cache only covers queries it runs internally.
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+        "server_settings": server_settings,
+    }
+
+
+def create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    stats: PoolWaitStats = pool.wait_stats
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size; only connections beyond pool_size are overflow.
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_avg_ms": (stats.total_wait / stats.checkouts * 1000) if stats.checkouts else 0.0,
+        "wait_p95_ms": stats.percentile(0.95) * 1000,
+        "wait_max_ms": stats.max_wait * 1000,
+        "connects": stats.connects,
+        "connect_avg_ms": (stats.total_connect / stats.connects * 1000) if stats.connects else 0.0,
+    }
+
+
+class PrimarySession(Session):
+    """Session class for the primary; tracks which users wrote, for replica stickiness."""
+
+
+engine = create_engine(settings.database_url)
+async_session_maker = async_sessionmaker(
+    engine, class_=AsyncSession, sync_session_class=PrimarySession, expire_on_commit=False
+)
+
+replica_engines: List[AsyncEngine] = [
+    create_engine(url.strip()) for url in settings.database_replica_urls.split(",") if url.strip()
+]
+_replica_session_makers = itertools.cycle(
+    [async_sessionmaker(e, class_=AsyncSession, expire_on_commit=False) for e in replica_engines]
+)
+
+# user_id -> monotonic time of that user's last commit on the primary.
+# Per process: a write handled by another worker isn't seen here, so cross-worker
+# reads may still briefly lag by the replica's replay delay.
+_last_write_at: Dict[str, float] = {}
+
+
+def record_user_write(user_id: Union[str, UUID]) -> None:
+    _last_write_at[str(user_id)] = time.monotonic()
+
+
+def _wrote_recently(user_id: Union[str, UUID]) -> bool:
+    last = _last_write_at.get(str(user_id))
+    if last is None:
+        return False
+    if time.monotonic() - last > settings.replica_sticky_seconds:
+        _last_write_at.pop(str(user_id), None)
+        return False
+    return True
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _collect_writers(session: Session, flush_context) -> None:
+    # Every user-owned row carries user_id; the users table is the one exception.
+    writers = session.info.setdefault("writers", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        user_id = obj.id if getattr(obj, "__tablename__", None) == "users" else getattr(obj, "user_id", None)
+        if user_id is not None:
+            writers.add(str(user_id))
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _mark_writers(session: Session) -> None:
+    for user_id in session.info.pop("writers", ()):
+        record_user_write(user_id)
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _forget_writers(session: Session) -> None:
+    session.info.pop("writers", None)
+
+
+def read_session_maker(user_id: Optional[Union[str, UUID]] = None) -> async_sessionmaker:
+    """Session factory for read-only work: a replica, unless the user just wrote."""
+    if not replica_engines or (user_id is not None and _wrote_recently(user_id)):
+        return async_session_maker
+    return next(_replica_session_makers)
 
 
 class Base(DeclarativeBase):
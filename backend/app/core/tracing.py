@@ -0,0 +1,142 @@
+"""Optional OpenTelemetry tracing.
+
+With ``tracing_enabled`` the FastAPI routes, SQLAlchemy engines (primary and
+replicas) and httpx clients (embeddings, Cartesia, and the Groq SDK underneath
+the LLM gateway) are instrumented, and the helpers below add spans for the
+parts those don't see: context retrieval, LLM calls and voice turns. When
+tracing is off, or OpenTelemetry isn't installed, the helpers do nothing.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+from uuid import UUID
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+_provider = None
+
+
+def _exporter():
+    if settings.tracing_exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        # One JSON span per line, for offline analysis.
+        out = open(settings.tracing_file_path, "a", buffering=1)
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+
+
+def setup_tracing(app=None) -> None:
+    """Install the tracer provider and instrumentations; pass the FastAPI app to trace its routes."""
+    global _tracer, _provider
+    if not settings.tracing_enabled or _tracer is not None:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError as e:
+        logger.warning(f"Tracing is enabled but OpenTelemetry is not installed: {e}")
+        return
+
+    from app.core.database import engine, replica_engines
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.tracing_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_exporter()))
+    trace.set_tracer_provider(_provider)
+
+    SQLAlchemyInstrumentor().instrument(engines=[e.sync_engine for e in [engine, *replica_engines]])
+    HTTPXClientInstrumentor().instrument()
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+        FastAPIInstrumentor.instrument_app(app)
+
+    _tracer = trace.get_tracer("journalbuddy")
+    logger.info(f"Tracing enabled, exporting to {settings.tracing_exporter}")
+
+
+def shutdown_tracing() -> None:
+    """Flush spans still queued in the batch processor."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def _clean(attributes: Optional[dict]) -> dict:
+    return {k: str(v) if isinstance(v, UUID) else v for k, v in (attributes or {}).items() if v is not None}
+
+
+@contextmanager
+def span(name: str, attributes: Optional[dict] = None) -> Iterator[None]:
+    """Run the block in a child span of the current one."""
+    if _tracer is None:
+        yield
+        return
+    with _tracer.start_as_current_span(name, attributes=_clean(attributes)):
+        yield
+
+
+def set_attributes(attributes: dict) -> None:
+    """Set attributes on the current span, e.g. result sizes known only at the end of a block."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    trace.get_current_span().set_attributes(_clean(attributes))
+
+
+def add_event(name: str, attributes: Optional[dict] = None) -> None:
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    trace.get_current_span().add_event(name, _clean(attributes))
+
+
+def start_span(name: str, attributes: Optional[dict] = None) -> Any:
+    """A span that isn't made current, for work spread over an async generator's yields.
+
+    Entering a current span in a generator breaks if the generator is finalized
+    in another context, so these are only made current with ``use_span`` around
+    blocks that don't yield, and closed with ``end_span``.
+    """
+    if _tracer is None:
+        return None
+    return _tracer.start_span(name, attributes=_clean(attributes))
+
+
+@contextmanager
+def use_span(trace_span: Any) -> Iterator[None]:
+    if trace_span is None:
+        yield
+        return
+    from opentelemetry import trace
+
+    with trace.use_span(trace_span, end_on_exit=False):
+        yield
+
+
+def end_span(trace_span: Any, error: Optional[BaseException] = None, attributes: Optional[dict] = None) -> None:
+    if trace_span is None:
+        return
+    if attributes:
+        trace_span.set_attributes(_clean(attributes))
+    if error is not None:
+        from opentelemetry.trace import Status, StatusCode
+
+        trace_span.record_exception(error)
+        trace_span.set_status(Status(StatusCode.ERROR, str(error)))
+    trace_span.end()
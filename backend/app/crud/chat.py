@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.chat import ChatSession, ChatMessage
+from app.services.token_manager import token_manager
 
 
 class ChatCRUD:
@@ -32,6 +33,7 @@ class ChatCRUD:
             session_id=session_id,
             role=role,
             content=content,
+            token_count=token_manager.count_tokens(content),
         )
         db.add(message)
         await db.commit()
@@ -50,7 +52,11 @@ class ChatCRUD:
                 session_id=session_id,
                 role=msg["role"],
                 content=msg["content"],
+                token_count=token_manager.count_tokens(msg["content"]),
             )
+            if msg.get("created_at"):
+                # Buffered writers pass the time the message was said, not when it was flushed.
+                message.created_at = msg["created_at"]
             db.add(message)
             db_messages.append(message)
         await db.commit()
@@ -1,11 +1,11 @@
 from typing import List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime, timedelta
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, desc, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.entry import Entry
-from app.schemas.entry import EntryCreate, EntryUpdate
+from app.schemas.entry import EntryCreate, EntryImport, EntryUpdate
 
 
 class EntryCRUD:
@@ -38,7 +38,9 @@ class EntryCRUD:
 
         return list(entries), total
 
-    async def create(self, db: AsyncSession, entry_in: EntryCreate, user_id: UUID) -> Entry:
+    async def create(
+        self, db: AsyncSession, entry_in: EntryCreate, user_id: UUID, commit: bool = True
+    ) -> Entry:
         entry = Entry(
             user_id=user_id,
             title=entry_in.title,
@@ -48,14 +50,51 @@ class EntryCRUD:
             journal_type=entry_in.journal_type,
         )
         db.add(entry)
+        if not commit:
+            # Caller commits, e.g. together with jobs enqueued for this entry.
+            await db.flush()
+            return entry
         await db.commit()
         await db.refresh(entry)
         return entry
 
-    async def update(self, db: AsyncSession, entry: Entry, entry_in: EntryUpdate) -> Entry:
+    async def create_many(
+        self,
+        db: AsyncSession,
+        entries_in: List[EntryImport],
+        user_id: UUID,
+        embeddings: Optional[List[Optional[List[float]]]] = None,
+    ) -> List[UUID]:
+        """Insert entries with one multi-row INSERT; the caller commits."""
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "title": entry_in.title,
+                "content": entry_in.content,
+                "transcript": entry_in.transcript,
+                "mood": entry_in.mood,
+                "journal_type": entry_in.journal_type,
+                "embedding": embeddings[i] if embeddings else None,
+                "created_at": entry_in.created_at or now,
+                "updated_at": now,
+            }
+            for i, entry_in in enumerate(entries_in)
+        ]
+        if rows:
+            await db.execute(insert(Entry).values(rows))
+        return [row["id"] for row in rows]
+
+    async def update(
+        self, db: AsyncSession, entry: Entry, entry_in: EntryUpdate, commit: bool = True
+    ) -> Entry:
         update_data = entry_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(entry, field, value)
+        if not commit:
+            await db.flush()
+            return entry
         await db.commit()
         await db.refresh(entry)
         return entry
@@ -29,7 +29,9 @@ class GoalCRUD:
         result = await db.execute(query)
         return list(result.scalars().all())
 
-    async def create(self, db: AsyncSession, goal_in: GoalCreate, user_id: UUID) -> Goal:
+    async def create(
+        self, db: AsyncSession, goal_in: GoalCreate, user_id: UUID, commit: bool = True
+    ) -> Goal:
         goal = Goal(
             user_id=user_id,
             title=goal_in.title,
@@ -37,14 +39,22 @@ class GoalCRUD:
             target_date=goal_in.target_date,
         )
         db.add(goal)
+        if not commit:
+            await db.flush()
+            return goal
         await db.commit()
         await db.refresh(goal)
         return goal
 
-    async def update(self, db: AsyncSession, goal: Goal, goal_in: GoalUpdate) -> Goal:
+    async def update(
+        self, db: AsyncSession, goal: Goal, goal_in: GoalUpdate, commit: bool = True
+    ) -> Goal:
         update_data = goal_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(goal, field, value)
+        if not commit:
+            await db.flush()
+            return goal
         await db.commit()
         await db.refresh(goal)
         return goal
@@ -1,19 +1,54 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
 from app.config import settings
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.services.jobs import job_service
+from app.services.rate_limiter import rate_limiter
+from app.services.token_manager import get_encoding
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up() -> None:
+    try:
+        import app.agent.voice_agent  # noqa: F401
+        import groq  # noqa: F401
+
+        get_encoding()
+        logger.info("Warm-up finished")
+    except Exception as e:
+        logger.warning(f"Warm-up failed, loading lazily on first use instead: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.run_jobs_in_process:
+        job_service.start()
+    warm_up = asyncio.create_task(asyncio.to_thread(_warm_up)) if settings.warm_up_on_startup else None
+    yield
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    await job_service.stop()
+    await rate_limiter.close()
+    shutdown_tracing()
+
+
 app = FastAPI(
     title="JournalBuddy API",
     description="AI-powered journaling companion",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -26,6 +61,8 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api/v1")
 
+setup_tracing(app)
+
 
 @app.get("/health")
 async def health_check():
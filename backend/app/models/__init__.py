@@ -5,5 +5,7 @@ from app.models.chat import ChatSession, ChatMessage
 from app.models.achievement import UserAchievement
 from app.models.xp_event import XPEvent
 from app.models.auto_summary import AutoSummary
+from app.models.job import Job
+from app.models.answer_cache import CachedAnswer
 
-__all__ = ["User", "Entry", "Goal", "GoalProgressUpdate", "ChatSession", "ChatMessage", "UserAchievement", "XPEvent", "AutoSummary"]
+__all__ = ["User", "Entry", "Goal", "GoalProgressUpdate", "ChatSession", "ChatMessage", "UserAchievement", "XPEvent", "AutoSummary", "Job", "CachedAnswer"]
@@ -0,0 +1,26 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from pgvector.sqlalchemy import Vector
+
+from app.core.database import Base
+from app.config import settings
+
+
+class CachedAnswer(Base):
+    __tablename__ = "cached_answers"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    query: Mapped[str] = mapped_column(Text, nullable=False)
+    query_embedding = mapped_column(Vector(settings.embedding_dimension), nullable=False)
+    # Hash of everything in the prompt besides the question (retrieved entries, goals, model).
+    context_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    answer: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_cached_answers_user_fingerprint", "user_id", "context_fingerprint"),
+    )
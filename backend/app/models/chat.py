@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, ForeignKey
+from sqlalchemy import String, Text, DateTime, ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -17,6 +17,9 @@ class ChatSession(Base):
     summary: Mapped[str] = mapped_column(Text, nullable=True)
     key_topics: Mapped[str] = mapped_column(Text, nullable=True)
     goal_updates: Mapped[str] = mapped_column(Text, nullable=True)
+    # Rolling summary of the first summarized_message_count messages (see services/conversation_memory.py)
+    rolling_summary: Mapped[str] = mapped_column(Text, nullable=True)
+    summarized_message_count: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     user = relationship("User", back_populates="chat_sessions")
@@ -31,6 +34,8 @@ class ChatMessage(Base):
     session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
     role: Mapped[str] = mapped_column(String(20), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Counted once on insert so history trimming never re-tokenizes stored messages.
+    token_count: Mapped[int] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, index=True)
 
     session = relationship("ChatSession", back_populates="messages")
@@ -3,7 +3,7 @@ from app.schemas.entry import EntryCreate, EntryUpdate, EntryResponse, EntryList
 from app.schemas.goal import GoalCreate, GoalUpdate, GoalResponse
 from app.schemas.chat import ChatSessionCreate, ChatSessionResponse, ChatMessageCreate, ChatMessageResponse
 from app.schemas.auth import Token, TokenPayload, LoginRequest
-from app.schemas.metrics import MetricsResponse
+from app.schemas.metrics import MetricsResponse, PoolMetricsResponse, DBPoolMetricsResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "UserUpdate",
@@ -11,5 +11,5 @@ __all__ = [
     "GoalCreate", "GoalUpdate", "GoalResponse",
     "ChatSessionCreate", "ChatSessionResponse", "ChatMessageCreate", "ChatMessageResponse",
     "Token", "TokenPayload", "LoginRequest",
-    "MetricsResponse",
+    "MetricsResponse", "PoolMetricsResponse", "DBPoolMetricsResponse",
 ]
@@ -51,3 +51,20 @@ class EntryListResponse(BaseModel):
     total: int
     page: int
     limit: int
+
+
+class EntryImport(EntryCreate):
+    created_at: Optional[datetime] = None
+
+
+class EntryImportError(BaseModel):
+    line: int
+    error: str
+
+
+class EntryImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[EntryImportError]
+    # Set when a chunk couldn't be saved: lines from here on weren't imported.
+    stopped_at_line: Optional[int] = None
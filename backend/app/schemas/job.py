@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional, List, Literal, Dict
+from uuid import UUID
+from pydantic import BaseModel
+
+
+JobStatus = Literal["pending", "running", "done", "failed"]
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    job_type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str]
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class JobListResponse(BaseModel):
+    jobs: List[JobResponse]
+    counts: Dict[str, int]
@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseModel
 
 
@@ -14,3 +15,80 @@ class MetricsResponse(BaseModel):
     level: int
     morning_completed_today: bool
     evening_completed_today: bool
+
+
+class PoolMetricsResponse(BaseModel):
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
+    connects: int
+    connect_avg_ms: float
+
+
+class DBPoolMetricsResponse(BaseModel):
+    primary: PoolMetricsResponse
+    replicas: List[PoolMetricsResponse]
+
+
+class LLMCallMetrics(BaseModel):
+    source: str
+    requests: int
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+    cache_hit_ratio: float
+
+
+class LLMCacheMetricsResponse(BaseModel):
+    calls: List[LLMCallMetrics]
+
+
+class SourceLatencyMetrics(BaseModel):
+    source: str
+    count: int
+    timeouts: int
+    errors: int
+    avg_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class ContextLatencyMetricsResponse(BaseModel):
+    sources: List[SourceLatencyMetrics]
+
+
+class CircuitBreakerMetrics(BaseModel):
+    provider: str
+    state: str
+    failures: int
+
+
+class LLMGatewayMetricsResponse(BaseModel):
+    breakers: List[CircuitBreakerMetrics]
+    latency: List[SourceLatencyMetrics]
+    hedged_requests: int
+
+
+class PriorityQueueMetrics(BaseModel):
+    priority: str
+    queued: int
+    granted: int
+    wait_avg_ms: float
+
+
+class RateLimitBucketMetrics(BaseModel):
+    provider: str
+    per_minute: float
+    tokens: float
+    priorities: List[PriorityQueueMetrics]
+
+
+class RateLimitMetricsResponse(BaseModel):
+    buckets: List[RateLimitBucketMetrics]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.core.database import async_session_maker, read_session_maker
+from app.models.answer_cache import CachedAnswer
+from app.services.conversation_memory import MemoryState
+
+logger = logging.getLogger(__name__)
+
+# Size of the pieces a cached answer is streamed back in.
+CACHED_ANSWER_CHUNK_CHARS = 80
+
+
+class AnswerCache:
+    """Semantic cache of answers to stand-alone chat questions.
+
+    An answer is reused when a new question's embedding is within
+    ``answer_cache_min_similarity`` of a cached one *and* the rest of the prompt
+    fingerprints the same. The fingerprint covers the retrieved entries (their
+    text, so an edited entry changes it), goals, recent entries and model, so any
+    change to what the answer was based on turns the lookup into a miss. Rows
+    past ``answer_cache_ttl_hours`` are ignored and purged on the next store.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def eligible(self, chat_history: list, memory_state: Optional[MemoryState]) -> bool:
+        """Only a session's first question: later ones depend on the conversation so far."""
+        if not settings.answer_cache_enabled or chat_history:
+            return False
+        return not (memory_state and memory_state.summary)
+
+    def fingerprint(self, messages: List[dict], model: str) -> str:
+        """Hash of the model and the prompt without the final user message."""
+        payload = json.dumps([model, messages[:-1]], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(hours=settings.answer_cache_ttl_hours)
+
+    async def lookup(self, user_id: UUID, query_embedding: List[float], fingerprint: str) -> Optional[str]:
+        distance = CachedAnswer.query_embedding.cosine_distance(query_embedding)
+        try:
+            async with read_session_maker(user_id)() as db:
+                result = await db.execute(
+                    select(CachedAnswer.answer, distance.label("distance"))
+                    .where(
+                        CachedAnswer.user_id == user_id,
+                        CachedAnswer.context_fingerprint == fingerprint,
+                        CachedAnswer.created_at > self._cutoff(),
+                    )
+                    .order_by(distance)
+                    .limit(1)
+                )
+                row = result.first()
+        except Exception as e:
+            logger.error(f"Error looking up cached answer: {e}")
+            row = None
+
+        if row is None or 1 - row.distance < settings.answer_cache_min_similarity:
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.info(f"Answer cache hit for user {user_id} (similarity {1 - row.distance:.3f})")
+        return row.answer
+
+    async def store(
+        self,
+        user_id: UUID,
+        query: str,
+        query_embedding: List[float],
+        fingerprint: str,
+        answer: str,
+    ) -> None:
+        try:
+            async with async_session_maker() as db:
+                await db.execute(
+                    delete(CachedAnswer).where(
+                        CachedAnswer.user_id == user_id,
+                        CachedAnswer.created_at <= self._cutoff(),
+                    )
+                )
+                db.add(CachedAnswer(
+                    user_id=user_id,
+                    query=query,
+                    query_embedding=query_embedding,
+                    context_fingerprint=fingerprint,
+                    answer=answer,
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error caching answer: {e}")
+
+    def chunks(self, answer: str):
+        for i in range(0, len(answer), CACHED_ANSWER_CHUNK_CHARS):
+            yield answer[i:i + CACHED_ANSWER_CHUNK_CHARS]
+
+
+answer_cache = AnswerCache()
@@ -5,13 +5,14 @@ import logging
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from langchain_groq import ChatGroq
 
 from app.config import settings
 from app.models.auto_summary import AutoSummary
 from app.models.entry import Entry
 from app.models.goal import Goal, GoalProgressUpdate
 from app.schemas.auto_summary import AutoSummaryCreate
+from app.services.llm_gateway import llm_gateway
+from app.services.model_routing import RequestClass, model_router
 
 logger = logging.getLogger(__name__)
 
@@ -48,12 +49,21 @@ Important:
 
 class AutoSummaryService:
     def __init__(self):
-        self.llm = ChatGroq(
-            api_key=settings.groq_api_key,
-            model=settings.groq_model,
-            temperature=0.7,
-            max_tokens=1000,
-        )
+        self._llm = None
+
+    @property
+    def llm(self):
+        # langchain is imported on first summary, not when the summaries router loads.
+        if self._llm is None:
+            from langchain_groq import ChatGroq
+
+            self._llm = ChatGroq(
+                api_key=settings.groq_api_key,
+                base_url=settings.groq_base_url or None,
+                max_retries=0,
+                **model_router.route(RequestClass.SUMMARY).kwargs(),
+            )
+        return self._llm
 
     async def get_summaries(
         self, db: AsyncSession, user_id: UUID, limit: int = 10
@@ -210,7 +220,7 @@ class AutoSummaryService:
         )
 
         try:
-            response = await self.llm.ainvoke(prompt)
+            response = await llm_gateway.complete(RequestClass.SUMMARY, lambda: self.llm.ainvoke(prompt))
             parsed = self._parse_llm_response(response.content)
         except Exception as e:
             logger.error(f"LLM error generating summary: {e}")
@@ -1,14 +1,17 @@
 import asyncio
 import logging
+import time
 from typing import AsyncGenerator
 import httpx
 
 from app.config import settings
+from app.core import tracing
+from app.services.rate_limiter import Priority, rate_limiter
 
 logger = logging.getLogger(__name__)
 
-CARTESIA_TTS_URL = "https://api.cartesia.ai/tts/bytes"
-CARTESIA_VOICES_URL = "https://api.cartesia.ai/voices"
+CARTESIA_TTS_URL = f"{settings.cartesia_base_url}/tts/bytes"
+CARTESIA_VOICES_URL = f"{settings.cartesia_base_url}/voices"
 
 
 class CartesiaService:
@@ -26,6 +29,7 @@ class CartesiaService:
         if not self.api_key:
             raise ValueError("Cartesia API key not configured")
 
+        await rate_limiter.acquire("cartesia", Priority.VOICE)
         async with httpx.AsyncClient() as client:
             response = await client.post(
                 CARTESIA_TTS_URL,
@@ -52,6 +56,7 @@ class CartesiaService:
         if not self.api_key:
             raise ValueError("Cartesia API key not configured")
 
+        await rate_limiter.acquire("cartesia", Priority.VOICE)
         async with httpx.AsyncClient() as client:
             async with client.stream(
                 "POST",
@@ -166,6 +171,15 @@ class CartesiaStreamManager:
 
         logger.info(f"Synthesizing: {text[:50]}...")
 
+        await rate_limiter.acquire("cartesia", Priority.VOICE)
+
+        # Not a current span: this generator yields inside it.
+        trace_span = tracing.start_span("tts.sentence", {"tts.chars": len(text)})
+        start = time.perf_counter()
+        first_byte_ms = None
+        sent = 0
+        error = None
+
         async with httpx.AsyncClient() as client:
             try:
                 async with client.stream(
@@ -193,10 +207,16 @@ class CartesiaStreamManager:
                 ) as response:
                     response.raise_for_status()
                     async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                        if first_byte_ms is None:
+                            first_byte_ms = round((time.perf_counter() - start) * 1000, 1)
+                        sent += len(chunk)
                         yield chunk
             except Exception as e:
+                error = e
                 logger.error(f"TTS error: {e}")
                 raise
+            finally:
+                tracing.end_span(trace_span, error, {"tts.bytes": sent, "tts.first_byte_ms": first_byte_ms})
 
 
 cartesia_service = CartesiaService()
@@ -0,0 +1,168 @@
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID
+
+from app.config import settings
+from app.core.database import async_session_maker
+from app.models.chat import ChatSession
+from app.services.llm_gateway import llm_gateway
+from app.services.llm_usage import llm_usage
+from app.services.model_routing import RequestClass, model_router
+from app.services.token_manager import token_manager
+
+logger = logging.getLogger(__name__)
+
+# Unsummarized turns kept verbatim in the prompt.
+RECENT_WINDOW_TOKENS = 4000
+# Summarize only once this much has piled up past the window, so it happens every few turns.
+SUMMARY_BATCH_TOKENS = 1500
+SUMMARY_MAX_TOKENS = 400
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = """You maintain the running memory of a conversation between a user and JournalBuddy, their journaling companion.
+
+Update the summary with the new messages. Keep names, events, feelings, goals and anything the user asked to remember. Drop small talk. Write in third person about "the user", at most {max_words} words.
+
+CURRENT SUMMARY:
+{summary}
+
+NEW MESSAGES:
+{messages}
+
+Reply with the updated summary only."""
+
+
+@dataclass
+class MemoryState:
+    """Rolling summary of ``chat_history[:summarized_count]``; later messages are verbatim."""
+
+    summary: Optional[str] = None
+    summarized_count: int = 0
+
+
+def _message_tokens(message: dict) -> int:
+    return token_manager.count_message_tokens(message) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationMemory:
+    """Bounded conversation memory shared by text chat and voice.
+
+    The prompt gets the rolling summary plus the unsummarized tail of the
+    conversation. Once that tail outgrows ``window_tokens`` by
+    ``batch_tokens``, its oldest messages are folded into the summary, so
+    prompt size stays flat however long the session runs.
+    """
+
+    def __init__(
+        self,
+        window_tokens: int = RECENT_WINDOW_TOKENS,
+        batch_tokens: int = SUMMARY_BATCH_TOKENS,
+    ):
+        self.window_tokens = window_tokens
+        self.batch_tokens = batch_tokens
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import AsyncGroq
+
+            self._client = AsyncGroq(api_key=settings.groq_api_key, base_url=settings.groq_base_url or None, max_retries=0)
+        return self._client
+
+    def recent(self, chat_history: List[dict], state: MemoryState, max_tokens: int) -> List[dict]:
+        """Newest unsummarized messages that fit in ``max_tokens``."""
+        result: List[dict] = []
+        total = 0
+        for msg in reversed(chat_history[state.summarized_count:]):
+            tokens = _message_tokens(msg)
+            if total + tokens > max_tokens:
+                # Only while a summary is still catching up; nothing is lost for good.
+                logger.info(f"Memory window full: keeping {len(result)} of {len(chat_history) - state.summarized_count} recent messages")
+                break
+            result.insert(0, msg)
+            total += tokens
+        return result
+
+    def summary_text(self, state: MemoryState) -> Optional[str]:
+        if not state.summary:
+            return None
+        return f"Summary of the earlier conversation:\n{state.summary}"
+
+    def prompt_tokens(self, chat_history: List[dict], state: MemoryState, max_tokens: int) -> int:
+        tokens = sum(_message_tokens(m) for m in self.recent(chat_history, state, max_tokens))
+        summary = self.summary_text(state)
+        if summary:
+            tokens += token_manager.count_tokens(summary) + MESSAGE_OVERHEAD_TOKENS
+        return tokens
+
+    def _summarize_until(self, chat_history: List[dict], state: MemoryState) -> int:
+        """Index up to which messages should be folded into the summary (== summarized_count if none)."""
+        unsummarized = chat_history[state.summarized_count:]
+        tokens = [_message_tokens(m) for m in unsummarized]
+        if sum(tokens) <= self.window_tokens + self.batch_tokens:
+            return state.summarized_count
+
+        # Keep the newest window_tokens verbatim; everything older gets summarized.
+        kept = 0
+        cut = len(unsummarized)
+        while cut > 0 and kept + tokens[cut - 1] <= self.window_tokens:
+            cut -= 1
+            kept += tokens[cut]
+        return state.summarized_count + cut
+
+    def needs_summary(self, chat_history: List[dict], state: MemoryState) -> bool:
+        return self._summarize_until(chat_history, state) > state.summarized_count
+
+    async def summarize(self, chat_history: List[dict], state: MemoryState) -> MemoryState:
+        """Fold overflowing messages into the summary; returns ``state`` unchanged if not needed."""
+        until = self._summarize_until(chat_history, state)
+        if until <= state.summarized_count:
+            return state
+
+        transcript = "\n".join(
+            f"{'User' if m.get('role') == 'user' else 'JournalBuddy'}: {m.get('content', '')}"
+            for m in chat_history[state.summarized_count:until]
+        )
+        prompt = SUMMARY_PROMPT.format(
+            summary=state.summary or "(none yet)",
+            messages=transcript,
+            max_words=int(SUMMARY_MAX_TOKENS * 0.75),
+        )
+        completion = await llm_gateway.complete(
+            RequestClass.CONVERSATION_SUMMARY,
+            lambda: self.client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                **model_router.route(RequestClass.CONVERSATION_SUMMARY).kwargs(),
+            ),
+        )
+        llm_usage.record_usage("conversation_summary", completion.usage)
+        summary = (completion.choices[0].message.content or "").strip()
+        if not summary:
+            return state
+
+        logger.info(f"Summarized messages {state.summarized_count}-{until} into {token_manager.count_tokens(summary)} tokens")
+        return MemoryState(summary=summary, summarized_count=until)
+
+    async def save(self, session_id: UUID, state: MemoryState) -> None:
+        async with async_session_maker() as db:
+            session = await db.get(ChatSession, session_id)
+            if session is None:
+                return
+            # A concurrent summarizer may already have gone further.
+            if (session.summarized_message_count or 0) >= state.summarized_count:
+                return
+            session.rolling_summary = state.summary
+            session.summarized_message_count = state.summarized_count
+            await db.commit()
+
+
+def memory_state_for(session: ChatSession) -> MemoryState:
+    return MemoryState(
+        summary=session.rolling_summary,
+        summarized_count=session.summarized_message_count or 0,
+    )
+
+
+conversation_memory = ConversationMemory()
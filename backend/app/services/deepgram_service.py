@@ -5,10 +5,11 @@ from typing import Optional
 import websockets
 
 from app.config import settings
+from app.services.rate_limiter import Priority, rate_limiter
 
 logger = logging.getLogger(__name__)
 
-DEEPGRAM_WS_URL = "wss://api.deepgram.com/v1/listen"
+DEEPGRAM_WS_URL = settings.deepgram_ws_url
 
 
 class DeepgramStreamManager:
@@ -34,6 +35,7 @@ class DeepgramStreamManager:
                 "&endpointing=300"
             )
 
+            await rate_limiter.acquire("deepgram", Priority.VOICE)
             self.websocket = await websockets.connect(
                 f"{DEEPGRAM_WS_URL}{params}",
                 additional_headers={"Authorization": f"Token {self.api_key}"},
@@ -2,6 +2,8 @@ from typing import List
 import httpx
 
 from app.config import settings
+from app.core import tracing
+from app.services.rate_limiter import Priority, rate_limiter, retry_after_seconds
 
 
 class EmbeddingService:
@@ -9,41 +11,43 @@ class EmbeddingService:
         self.model = settings.embedding_model
         self.api_key = settings.openai_api_key
 
-    async def generate_embedding(self, text: str) -> List[float]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/embeddings",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "input": text,
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["data"][0]["embedding"]
-
-    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/embeddings",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "input": texts,
-                },
-                timeout=60.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return [item["embedding"] for item in data["data"]]
+    async def _embed(self, input, priority: Priority, timeout: float) -> dict:
+        attributes = {
+            "embedding.inputs": len(input) if isinstance(input, list) else 1,
+            "embedding.priority": priority.name.lower(),
+        }
+        with tracing.span("embedding.request", attributes):
+            await rate_limiter.acquire("openai", priority)
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{settings.openai_base_url}/embeddings",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "model": self.model,
+                        "input": input,
+                    },
+                    timeout=timeout,
+                )
+                if response.status_code == 429:
+                    rate_limiter.pause("openai", retry_after_seconds(response.headers))
+                response.raise_for_status()
+                data = response.json()
+            tracing.set_attributes({"embedding.tokens": (data.get("usage") or {}).get("total_tokens")})
+            return data
+
+    async def generate_embedding(self, text: str, priority: Priority = Priority.CHAT) -> List[float]:
+        """``priority``: VOICE or CHAT for query embeddings a user is waiting on, BACKGROUND for entry indexing."""
+        data = await self._embed(text, priority, timeout=30.0)
+        return data["data"][0]["embedding"]
+
+    async def generate_embeddings_batch(
+        self, texts: List[str], priority: Priority = Priority.BACKGROUND
+    ) -> List[List[float]]:
+        data = await self._embed(texts, priority, timeout=60.0)
+        return [item["embedding"] for item in data["data"]]
 
 
 embedding_service = EmbeddingService()
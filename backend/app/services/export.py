@@ -0,0 +1,200 @@
+import base64
+import csv
+import io
+import json
+import logging
+import struct
+import zipfile
+from datetime import date, datetime
+from typing import Any, AsyncGenerator, AsyncIterator, List, Literal, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import inspect as sa_inspect, select
+from sqlalchemy.orm import defer
+
+from app.core.database import read_session_maker
+from app.models.auto_summary import AutoSummary
+from app.models.chat import ChatMessage, ChatSession
+from app.models.entry import Entry
+from app.models.goal import Goal, GoalProgressUpdate
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+ExportRecord = Tuple[str, dict]
+
+EXPORT_FORMAT_VERSION = 1
+# Rows fetched per server-side cursor round trip, and records per yielded chunk.
+EXPORT_BATCH_SIZE = 500
+RECORDS_PER_CHUNK = 100
+
+CSV_FILENAMES = {
+    "entry": "entries.csv",
+    "goal": "goals.csv",
+    "goal_progress_update": "goal_progress_updates.csv",
+    "chat_session": "chat_sessions.csv",
+    "chat_message": "chat_messages.csv",
+    "summary": "summaries.csv",
+}
+
+
+def encode_embedding(embedding) -> Optional[str]:
+    """Pack an embedding as base64 little-endian float32 (~8 KB instead of ~30 KB of JSON)."""
+    if embedding is None:
+        return None
+    return base64.b64encode(struct.pack(f"<{len(embedding)}f", *embedding)).decode("ascii")
+
+
+def decode_embedding(data: str) -> List[float]:
+    raw = base64.b64decode(data, validate=True)
+    if len(raw) % 4:
+        raise ValueError(f"Embedding is {len(raw)} bytes, not a whole number of float32 values")
+    return list(struct.unpack(f"<{len(raw) // 4}f", raw))
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _serialize(obj, include_embeddings: bool) -> dict:
+    record = {}
+    for attr in sa_inspect(type(obj)).column_attrs:
+        if attr.key == "embedding":
+            if include_embeddings:
+                record["embedding"] = encode_embedding(getattr(obj, "embedding"))
+            continue
+        record[attr.key] = _json_value(getattr(obj, attr.key))
+    return record
+
+
+class ExportService:
+    """Streams a user's whole journal without loading it into memory.
+
+    Each record type is read through a server-side cursor and serialized as it
+    arrives, so memory use depends on the batch size, not the journal size.
+    """
+
+    def _queries(self, user_id: UUID, include_embeddings: bool) -> list:
+        entries = select(Entry).where(Entry.user_id == user_id).order_by(Entry.created_at)
+        if not include_embeddings:
+            entries = entries.options(defer(Entry.embedding))
+
+        return [
+            ("entry", entries),
+            ("goal", select(Goal).where(Goal.user_id == user_id).order_by(Goal.created_at)),
+            (
+                "goal_progress_update",
+                select(GoalProgressUpdate)
+                .join(Goal, GoalProgressUpdate.goal_id == Goal.id)
+                .where(Goal.user_id == user_id)
+                .order_by(GoalProgressUpdate.created_at),
+            ),
+            ("chat_session", select(ChatSession).where(ChatSession.user_id == user_id).order_by(ChatSession.created_at)),
+            (
+                "chat_message",
+                select(ChatMessage)
+                .join(ChatSession, ChatMessage.session_id == ChatSession.id)
+                .where(ChatSession.user_id == user_id)
+                .order_by(ChatMessage.session_id, ChatMessage.created_at),
+            ),
+            ("summary", select(AutoSummary).where(AutoSummary.user_id == user_id).order_by(AutoSummary.created_at)),
+        ]
+
+    async def iter_records(
+        self,
+        user_id: UUID,
+        include_embeddings: bool = False,
+    ) -> AsyncGenerator[ExportRecord, None]:
+        count = 0
+        async with read_session_maker(user_id)() as db:
+            for record_type, query in self._queries(user_id, include_embeddings):
+                result = await db.stream_scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+                async for obj in result:
+                    yield record_type, _serialize(obj, include_embeddings)
+                    count += 1
+        logger.info(f"Exported {count} records for user {user_id}")
+
+    async def ndjson_chunks(
+        self,
+        user_id: UUID,
+        records: AsyncIterator[ExportRecord],
+    ) -> AsyncGenerator[bytes, None]:
+        header = {
+            "type": "export",
+            "data": {
+                "version": EXPORT_FORMAT_VERSION,
+                "user_id": str(user_id),
+                "exported_at": datetime.utcnow().isoformat(),
+            },
+        }
+        lines = [json.dumps(header)]
+        async for record_type, data in records:
+            lines.append(json.dumps({"type": record_type, "data": data}))
+            if len(lines) >= RECORDS_PER_CHUNK:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+    async def csv_zip_chunks(self, records: AsyncIterator[ExportRecord]) -> AsyncGenerator[bytes, None]:
+        """One CSV per record type inside a zip, written through a non-seekable sink."""
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            member = None
+            current_type = None
+            text = io.StringIO()
+            writer = csv.writer(text)
+            pending = 0
+
+            async for record_type, data in records:
+                if record_type != current_type:
+                    if member is not None:
+                        member.write(text.getvalue().encode())
+                        member.close()
+                    text.seek(0)
+                    text.truncate()
+                    member = archive.open(CSV_FILENAMES[record_type], "w", force_zip64=True)
+                    current_type = record_type
+                    writer.writerow(data.keys())
+
+                writer.writerow(data.values())
+                pending += 1
+                if pending >= RECORDS_PER_CHUNK:
+                    member.write(text.getvalue().encode())
+                    text.seek(0)
+                    text.truncate()
+                    pending = 0
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+
+            if member is not None:
+                member.write(text.getvalue().encode())
+                member.close()
+        yield sink.drain()
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only buffer that zipfile can stream into; drained after each batch."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+export_service = ExportService()
@@ -1,9 +1,10 @@
-from typing import Optional, List, Tuple
+from bisect import bisect_right
+from typing import Optional, List, Sequence, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
 import logging
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
@@ -27,23 +28,24 @@ XP_VALUES = {
     "achievement_unlocked": 25,
 }
 
-LEVEL_THRESHOLDS = [
-    0,      # Level 1
-    100,    # Level 2
-    300,    # Level 3
-    600,    # Level 4
-    1000,   # Level 5
-    1500,   # Level 6
-    2100,   # Level 7
-    2800,   # Level 8
-    3600,   # Level 9
-    4500,   # Level 10
-    5500,   # Level 11
-    6600,   # Level 12
-    7800,   # Level 13
-    9100,   # Level 14
-    10500,  # Level 15
-]
+# Each level costs 100 XP more than the previous one: 0, 100, 300, 600, 1000, ...
+LEVEL_XP_STEP = 50
+
+
+def level_threshold(level: int) -> int:
+    """Total XP needed to reach ``level``."""
+    return LEVEL_XP_STEP * level * (level - 1)
+
+
+# LEVEL_THRESHOLDS[i] is the XP needed for level i + 1; extended on demand by _ensure_thresholds.
+LEVEL_THRESHOLDS: List[int] = [level_threshold(level) for level in range(1, 101)]
+
+
+def _ensure_thresholds(total_xp: int) -> None:
+    # Keep at least one threshold above total_xp so the next level always exists.
+    while LEVEL_THRESHOLDS[-1] <= total_xp:
+        start = len(LEVEL_THRESHOLDS) + 1
+        LEVEL_THRESHOLDS.extend(level_threshold(level) for level in range(start, start * 2))
 
 ACHIEVEMENTS = {
     "first_entry": {
@@ -149,21 +151,62 @@ ACHIEVEMENTS = {
 
 class GamificationService:
     def calculate_level(self, total_xp: int) -> Tuple[int, int, int]:
-        level = 1
-        for i, threshold in enumerate(LEVEL_THRESHOLDS):
-            if total_xp >= threshold:
-                level = i + 1
-            else:
-                break
+        _ensure_thresholds(total_xp)
+        level = max(bisect_right(LEVEL_THRESHOLDS, total_xp), 1)
 
-        current_threshold = LEVEL_THRESHOLDS[level - 1] if level <= len(LEVEL_THRESHOLDS) else LEVEL_THRESHOLDS[-1]
-        next_threshold = LEVEL_THRESHOLDS[level] if level < len(LEVEL_THRESHOLDS) else current_threshold + 1500
+        current_threshold = LEVEL_THRESHOLDS[level - 1]
+        next_threshold = LEVEL_THRESHOLDS[level]
 
         xp_progress_in_level = total_xp - current_threshold
         xp_for_next_level = next_threshold - current_threshold
 
         return level, xp_for_next_level, xp_progress_in_level
 
+    def calculate_levels(self, total_xps: Sequence[int]) -> List[int]:
+        """Levels for many XP totals at once (one table extension, then a bisect each)."""
+        if not total_xps:
+            return []
+        _ensure_thresholds(max(total_xps))
+        return [max(bisect_right(LEVEL_THRESHOLDS, xp), 1) for xp in total_xps]
+
+    async def recompute_levels(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """Rewrite ``users.level`` from ``total_xp`` for every user, e.g. after a curve change.
+
+        Walks users in primary-key batches and only writes rows whose level changed.
+        A row whose XP moved since it was read is skipped; award_xp already set its level.
+        """
+        users = User.__table__
+        stmt = (
+            update(users)
+            .where(users.c.id == bindparam("b_id"), users.c.total_xp == bindparam("b_total_xp"))
+            .values(level=bindparam("b_level"))
+        )
+
+        updated = 0
+        last_id = None
+        while True:
+            query = select(User.id, User.total_xp, User.level).order_by(User.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            levels = self.calculate_levels([row.total_xp for row in rows])
+            changes = [
+                {"b_id": row.id, "b_total_xp": row.total_xp, "b_level": level}
+                for row, level in zip(rows, levels)
+                if level != row.level
+            ]
+            if changes:
+                await db.execute(stmt, changes)
+                updated += len(changes)
+            await db.commit()
+            last_id = rows[-1].id
+
+        logger.info(f"Recomputed levels: {updated} users changed")
+        return updated
+
     async def award_xp(
         self,
         db: AsyncSession,
@@ -0,0 +1,404 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import select, update, or_, and_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import async_session_maker
+from app.models.chat import ChatMessage, ChatSession
+from app.models.entry import Entry
+from app.models.goal import Goal
+from app.models.job import Job
+from app.models.xp_event import XPEvent
+from app.services.conversation_memory import conversation_memory, memory_state_for
+from app.services.embedding import embedding_service
+from app.services.gamification import gamification_service
+from app.services.rate_limiter import Priority
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+# A job still "running" after this long was orphaned by a crashed worker and is reclaimed.
+LOCK_TIMEOUT_SECONDS = 300
+RETRY_BASE_DELAY_SECONDS = 5.0
+RETRY_MAX_DELAY_SECONDS = 600.0
+SHUTDOWN_GRACE_SECONDS = 10.0
+
+
+class JobService:
+    """Durable post-commit work backed by the ``jobs`` outbox table.
+
+    Jobs are staged on the caller's session with ``enqueue`` so they commit
+    atomically with the rows that produced them. A worker pool (in the API
+    process, or standalone via ``python -m app.worker``) claims them with
+    ``FOR UPDATE SKIP LOCKED``, retries failures with exponential backoff and
+    reclaims jobs orphaned by a crash.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.job_concurrency,
+        poll_interval: float = settings.job_poll_interval_seconds,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner_task: Optional[asyncio.Task] = None
+        self._active: Set[asyncio.Task] = set()
+
+    def handler(self, job_type: str):
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[job_type] = func
+            return func
+        return register
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        payload: dict,
+        user_id: Optional[UUID] = None,
+        dedup_key: Optional[str] = None,
+        max_attempts: int = settings.job_max_attempts,
+    ) -> None:
+        """Stage a job in the caller's transaction; it becomes visible on commit.
+
+        With a ``dedup_key``, nothing is added while a pending job with the same
+        key exists. Handlers read current state when they run, so the pending
+        job already covers the newer change.
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        now = datetime.utcnow()
+        stmt = pg_insert(Job).values(
+            user_id=user_id,
+            job_type=job_type,
+            payload=payload,
+            status="pending",
+            attempts=0,
+            max_attempts=max_attempts,
+            dedup_key=dedup_key,
+            run_after=now,
+            created_at=now,
+            updated_at=now,
+        )
+        if dedup_key is not None:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=["dedup_key"],
+                index_where=text("status = 'pending'"),
+            )
+        await db.execute(stmt)
+
+    def notify(self) -> None:
+        """Wake the in-process runner; call after committing enqueued jobs."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim(self, limit: int) -> List[Job]:
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=LOCK_TIMEOUT_SECONDS)
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(Job)
+                .where(
+                    or_(
+                        and_(Job.status == "pending", Job.run_after <= now),
+                        and_(Job.status == "running", Job.locked_at < stale),
+                    )
+                )
+                .order_by(Job.run_after)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            jobs = list(result.scalars().all())
+            for job in jobs:
+                job.status = "running"
+                job.locked_at = now
+                job.attempts += 1
+            await db.commit()
+            return jobs
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1), RETRY_MAX_DELAY_SECONDS)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _execute(self, job: Job) -> None:
+        handler = self._handlers.get(job.job_type)
+        async with async_session_maker() as db:
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job type {job.job_type}")
+                await handler(db, job.payload)
+                values = {"status": "done", "locked_at": None, "last_error": None}
+                logger.info(f"Job {job.id} ({job.job_type}) done")
+            except Exception as e:
+                await db.rollback()
+                if job.attempts < job.max_attempts:
+                    delay = self._retry_delay(job.attempts)
+                    values = {
+                        "status": "pending",
+                        "locked_at": None,
+                        "last_error": str(e),
+                        "run_after": datetime.utcnow() + timedelta(seconds=delay),
+                    }
+                    logger.warning(f"Job {job.id} ({job.job_type}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {e}")
+                else:
+                    values = {"status": "failed", "locked_at": None, "last_error": str(e)}
+                    logger.error(f"Job {job.id} ({job.job_type}) failed after {job.attempts} attempts: {e}")
+
+            values["updated_at"] = datetime.utcnow()
+            try:
+                await db.execute(update(Job).where(Job.id == job.id).values(**values))
+                await db.commit()
+            except IntegrityError:
+                # A newer pending job with the same dedup key was queued meanwhile; it supersedes this retry.
+                await db.rollback()
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job.id)
+                    .values(status="done", locked_at=None, last_error="Superseded by a newer pending job")
+                )
+                await db.commit()
+
+    def _spawn(self, job: Job) -> None:
+        task = asyncio.create_task(self._execute(job))
+        self._active.add(task)
+        task.add_done_callback(self._on_job_finished)
+
+    def _on_job_finished(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        # A slot freed up; look for more work right away.
+        self.notify()
+
+    async def run(self) -> None:
+        """Process jobs until cancelled, keeping at most ``concurrency`` in flight."""
+        self._wakeup = asyncio.Event()
+        logger.info(f"Job runner started (concurrency={self.concurrency})")
+        while True:
+            self._wakeup.clear()
+            free_slots = self.concurrency - len(self._active)
+            claimed: List[Job] = []
+            if free_slots > 0:
+                try:
+                    claimed = await self._claim(free_slots)
+                except Exception as e:
+                    logger.error(f"Job runner error: {e}")
+                for job in claimed:
+                    self._spawn(job)
+
+            if claimed and len(claimed) == free_slots:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_pending(self) -> int:
+        """Claim and run everything that is due now, then return. Used by CLIs and scripts."""
+        processed = 0
+        while True:
+            jobs = await self._claim(self.concurrency)
+            if not jobs:
+                return processed
+            await asyncio.gather(*(self._execute(job) for job in jobs))
+            processed += len(jobs)
+
+    def start(self) -> None:
+        if self._runner_task is None:
+            self._runner_task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._runner_task is not None:
+            self._runner_task.cancel()
+            try:
+                await self._runner_task
+            except asyncio.CancelledError:
+                pass
+            self._runner_task = None
+            self._wakeup = None
+
+        if self._active:
+            # Unfinished jobs stay "running" and are reclaimed after LOCK_TIMEOUT_SECONDS.
+            await asyncio.wait(self._active, timeout=SHUTDOWN_GRACE_SECONDS)
+
+
+job_service = JobService()
+
+
+def entry_xp_event_type(journal_type: Optional[str]) -> str:
+    if journal_type == "morning":
+        return "morning_journal"
+    if journal_type == "evening":
+        return "evening_journal"
+    return "entry_created"
+
+
+async def _award_xp_once(db: AsyncSession, user_id: UUID, event_type: str, reference_id: UUID) -> None:
+    # A crash between awarding and marking the job done must not award twice.
+    result = await db.execute(
+        select(XPEvent.id).where(
+            XPEvent.user_id == user_id,
+            XPEvent.reference_id == reference_id,
+            XPEvent.event_type == event_type,
+        )
+    )
+    if result.first() is None:
+        await gamification_service.award_xp(db, user_id, event_type, reference_id)
+    await gamification_service.check_achievements(db, user_id)
+
+
+@job_service.handler("award_entry_xp")
+async def award_entry_xp(db: AsyncSession, payload: dict) -> None:
+    await _award_xp_once(
+        db,
+        UUID(payload["user_id"]),
+        entry_xp_event_type(payload.get("journal_type")),
+        UUID(payload["entry_id"]),
+    )
+
+
+@job_service.handler("award_goal_xp")
+async def award_goal_xp(db: AsyncSession, payload: dict) -> None:
+    await _award_xp_once(
+        db,
+        UUID(payload["user_id"]),
+        payload["event_type"],
+        UUID(payload["goal_id"]),
+    )
+
+
+@job_service.handler("generate_entry_embedding")
+async def generate_entry_embedding(db: AsyncSession, payload: dict) -> None:
+    entry = await db.get(Entry, UUID(payload["entry_id"]))
+    if entry is None:
+        logger.warning(f"Entry {payload['entry_id']} not found when generating embedding")
+        return
+    entry.embedding = await embedding_service.generate_embedding(entry.content, priority=Priority.BACKGROUND)
+    await db.commit()
+
+
+@job_service.handler("generate_entry_embeddings_batch")
+async def generate_entry_embeddings_batch(db: AsyncSession, payload: dict) -> None:
+    entry_ids = [UUID(entry_id) for entry_id in payload["entry_ids"]]
+    result = await db.execute(
+        select(Entry).where(Entry.id.in_(entry_ids), Entry.embedding.is_(None))
+    )
+    entries = list(result.scalars().all())
+    if not entries:
+        return
+    embeddings = await embedding_service.generate_embeddings_batch([e.content for e in entries])
+    for entry, embedding in zip(entries, embeddings):
+        entry.embedding = embedding
+    await db.commit()
+
+
+@job_service.handler("check_achievements")
+async def check_user_achievements(db: AsyncSession, payload: dict) -> None:
+    await gamification_service.check_achievements(db, UUID(payload["user_id"]))
+
+
+@job_service.handler("summarize_chat_session")
+async def summarize_chat_session(db: AsyncSession, payload: dict) -> None:
+    session_id = UUID(payload["session_id"])
+    session = await db.get(ChatSession, session_id)
+    if session is None:
+        return
+    result = await db.execute(
+        select(ChatMessage.role, ChatMessage.content, ChatMessage.token_count)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.created_at)
+    )
+    chat_history = [
+        {"role": role, "content": content, "token_count": token_count}
+        for role, content, token_count in result.all()
+    ]
+    state = memory_state_for(session)
+    # Give the connection back before the LLM call; save() opens its own session.
+    await db.close()
+    state = await conversation_memory.summarize(chat_history, state)
+    await conversation_memory.save(session_id, state)
+
+
+@job_service.handler("recompute_user_levels")
+async def recompute_user_levels(db: AsyncSession, payload: dict) -> None:
+    await gamification_service.recompute_levels(db, batch_size=payload.get("batch_size", 1000))
+
+
+async def enqueue_entry_jobs(
+    db: AsyncSession,
+    entry: Entry,
+    award_xp: bool = True,
+) -> None:
+    """Queue the standard post-commit work for a new or edited entry."""
+    if award_xp:
+        await job_service.enqueue(
+            db,
+            "award_entry_xp",
+            {"user_id": str(entry.user_id), "entry_id": str(entry.id), "journal_type": entry.journal_type},
+            user_id=entry.user_id,
+            dedup_key=f"xp:entry:{entry.id}",
+        )
+    await job_service.enqueue(
+        db,
+        "generate_entry_embedding",
+        {"entry_id": str(entry.id)},
+        user_id=entry.user_id,
+        dedup_key=f"embedding:{entry.id}",
+    )
+
+
+async def enqueue_goal_xp(db: AsyncSession, goal: Goal, event_type: str) -> None:
+    await job_service.enqueue(
+        db,
+        "award_goal_xp",
+        {"user_id": str(goal.user_id), "goal_id": str(goal.id), "event_type": event_type},
+        user_id=goal.user_id,
+        dedup_key=f"xp:{event_type}:{goal.id}",
+    )
+
+
+async def enqueue_import_jobs(
+    db: AsyncSession,
+    user_id: UUID,
+    entry_ids: List[UUID],
+    batch_size: int = 100,
+) -> None:
+    """Queue embeddings for imported entries in API-sized batches."""
+    for i in range(0, len(entry_ids), batch_size):
+        batch = entry_ids[i:i + batch_size]
+        await job_service.enqueue(
+            db,
+            "generate_entry_embeddings_batch",
+            {"entry_ids": [str(entry_id) for entry_id in batch]},
+            user_id=user_id,
+        )
+
+
+async def enqueue_achievement_check(db: AsyncSession, user_id: UUID) -> None:
+    await job_service.enqueue(
+        db,
+        "check_achievements",
+        {"user_id": str(user_id)},
+        user_id=user_id,
+        dedup_key=f"achievements:{user_id}",
+    )
+
+
+async def enqueue_session_summary(db: AsyncSession, session: ChatSession) -> None:
+    await job_service.enqueue(
+        db,
+        "summarize_chat_session",
+        {"session_id": str(session.id)},
+        user_id=session.user_id,
+        dedup_key=f"memory:{session.id}",
+    )
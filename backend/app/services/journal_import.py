@@ -0,0 +1,214 @@
+import codecs
+import csv
+import json
+import logging
+import struct
+from collections import deque
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import record_user_write
+from app.crud.entry import entry_crud
+from app.schemas.entry import EntryImport, EntryImportError, EntryImportResult
+from app.services.export import decode_embedding
+from app.services.jobs import enqueue_achievement_check, enqueue_import_jobs, job_service
+from app.services.session_cache import session_context_cache
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["ndjson", "csv"]
+# (line number, raw record or None, parse error or None)
+RawRecord = Tuple[int, Optional[dict], Optional[str]]
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode an upload read in pieces into lines, keeping their line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    partial = ""
+    async for chunk in chunks:
+        *lines, partial = (partial + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    partial += decoder.decode(b"", final=True)
+    if partial:
+        yield partial
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRecord]:
+    """Plain entry objects, or the {"type", "data"} lines written by /export."""
+    line_no = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        if "type" in record and "data" in record:
+            if record["type"] != "entry":
+                continue
+            record = record["data"]
+        yield line_no, record, None
+
+
+class _LineFeed:
+    """Lines handed to csv.DictReader a record at a time; running dry just pauses it."""
+
+    def __init__(self):
+        self.lines: deque = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRecord]:
+    feed = _LineFeed()
+    reader = csv.DictReader(feed)
+    record_lines: List[str] = []
+    quotes = 0
+    async for line in _iter_lines(chunks):
+        record_lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # Inside a quoted field that continues on the next line.
+            continue
+        feed.lines.extend(record_lines)
+        record_lines, quotes = [], 0
+        try:
+            row = next(reader)
+        except StopIteration:
+            # The header, or a blank line.
+            continue
+        yield reader.line_num, {k: (v if v != "" else None) for k, v in row.items() if k}, None
+
+
+class ImportService:
+    """Bulk-loads historical entries.
+
+    Entries are inserted in multi-row chunks, each committed together with the
+    embedding jobs it needs. Achievements are checked once at the end instead of
+    per entry, for whatever was committed, and imported history doesn't award XP.
+    """
+
+    def _parse(self, record: dict) -> Tuple[EntryImport, Optional[List[float]]]:
+        embedding = None
+        encoded = record.pop("embedding", None)
+        if encoded:
+            if not isinstance(encoded, str):
+                raise ValueError("embedding must be a base64 string")
+            embedding = decode_embedding(encoded)
+            if len(embedding) != settings.embedding_dimension:
+                # A different embedding model; regenerate instead of mixing vector spaces.
+                embedding = None
+        return EntryImport.model_validate(record), embedding
+
+    async def _insert_chunk(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        entries: List[EntryImport],
+        embeddings: List[Optional[List[float]]],
+    ) -> None:
+        entry_ids = await entry_crud.create_many(db, entries, user_id, embeddings=embeddings)
+        await enqueue_import_jobs(
+            db, user_id, [entry_id for entry_id, emb in zip(entry_ids, embeddings) if emb is None]
+        )
+        await db.commit()
+
+    async def _finish(self, db: AsyncSession, user_id: UUID, imported: int) -> None:
+        # Core inserts bypass the ORM events that normally do these two.
+        record_user_write(user_id)
+        session_context_cache.invalidate_user(user_id)
+        try:
+            # Drop anything left over from a chunk that was cut off mid-insert.
+            await db.rollback()
+            await enqueue_achievement_check(db, user_id)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Could not queue the achievement check after importing {imported} entries for user {user_id}: {e}")
+        job_service.notify()
+
+    async def import_entries(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        chunks: AsyncIterator[bytes],
+        format: ImportFormat = "ndjson",
+    ) -> EntryImportResult:
+        """Import an upload read in pieces.
+
+        If a chunk can't be saved the import stops there: earlier chunks stay
+        committed, and ``stopped_at_line`` says where a retry should resume.
+        """
+        records = _iter_csv(chunks) if format == "csv" else _iter_ndjson(chunks)
+        imported = 0
+        errors: List[EntryImportError] = []
+        failed = 0
+        stopped_at_line = None
+        entries: List[EntryImport] = []
+        embeddings: List[Optional[List[float]]] = []
+        chunk_start = last_line = 0
+
+        try:
+            async for line_no, record, parse_error in records:
+                last_line = line_no
+                if parse_error is None:
+                    try:
+                        entry_in, embedding = self._parse(record)
+                        if not entries:
+                            chunk_start = line_no
+                        entries.append(entry_in)
+                        embeddings.append(embedding)
+                    except (ValidationError, ValueError, TypeError, struct.error) as e:
+                        parse_error = str(e)
+                if parse_error is not None:
+                    failed += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append(EntryImportError(line=line_no, error=parse_error))
+                    continue
+
+                if len(entries) >= IMPORT_CHUNK_SIZE:
+                    await self._insert_chunk(db, user_id, entries, embeddings)
+                    imported += len(entries)
+                    entries, embeddings = [], []
+
+            if entries:
+                await self._insert_chunk(db, user_id, entries, embeddings)
+                imported += len(entries)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"Import for user {user_id} stopped at line {chunk_start}: {e}")
+            failed += len(entries)
+            stopped_at_line = chunk_start
+            errors.append(EntryImportError(
+                line=chunk_start,
+                error=f"Lines {chunk_start}-{last_line} could not be saved; the import stopped here",
+            ))
+        finally:
+            if imported:
+                await self._finish(db, user_id, imported)
+
+        logger.info(f"Imported {imported} entries for user {user_id} ({failed} failed)")
+        return EntryImportResult(imported=imported, failed=failed, errors=errors, stopped_at_line=stopped_at_line)
+
+
+import_service = ImportService()
@@ -0,0 +1,56 @@
+from collections import deque
+from typing import Dict
+
+
+class LatencyStats:
+    """Call counters and recent latencies for one operation."""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.recent.append(elapsed)
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class LatencyRegistry:
+    """Named ``LatencyStats``, created on first use."""
+
+    def __init__(self):
+        self.stats: Dict[str, LatencyStats] = {}
+
+    def __getitem__(self, name: str) -> LatencyStats:
+        if name not in self.stats:
+            self.stats[name] = LatencyStats()
+        return self.stats[name]
+
+    def snapshot(self) -> list:
+        return [
+            {
+                "source": name,
+                "count": s.count,
+                "timeouts": s.timeouts,
+                "errors": s.errors,
+                "avg_ms": round(s.total / s.count * 1000, 2) if s.count else 0.0,
+                "p95_ms": round(s.percentile(0.95) * 1000, 2),
+                "max_ms": round(s.max * 1000, 2),
+            }
+            for name, s in sorted(self.stats.items())
+        ]
+
+
+# Per-source latency of the chat agent's context retrieval.
+context_latency = LatencyRegistry()
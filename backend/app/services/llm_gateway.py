@@ -0,0 +1,389 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from app.config import settings
+from app.core import tracing
+from app.services.latency import LatencyRegistry
+from app.services.model_routing import RequestClass
+from app.services.rate_limiter import Priority, rate_limiter, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# groq SDK errors (langchain_groq surfaces the same ones) that are worth another try.
+# Matched by name so this module doesn't import the SDK.
+RETRYABLE_ERRORS = {
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+}
+
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 4.0
+# Hedge only once there are enough samples for a meaningful p95, and never sooner than this.
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.3
+
+
+class LLMUnavailableError(Exception):
+    """The provider's circuit is open, it kept failing until the deadline, or we're at capacity."""
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    # Whole call, retries and backoff included
+    deadline: float
+    # Per attempt: until the response, or the first chunk of a stream
+    first_token_timeout: float
+    # Between chunks once a stream is flowing (it can't be retried at that point)
+    chunk_timeout: float
+    retries: int
+    # Race a second request when the first is slower than this class's p95
+    hedge: bool = False
+
+
+CALL_POLICIES: Dict[RequestClass, CallPolicy] = {
+    # The chat model reasons before its first visible token.
+    RequestClass.TEXT_CHAT: CallPolicy(deadline=120.0, first_token_timeout=45.0, chunk_timeout=30.0, retries=2),
+    RequestClass.VOICE_TURN: CallPolicy(deadline=15.0, first_token_timeout=6.0, chunk_timeout=5.0, retries=1, hedge=True),
+    RequestClass.SUMMARY: CallPolicy(deadline=180.0, first_token_timeout=60.0, chunk_timeout=30.0, retries=3),
+    RequestClass.CONVERSATION_SUMMARY: CallPolicy(deadline=60.0, first_token_timeout=20.0, chunk_timeout=10.0, retries=2),
+    RequestClass.SESSION_EXTRACTION: CallPolicy(deadline=30.0, first_token_timeout=15.0, chunk_timeout=10.0, retries=2),
+}
+
+
+REQUEST_PRIORITIES: Dict[RequestClass, Priority] = {
+    RequestClass.VOICE_TURN: Priority.VOICE,
+    RequestClass.TEXT_CHAT: Priority.CHAT,
+    RequestClass.SUMMARY: Priority.BACKGROUND,
+    RequestClass.CONVERSATION_SUMMARY: Priority.BACKGROUND,
+    RequestClass.SESSION_EXTRACTION: Priority.BACKGROUND,
+}
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    if type(error).__name__ in RETRYABLE_ERRORS:
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class CircuitBreaker:
+    """Opens after consecutive provider failures; lets one probe through every reset_seconds."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self._changed_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        # Open, or half-open with a probe that never reported back.
+        if time.monotonic() - self._changed_at < self.reset_seconds:
+            return False
+        self.state = "half_open"
+        self._changed_at = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info(f"Circuit {self.name} closed")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"Circuit {self.name} opened after {self.failures} failures")
+            self.state = "open"
+            self._changed_at = time.monotonic()
+
+
+class _OpenStream:
+    """A provider stream whose first chunk has arrived, holding its concurrency slot."""
+
+    _EMPTY = object()
+
+    def __init__(self, source: Any, iterator: Any, first: Any, slot: asyncio.Semaphore):
+        self.source = source
+        self.iterator = iterator
+        self.first = first
+        self._slot = slot
+
+    async def close(self) -> None:
+        for obj in (self.iterator, self.source):
+            closer = getattr(obj, "aclose", None) or getattr(obj, "close", None)
+            if closer is None:
+                continue
+            try:
+                result = closer()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.debug(f"Error closing LLM stream: {e}")
+        if self._slot is not None:
+            self._slot.release()
+            self._slot = None
+
+
+class LLMGateway:
+    """The single path from the app to LLM providers.
+
+    Every call gets a deadline and a per-attempt timeout, retries retryable
+    failures with jittered exponential backoff, and waits for one of a bounded
+    number of concurrency slots per provider. A circuit breaker per provider
+    makes callers fail fast with ``LLMUnavailableError`` (which they turn into a
+    canned reply) while the provider is down. Voice turns may also hedge: when
+    the first request is slower than that class's p95 time to first token, a
+    second one is raised and whichever answers first wins.
+
+    Streams can only be retried or hedged before their first chunk; after that
+    a failure propagates to the caller.
+    """
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        # Time to the response (or first chunk) per request class
+        self.latency = LatencyRegistry()
+        self.hedged_requests = 0
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(
+                provider, settings.llm_breaker_failure_threshold, settings.llm_breaker_reset_seconds
+            )
+        return self.breakers[provider]
+
+    def _slot(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._slots:
+            self._slots[provider] = asyncio.Semaphore(settings.llm_max_concurrency)
+        return self._slots[provider]
+
+    async def _acquire(self, provider: str, priority: Priority, deadline: float) -> asyncio.Semaphore:
+        # Waiting for the rate limiter or a slot is our own backpressure, not a provider failure.
+        try:
+            await asyncio.wait_for(
+                rate_limiter.acquire(provider, priority), max(deadline - time.monotonic(), 0)
+            )
+        except asyncio.TimeoutError:
+            raise LLMUnavailableError(f"{provider} request budget exhausted")
+
+        slot = self._slot(provider)
+        try:
+            await asyncio.wait_for(slot.acquire(), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            raise LLMUnavailableError(f"Too many concurrent {provider} calls")
+        return slot
+
+    def _hedge_delay(self, request_class: RequestClass) -> Optional[float]:
+        stats = self.latency[request_class.value]
+        if len(stats.recent) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(stats.percentile(0.95), HEDGE_MIN_DELAY_SECONDS)
+
+    async def _race(
+        self,
+        request_class: RequestClass,
+        policy: CallPolicy,
+        attempt: Callable[[], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]],
+    ) -> T:
+        """One try, with a hedged second request if the policy allows and the first is slow."""
+        hedge_delay = self._hedge_delay(request_class) if policy.hedge else None
+        if hedge_delay is None or hedge_delay >= policy.first_token_timeout:
+            return await attempt()
+
+        tasks: List[asyncio.Task] = [asyncio.create_task(attempt())]
+        winner: Optional[asyncio.Task] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                self.hedged_requests += 1
+                tracing.add_event("llm.hedged", {"llm.hedge_delay_ms": round(hedge_delay * 1000, 1)})
+                logger.info(f"Hedging {request_class.value} request after {hedge_delay:.2f}s")
+                tasks.append(asyncio.create_task(attempt()))
+
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in done if not t.exception()), None)
+            if winner is None:
+                raise tasks[0].exception()
+            return winner.result()
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                    continue
+                if discard is not None and not task.cancelled() and not task.exception():
+                    await discard(task.result())
+
+    async def _with_retries(
+        self,
+        request_class: RequestClass,
+        provider: str,
+        attempt: Callable[[float, float], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> T:
+        policy = CALL_POLICIES[request_class]
+        breaker = self.breaker(provider)
+        stats = self.latency[request_class.value]
+        deadline = time.monotonic() + policy.deadline
+        last_error: Optional[BaseException] = None
+
+        for attempt_no in range(policy.retries + 1):
+            if not breaker.allow():
+                raise LLMUnavailableError(f"{provider} circuit is open")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            timeout = min(policy.first_token_timeout, remaining)
+            start = time.perf_counter()
+            try:
+                result = await self._race(
+                    request_class, policy, lambda: attempt(timeout, deadline), discard
+                )
+            except LLMUnavailableError:
+                raise
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                if getattr(e, "status_code", None) == 429 or type(e).__name__ == "RateLimitError":
+                    # Our budget is set too high for the key; everyone backs off, not just this call.
+                    rate_limiter.pause(
+                        provider, retry_after_seconds(getattr(getattr(e, "response", None), "headers", None))
+                    )
+                breaker.record_failure()
+                if isinstance(e, asyncio.TimeoutError):
+                    stats.timeouts += 1
+                else:
+                    stats.errors += 1
+                last_error = e
+                tracing.add_event("llm.attempt_failed", {"llm.attempt": attempt_no + 1, "error": repr(e)})
+                logger.warning(f"{request_class.value} attempt {attempt_no + 1} failed: {e!r}")
+                if attempt_no < policy.retries:
+                    backoff = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt_no)
+                    await asyncio.sleep(min(backoff * random.uniform(0.5, 1.5), max(deadline - time.monotonic(), 0)))
+                continue
+
+            breaker.record_success()
+            stats.record(time.perf_counter() - start)
+            tracing.set_attributes({"llm.attempts": attempt_no + 1})
+            return result
+
+        raise LLMUnavailableError(f"{request_class.value} failed: {last_error!r}")
+
+    async def complete(
+        self,
+        request_class: RequestClass,
+        call: Callable[[], Awaitable[T]],
+        provider: str = "groq",
+    ) -> T:
+        """Run a non-streaming call, e.g. ``lambda: llm.ainvoke(prompt)``."""
+
+        async def attempt(timeout: float, deadline: float) -> T:
+            slot = await self._acquire(provider, REQUEST_PRIORITIES[request_class], deadline)
+            try:
+                return await asyncio.wait_for(call(), timeout)
+            finally:
+                slot.release()
+
+        with tracing.span("llm.complete", {"llm.request_class": request_class.value, "llm.provider": provider}):
+            return await self._with_retries(request_class, provider, attempt)
+
+    async def stream(
+        self,
+        request_class: RequestClass,
+        open_stream: Callable[[], Any],
+        provider: str = "groq",
+    ) -> AsyncGenerator[Any, None]:
+        """Iterate a streaming call; ``open_stream`` returns an async iterator, or an awaitable of one."""
+        policy = CALL_POLICIES[request_class]
+
+        async def attempt(timeout: float, deadline: float) -> _OpenStream:
+            slot = await self._acquire(provider, REQUEST_PRIORITIES[request_class], deadline)
+            opened = _OpenStream(None, None, _OpenStream._EMPTY, slot)
+            try:
+                async def first_chunk():
+                    source = open_stream()
+                    if inspect.isawaitable(source):
+                        source = await source
+                    opened.source = source
+                    opened.iterator = source.__aiter__()
+                    try:
+                        opened.first = await opened.iterator.__anext__()
+                    except StopAsyncIteration:
+                        pass
+
+                await asyncio.wait_for(first_chunk(), timeout)
+            except BaseException:
+                await opened.close()
+                raise
+            return opened
+
+        async def discard(opened: _OpenStream) -> None:
+            await opened.close()
+
+        trace_span = tracing.start_span(
+            "llm.stream", {"llm.request_class": request_class.value, "llm.provider": provider}
+        )
+        try:
+            with tracing.use_span(trace_span):
+                opened = await self._with_retries(request_class, provider, attempt, discard)
+        except Exception as e:
+            tracing.end_span(trace_span, e)
+            raise
+
+        chunks = 0
+        error: Optional[BaseException] = None
+        try:
+            if opened.first is _OpenStream._EMPTY:
+                return
+            chunks += 1
+            yield opened.first
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(opened.iterator.__anext__(), policy.chunk_timeout)
+                except StopAsyncIteration:
+                    break
+                chunks += 1
+                yield chunk
+        except Exception as e:
+            error = e
+            if _is_retryable(e):
+                self.breaker(provider).record_failure()
+            raise
+        finally:
+            await opened.close()
+            tracing.end_span(trace_span, error, {"llm.chunks": chunks})
+
+    def snapshot(self) -> dict:
+        return {
+            "breakers": [
+                {"provider": b.name, "state": b.state, "failures": b.failures}
+                for b in self.breakers.values()
+            ],
+            "latency": self.latency.snapshot(),
+            "hedged_requests": self.hedged_requests,
+        }
+
+
+llm_gateway = LLMGateway()
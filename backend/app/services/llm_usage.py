@@ -0,0 +1,106 @@
+import logging
+from typing import Any, Dict, Optional
+
+from app.core import tracing
+
+logger = logging.getLogger(__name__)
+
+
+def _get(obj: Any, key: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+class CallUsageStats:
+    """Token counters for one call site."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> None:
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+
+class LLMUsageStats:
+    """Per-process prompt/completion token counts, including provider prompt-cache hits.
+
+    Prompts are laid out with a stable prefix (system prompt, goals) so the
+    provider can reuse it across turns; ``cached_tokens`` shows how much of
+    each prompt actually was.
+    """
+
+    def __init__(self):
+        self.sources: Dict[str, CallUsageStats] = {}
+
+    def _record(self, source: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> None:
+        if source not in self.sources:
+            self.sources[source] = CallUsageStats()
+        self.sources[source].record(prompt_tokens, cached_tokens, completion_tokens)
+        # An event rather than attributes: one span can cover several calls (tool loops).
+        tracing.add_event("llm.usage", {
+            "llm.source": source,
+            "llm.prompt_tokens": prompt_tokens,
+            "llm.cached_tokens": cached_tokens,
+            "llm.completion_tokens": completion_tokens,
+        })
+
+    def record_usage(self, source: str, usage: Any) -> None:
+        """Record an OpenAI-style ``usage`` object (groq completions and stream chunks)."""
+        if usage is None:
+            return
+        details = _get(usage, "prompt_tokens_details")
+        cached = _get(details, "cached_tokens") or 0
+        self._record(
+            source,
+            _get(usage, "prompt_tokens") or 0,
+            cached,
+            _get(usage, "completion_tokens") or 0,
+        )
+
+    def record_chunk(self, source: str, chunk: Any) -> None:
+        """Record usage from a stream chunk; groq only sends it (under ``x_groq``) on the last one."""
+        usage = _get(chunk, "usage") or _get(_get(chunk, "x_groq"), "usage")
+        self.record_usage(source, usage)
+
+    def record_usage_metadata(self, source: str, usage_metadata: Optional[dict]) -> None:
+        """Record langchain ``usage_metadata`` from an accumulated AIMessageChunk."""
+        if not usage_metadata:
+            return
+        details = usage_metadata.get("input_token_details") or {}
+        self._record(
+            source,
+            usage_metadata.get("input_tokens", 0),
+            details.get("cache_read", 0),
+            usage_metadata.get("output_tokens", 0),
+        )
+
+    def snapshot(self) -> list:
+        return [
+            {
+                "source": source,
+                "requests": stats.requests,
+                "prompt_tokens": stats.prompt_tokens,
+                "cached_tokens": stats.cached_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "cache_hit_ratio": round(stats.cache_hit_ratio, 4),
+            }
+            for source, stats in sorted(self.sources.items())
+        ]
+
+
+llm_usage = LLMUsageStats()
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import async_session_maker
+from app.crud.chat import chat_crud
+
+logger = logging.getLogger(__name__)
+
+FLUSH_DELAY_SECONDS = 2.0
+MAX_PENDING_MESSAGES = 20
+# A failed flush is retried on its own, backing off up to this long between attempts.
+FLUSH_RETRY_MAX_SECONDS = 60.0
+# close() is the last chance to write the transcript, so it retries with backoff.
+CLOSE_FLUSH_ATTEMPTS = 4
+CLOSE_FLUSH_BACKOFF_SECONDS = 0.5
+
+
+class MessageWriteBuffer:
+    """Write-behind buffer for one chat session's messages.
+
+    ``append`` only records the message in memory (timestamped now, so order is
+    preserved) and schedules a batched insert on its own short-lived session,
+    keeping database writes out of the conversation's hot path. Call ``flush``
+    before anything reads the session's messages back, and ``close`` when the
+    conversation ends.
+    """
+
+    def __init__(
+        self,
+        session_id: UUID,
+        flush_delay: float = FLUSH_DELAY_SECONDS,
+        max_pending: int = MAX_PENDING_MESSAGES,
+    ):
+        self.session_id = session_id
+        self.flush_delay = flush_delay
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._closed = False
+
+    def append(self, role: str, content: str) -> None:
+        self._pending.append({
+            "role": role,
+            "content": content,
+            "created_at": datetime.utcnow(),
+        })
+        if len(self._pending) >= self.max_pending:
+            self._schedule(0)
+        elif self._flush_task is None or self._flush_task.done():
+            self._schedule(self.flush_delay)
+
+    def _schedule(self, delay: float) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            if delay > 0:
+                return
+            self._flush_task.cancel()
+        self._flush_task = asyncio.create_task(self._delayed_flush(delay))
+
+    async def _delayed_flush(self, delay: float) -> None:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Once writing, this task no longer counts as the scheduled flush, so a
+        # failure can schedule its retry.
+        if self._flush_task is asyncio.current_task():
+            self._flush_task = None
+        # Shielded so cancelling a scheduled flush never drops a batch mid-write.
+        await asyncio.shield(self.flush())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            try:
+                async with async_session_maker() as db:
+                    await chat_crud.add_messages_batch(db, self.session_id, batch)
+                logger.debug(f"Flushed {len(batch)} messages for session {self.session_id}")
+                self._failures = 0
+            except Exception as e:
+                self._pending = batch + self._pending
+                self._failures += 1
+                if self._closed:
+                    logger.warning(f"Failed to flush {len(batch)} messages: {e}")
+                    return
+                delay = min(self.flush_delay * 2 ** self._failures, FLUSH_RETRY_MAX_SECONDS)
+                logger.warning(f"Failed to flush {len(batch)} messages, retrying in {delay:.1f}s: {e}")
+                self._schedule(delay)
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        for attempt in range(CLOSE_FLUSH_ATTEMPTS):
+            await self.flush()
+            if not self._pending:
+                return
+            if attempt < CLOSE_FLUSH_ATTEMPTS - 1:
+                await asyncio.sleep(CLOSE_FLUSH_BACKOFF_SECONDS * 2 ** attempt)
+        logger.error(
+            f"Lost {len(self._pending)} messages for session {self.session_id}: "
+            f"final flush failed after {CLOSE_FLUSH_ATTEMPTS} attempts"
+        )
@@ -0,0 +1,72 @@
+import logging
+from dataclasses import dataclass
+from enum import Enum
+
+from app.config import settings
+from app.services.token_manager import token_manager
+
+logger = logging.getLogger(__name__)
+
+# Smallest output budget a route is ever cut down to when the prompt is large.
+MIN_OUTPUT_TOKENS = 256
+# Text chat keeps the full budget: groq_model is a reasoning model and its
+# reasoning tokens count against max_tokens, so a tighter cap can cut a reply
+# off before any visible text.
+TEXT_CHAT_MAX_OUTPUT_TOKENS = 8192
+
+
+class RequestClass(str, Enum):
+    TEXT_CHAT = "text_chat"
+    VOICE_TURN = "voice_turn"
+    SUMMARY = "summary"
+    CONVERSATION_SUMMARY = "conversation_summary"
+    SESSION_EXTRACTION = "session_extraction"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    model: str
+    max_tokens: int
+    temperature: float
+
+    def kwargs(self) -> dict:
+        return {"model": self.model, "max_tokens": self.max_tokens, "temperature": self.temperature}
+
+
+class ModelRouter:
+    """Picks model, output budget and temperature for each kind of LLM call.
+
+    Conversation turns stay on ``groq_model``; voice turns get a small output
+    budget since replies are one or two spoken sentences. Background
+    summarization and the title/mood extraction at the end of a voice session
+    are classification-style work and go to ``groq_fast_model``.
+    """
+
+    def _base(self, request_class: RequestClass) -> ModelRoute:
+        if request_class == RequestClass.TEXT_CHAT:
+            return ModelRoute(settings.groq_model, TEXT_CHAT_MAX_OUTPUT_TOKENS, 1.0)
+        if request_class == RequestClass.VOICE_TURN:
+            return ModelRoute(settings.groq_model, 200, 0.8)
+        if request_class == RequestClass.SUMMARY:
+            return ModelRoute(settings.groq_model, 1000, 0.7)
+        if request_class == RequestClass.CONVERSATION_SUMMARY:
+            return ModelRoute(settings.groq_fast_model, 800, 0.3)
+        if request_class == RequestClass.SESSION_EXTRACTION:
+            return ModelRoute(settings.groq_fast_model, 500, 0.3)
+        raise ValueError(f"Unknown request class: {request_class}")
+
+    def route(
+        self,
+        request_class: RequestClass,
+        prompt_tokens: int = 0,
+    ) -> ModelRoute:
+        """``prompt_tokens``: the whole prompt, if known, so the budget fits the context window."""
+        route = self._base(request_class)
+        if prompt_tokens:
+            room = token_manager.context_window - prompt_tokens
+            if room < route.max_tokens:
+                route = ModelRoute(route.model, max(room, MIN_OUTPUT_TOKENS), route.temperature)
+        return route
+
+
+model_router = ModelRouter()
@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Share of a bucket's burst that background work must leave untouched, so an
+# interactive request arriving a moment later doesn't queue behind it.
+BACKGROUND_RESERVE = 0.25
+
+
+class Priority(IntEnum):
+    VOICE = 0
+    CHAT = 1
+    BACKGROUND = 2
+
+
+class TokenBucket:
+    """Requests-per-minute bucket that hands out tokens in priority order.
+
+    Waiters queue in a heap by (priority, arrival); only the head may take
+    tokens, so a background request never overtakes a voice or chat one, and
+    background requests also leave ``BACKGROUND_RESERVE`` of the burst free.
+    """
+
+    def __init__(self, provider: str, per_minute: float, burst: Optional[float] = None):
+        self.provider = provider
+        self.rate = per_minute / 60.0
+        # A few seconds' worth of requests, and at least one.
+        self.capacity = burst if burst is not None else max(1.0, self.rate * 5)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List[list] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.granted: Dict[Priority, int] = {p: 0 for p in Priority}
+        self.wait_total: Dict[Priority, float] = {p: 0.0 for p in Priority}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _required(self, priority: Priority, cost: float) -> float:
+        if priority == Priority.BACKGROUND:
+            cost += self.capacity * BACKGROUND_RESERVE
+        # A bucket never holds more than capacity, so never wait for more than that.
+        return min(cost, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out nothing for ``seconds``, e.g. after a 429 with Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        logger.warning(f"Rate limited by {self.provider}: pausing for {seconds:.1f}s")
+
+    async def acquire(self, priority: Priority, cost: float = 1.0) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        start = time.monotonic()
+        heapq.heappush(self._waiters, [priority, next(self._seq), cost, waiter])
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The dispatcher skips done futures; give the token back if it was already granted.
+            if waiter.done() and not waiter.cancelled():
+                self.tokens = min(self.capacity, self.tokens + cost)
+            raise
+        self.granted[priority] += 1
+        self.wait_total[priority] += time.monotonic() - start
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while True:
+            while self._waiters and self._waiters[0][3].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            priority, _, cost, waiter = self._waiters[0]
+            self._refill()
+            now = time.monotonic()
+            required = self._required(priority, cost)
+            if now >= self._paused_until and self.tokens >= required:
+                heapq.heappop(self._waiters)
+                self.tokens -= cost
+                waiter.set_result(None)
+                continue
+
+            delay = max(self._paused_until - now, (required - self.tokens) / self.rate)
+            # Woken early when a higher-priority request joins the queue.
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        """Stop the dispatcher and cancel anyone still waiting."""
+        for *_, waiter in self._waiters:
+            waiter.cancel()
+        self._waiters.clear()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+
+    def snapshot(self) -> dict:
+        self._refill()
+        queued = {p: 0 for p in Priority}
+        for priority, _, _, waiter in self._waiters:
+            if not waiter.done():
+                queued[priority] += 1
+        return {
+            "provider": self.provider,
+            "per_minute": round(self.rate * 60, 2),
+            "tokens": round(self.tokens, 2),
+            "priorities": [
+                {
+                    "priority": p.name.lower(),
+                    "queued": queued[p],
+                    "granted": self.granted[p],
+                    "wait_avg_ms": round(self.wait_total[p] / self.granted[p] * 1000, 2) if self.granted[p] else 0.0,
+                }
+                for p in Priority
+            ],
+        }
+
+
+class RateLimiter:
+    """One ``TokenBucket`` per external AI provider; a zero limit disables the provider's bucket.
+
+    Each process gets ``1 / rate_limit_processes`` of the configured budget, since
+    the buckets aren't shared between processes.
+    """
+
+    def __init__(self):
+        self.limits = {
+            "groq": settings.rate_limit_groq_per_minute,
+            "openai": settings.rate_limit_openai_per_minute,
+            "deepgram": settings.rate_limit_deepgram_per_minute,
+            "cartesia": settings.rate_limit_cartesia_per_minute,
+        }
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, provider: str) -> Optional[TokenBucket]:
+        if provider not in self.buckets:
+            per_minute = self.limits.get(provider, 0)
+            if not per_minute:
+                return None
+            self.buckets[provider] = TokenBucket(provider, per_minute / max(1, settings.rate_limit_processes))
+        return self.buckets[provider]
+
+    async def acquire(self, provider: str, priority: Priority, cost: float = 1.0) -> None:
+        bucket = self.bucket(provider)
+        if bucket is not None:
+            await bucket.acquire(priority, cost)
+
+    def pause(self, provider: str, seconds: float) -> None:
+        bucket = self.bucket(provider)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+    def snapshot(self) -> list:
+        return [b.snapshot() for b in self.buckets.values()]
+
+    async def close(self) -> None:
+        for bucket in self.buckets.values():
+            await bucket.close()
+
+
+def retry_after_seconds(headers, default: float = 1.0) -> float:
+    """Retry-After from a provider's 429 response headers, if it sent one."""
+    try:
+        return float((headers or {}).get("retry-after", default))
+    except (TypeError, ValueError):
+        return default
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,100 @@
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.database import PrimarySession
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_SESSIONS = 2048
+# Tables whose rows feed the cached context; a commit touching them invalidates the user.
+CONTEXT_TABLES = {"entries", "goals"}
+
+Key = Union[str, UUID]
+
+
+class SessionContextCache:
+    """Per-chat-session cache of context that rarely changes during a conversation.
+
+    Holds the discussed entry, active goals and recent entries for each session,
+    so follow-up messages only run the query-dependent vector search. Values
+    expire after ``ttl_seconds`` and are dropped as soon as this process commits
+    a change to the user's entries or goals.
+    """
+
+    def __init__(self, ttl_seconds: float, max_sessions: int = MAX_CACHED_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        # session_id -> (user_id, {source: (stored_at, value)})
+        self._sessions: "OrderedDict[str, Tuple[str, Dict[str, Tuple[float, Any]]]]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: Key, source: str) -> Optional[Any]:
+        cached = self._sessions.get(str(session_id))
+        item = cached[1].get(source) if cached else None
+        if item is None or time.monotonic() - item[0] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self._sessions.move_to_end(str(session_id))
+        self.hits += 1
+        return item[1]
+
+    def set(self, session_id: Key, user_id: Key, source: str, value: Any) -> None:
+        session_key, user_key = str(session_id), str(user_id)
+        if session_key not in self._sessions:
+            self._sessions[session_key] = (user_key, {})
+            self._by_user.setdefault(user_key, set()).add(session_key)
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+        self._sessions.move_to_end(session_key)
+        self._sessions[session_key][1][source] = (time.monotonic(), value)
+
+    def _drop(self, session_key: str) -> None:
+        user_key, _ = self._sessions.pop(session_key)
+        sessions = self._by_user.get(user_key)
+        if sessions is not None:
+            sessions.discard(session_key)
+            if not sessions:
+                del self._by_user[user_key]
+
+    def invalidate_session(self, session_id: Key) -> None:
+        if str(session_id) in self._sessions:
+            self._drop(str(session_id))
+
+    def invalidate_user(self, user_id: Key) -> None:
+        sessions = self._by_user.pop(str(user_id), set())
+        for session_key in sessions:
+            self._sessions.pop(session_key, None)
+        if sessions:
+            logger.debug(f"Dropped cached context of {len(sessions)} sessions for user {user_id}")
+
+
+session_context_cache = SessionContextCache(settings.session_context_ttl_seconds)
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _collect_context_writers(session: Session, flush_context) -> None:
+    writers = session.info.setdefault("context_writers", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__tablename__", None) in CONTEXT_TABLES:
+            writers.add(str(obj.user_id))
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _invalidate_context_writers(session: Session) -> None:
+    for user_id in session.info.pop("context_writers", ()):
+        session_context_cache.invalidate_user(user_id)
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _forget_context_writers(session: Session) -> None:
+    session.info.pop("context_writers", None)
@@ -1,5 +1,6 @@
-from typing import List, Optional
-import tiktoken
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,12 +17,47 @@ MODEL_CONTEXT_WINDOWS = {
 
 DEFAULT_CONTEXT_WINDOW = 131_072
 
+# Distinct strings whose token counts are remembered (keyed by length + hash, not the text).
+TOKEN_CACHE_SIZE = 4096
+
+# cl100k averages about 4 characters per token; fit_to_tokens encodes this many characters
+# per budgeted token before falling back to a full encode.
+PREFIX_CHARS_PER_TOKEN = 16
+
+
+_encodings: dict = {}
+_encoding_lock = threading.Lock()
+
+
+def get_encoding(name: str = "cl100k_base"):
+    """Process-wide tiktoken encoder, loaded on first use rather than at import.
+
+    Loading reads (and on a cold cache downloads) the BPE file, which shouldn't
+    delay startup or /health.
+    """
+    encoding = _encodings.get(name)
+    if encoding is None:
+        with _encoding_lock:
+            encoding = _encodings.get(name)
+            if encoding is None:
+                import tiktoken
+
+                encoding = tiktoken.get_encoding(name)
+                _encodings[name] = encoding
+    return encoding
+
+
+class TokenFit(NamedTuple):
+    text: str
+    tokens: int
+    truncated: bool
+
 
 class TokenManager:
     def __init__(self, model: str = "llama-3.3-70b-versatile"):
         self.model = model
-        self.encoding = tiktoken.get_encoding("cl100k_base")
         self.context_window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        self._token_cache: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
 
         self.budget = ContextBudget(
             total=self.context_window,
@@ -37,36 +73,84 @@ class TokenManager:
 
         logger.info(f"TokenManager initialized for {model} with {self.context_window:,} token context window")
 
+    @property
+    def encoding(self):
+        return get_encoding("cl100k_base")
+
     def count_tokens(self, text: str) -> int:
         if not text:
             return 0
-        return len(self.encoding.encode(text))
+        cached = self._cached_count(text)
+        if cached is not None:
+            return cached
+
+        count = len(self.encoding.encode(text))
+        self._remember(text, count)
+        return count
+
+    def _cached_count(self, text: str) -> Optional[int]:
+        key = (len(text), hash(text))
+        cached = self._token_cache.get(key)
+        if cached is not None:
+            self._token_cache.move_to_end(key)
+        return cached
+
+    def _remember(self, text: str, count: int) -> None:
+        self._token_cache[(len(text), hash(text))] = count
+        if len(self._token_cache) > TOKEN_CACHE_SIZE:
+            self._token_cache.popitem(last=False)
+
+    def count_message_tokens(self, message: dict) -> int:
+        """Content tokens of a chat message dict, trusting a stored ``token_count`` if present."""
+        token_count = message.get("token_count")
+        if token_count is not None:
+            return token_count
+        return self.count_tokens(message.get("content", ""))
 
     def count_messages_tokens(self, messages: List[dict]) -> int:
         total = 0
         for msg in messages:
             total += 4
             total += self.count_tokens(msg.get("role", ""))
-            total += self.count_tokens(msg.get("content", ""))
+            total += self.count_message_tokens(msg)
         total += 2
         return total
 
-    def truncate_to_tokens(self, text: str, max_tokens: int, suffix: str = "...") -> str:
+    def fit_to_tokens(self, text: str, max_tokens: int, suffix: str = "...") -> TokenFit:
+        """Encode ``text`` once and return it (or a truncated copy) with its token count.
+
+        Texts far over budget only have a prefix of about
+        ``max_tokens * PREFIX_CHARS_PER_TOKEN`` characters encoded, so a long
+        transcript isn't tokenized end to end just to be cut.
+        """
         if not text:
-            return text
+            return TokenFit(text, 0, False)
+
+        cached = self._cached_count(text)
+        if cached is not None and cached <= max_tokens:
+            return TokenFit(text, cached, False)
+
+        if len(text) > max_tokens * PREFIX_CHARS_PER_TOKEN:
+            prefix_tokens = self.encoding.encode(text[: max_tokens * PREFIX_CHARS_PER_TOKEN])
+            # The last prefix token may be split by the cut, so it must lie beyond the budget.
+            if len(prefix_tokens) > max_tokens + 1:
+                return self._truncate_tokens(prefix_tokens, max_tokens, suffix)
 
         tokens = self.encoding.encode(text)
+        self._remember(text, len(tokens))
         if len(tokens) <= max_tokens:
-            return text
-
-        suffix_tokens = self.encoding.encode(suffix)
-        available = max_tokens - len(suffix_tokens)
+            return TokenFit(text, len(tokens), False)
+        return self._truncate_tokens(tokens, max_tokens, suffix)
 
+    def _truncate_tokens(self, tokens: List[int], max_tokens: int, suffix: str) -> TokenFit:
+        suffix_tokens = self.count_tokens(suffix)
+        available = max_tokens - suffix_tokens
         if available <= 0:
-            return suffix
+            return TokenFit(suffix, suffix_tokens, True)
+        return TokenFit(self.encoding.decode(tokens[:available]) + suffix, available + suffix_tokens, True)
 
-        truncated_tokens = tokens[:available]
-        return self.encoding.decode(truncated_tokens) + suffix
+    def truncate_to_tokens(self, text: str, max_tokens: int, suffix: str = "...") -> str:
+        return self.fit_to_tokens(text, max_tokens, suffix=suffix).text
 
     def truncate_entries(
         self,
@@ -87,21 +171,16 @@ class TokenManager:
                 break
 
             entry_copy = entry.copy()
-            content = entry_copy.get(content_key, "")
-            content_tokens = self.count_tokens(content)
-
-            max_content = available_tokens - entry_overhead
-
-            if content_tokens > max_content:
-                entry_copy[content_key] = self.truncate_to_tokens(
-                    content,
-                    max(min_content_tokens, max_content),
-                    suffix="\n[Content truncated...]"
-                )
-                content_tokens = self.count_tokens(entry_copy[content_key])
+            max_content = max(min_content_tokens, available_tokens - entry_overhead)
+            fit = self.fit_to_tokens(
+                entry_copy.get(content_key, ""),
+                max_content,
+                suffix="\n[Content truncated...]",
+            )
+            entry_copy[content_key] = fit.text
 
             result.append(entry_copy)
-            available_tokens -= (content_tokens + entry_overhead)
+            available_tokens -= (fit.tokens + entry_overhead)
 
         logger.debug(f"Truncated {len(entries)} entries to {len(result)} within {max_total_tokens} tokens")
         return result
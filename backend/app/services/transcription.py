@@ -1,16 +1,24 @@
-from groq import Groq
 from fastapi import UploadFile
 import tempfile
 import os
 
 from app.config import settings
+from app.services.rate_limiter import Priority, rate_limiter
 
 
 class TranscriptionService:
     def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
+        self._client = None
         self.model = "whisper-large-v3-turbo"
 
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import Groq
+
+            self._client = Groq(api_key=settings.groq_api_key, base_url=settings.groq_base_url or None)
+        return self._client
+
     async def transcribe(self, audio_file: UploadFile) -> str:
         with tempfile.NamedTemporaryFile(delete=False, suffix=self._get_suffix(audio_file.filename)) as tmp:
             content = await audio_file.read()
@@ -18,6 +26,7 @@ class TranscriptionService:
             tmp_path = tmp.name
 
         try:
+            await rate_limiter.acquire("groq", Priority.CHAT)
             with open(tmp_path, "rb") as file:
                 transcription = self.client.audio.transcriptions.create(
                     file=(audio_file.filename, file),
@@ -4,6 +4,8 @@ import logging
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.rate_limiter import Priority
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,8 +70,9 @@ async def search_by_text(
     user_id: str,
     embedding_service,
     limit: int = 5,
+    priority: Priority = Priority.CHAT,
 ) -> List[dict]:
     logger.info(f"Generating embedding for query: {query_text[:50]}...")
-    embedding = await embedding_service.generate_embedding(query_text)
+    embedding = await embedding_service.generate_embedding(query_text, priority)
     logger.info(f"Embedding generated, length: {len(embedding)}")
     return await search_similar_entries(db, embedding, user_id, limit=limit)
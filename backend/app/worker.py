@@ -0,0 +1,31 @@
+"""Standalone background job worker.
+
+Run with ``python -m app.worker`` and set ``RUN_JOBS_IN_PROCESS=false`` on the
+API so job processing no longer competes with request handling.
+"""
+import asyncio
+import logging
+
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.services.jobs import job_service
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+
+
+async def main():
+    setup_tracing()
+    try:
+        await job_service.run()
+    finally:
+        await job_service.stop()
+        shutdown_tracing()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,245 @@
+"""Local stand-ins for the external AI providers, for offline benchmarks.
+
+One app serves all four, each under its own prefix so the API can be pointed
+at it through the provider base URL settings:
+
+  /groq      chat completions (JSON or SSE stream, with tool calls)
+             GROQ_BASE_URL=http://127.0.0.1:9100/groq
+  /openai    embeddings, deterministic per input text
+             OPENAI_BASE_URL=http://127.0.0.1:9100/openai/v1
+  /deepgram  listen websocket, answers audio frames with interim results
+             DEEPGRAM_WS_URL=ws://127.0.0.1:9100/deepgram/v1/listen
+  /cartesia  streamed raw PCM from /tts/bytes
+             CARTESIA_BASE_URL=http://127.0.0.1:9100/cartesia
+
+Latencies are configurable per provider so a run can mimic a slow LLM or TTS
+without any network access. Responses are drawn from a seeded RNG, so the
+same flags give the same replies.
+
+    python -m benchmarks.provider_stubs --port 9100 --llm-ttft 0.3 --llm-token-interval 0.01
+
+benchmarks.replay_load starts this app in a subprocess; running it on its own is
+for pointing a manually started API at it.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.config import settings
+
+REPLIES = [
+    "That sounds like a lot to carry this week.",
+    "It's good that you noticed how the run changed your mood.",
+    "What do you think made the meeting feel so draining?",
+    "You've kept showing up for the reading goal, which counts.",
+    "Tell me a bit more about how the move is affecting your sleep.",
+    "It seems like saying no to that project was the right call.",
+]
+
+
+def fake_embedding(text: str, dimension: int = None) -> list:
+    """Unit vector seeded by the text, so equal texts embed identically."""
+    dimension = dimension or settings.embedding_dimension
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _jittered(seconds: float, jitter: float, rng: random.Random) -> float:
+    if seconds <= 0:
+        return 0.0
+    return seconds * rng.uniform(1 - jitter, 1 + jitter)
+
+
+def _tool_call(body: dict, tool_name: str):
+    """A call to ``tool_name`` if the request offers it and isn't already answering a tool result."""
+    messages = body.get("messages") or []
+    if not tool_name or (messages and messages[-1].get("role") == "tool"):
+        return None
+    for tool in body.get("tools") or []:
+        function = tool.get("function", {})
+        if function.get("name") != tool_name:
+            continue
+        last_user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        properties = function.get("parameters", {}).get("properties", {})
+        defaults = {"string": last_user, "integer": 0, "number": 0, "array": [], "boolean": False}
+        arguments = {
+            name: defaults.get(schema.get("type"), "")
+            for name, schema in properties.items()
+            if name in function.get("parameters", {}).get("required", [])
+        }
+        return {
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": tool_name, "arguments": json.dumps(arguments)},
+        }
+    return None
+
+
+def create_app(args) -> FastAPI:
+    app = FastAPI(title="Provider stubs")
+    rng = random.Random(args.seed)
+
+    def usage(body: dict, completion: str) -> dict:
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = max(1, len(completion) // 4)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    @app.post("/groq/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        tool_call = _tool_call(body, args.tool_name) if rng.random() < args.tool_call_rate else None
+        reply = " ".join(rng.sample(REPLIES, k=min(args.reply_sentences, len(REPLIES))))
+
+        if not body.get("stream"):
+            await asyncio.sleep(_jittered(args.llm_ttft + args.llm_token_interval * len(reply.split()), args.jitter, rng))
+            message = {"role": "assistant", "content": None if tool_call else reply}
+            if tool_call:
+                message["tool_calls"] = [tool_call]
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool_call else "stop",
+                }],
+                "usage": usage(body, reply),
+            })
+
+        def chunk(delta: dict, finish_reason=None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            await asyncio.sleep(_jittered(args.llm_ttft, args.jitter, rng))
+            yield chunk({"role": "assistant", "content": ""})
+            if tool_call:
+                yield chunk({"tool_calls": [{"index": 0, **tool_call}]})
+                finish_reason = "tool_calls"
+            else:
+                for i, word in enumerate(reply.split(" ")):
+                    yield chunk({"content": word if i == 0 else f" {word}"})
+                    await asyncio.sleep(_jittered(args.llm_token_interval, args.jitter, rng))
+                finish_reason = "stop"
+            # Groq only reports usage on the last chunk, under x_groq.
+            yield chunk({}, finish_reason, x_groq={"id": completion_id, "usage": usage(body, reply)})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/openai/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(_jittered(args.embedding_latency, args.jitter, rng))
+        tokens = sum(len(text) // 4 for text in inputs)
+        return {
+            "object": "list",
+            "model": body.get("model"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(text, body.get("dimensions"))}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.post("/cartesia/tts/bytes")
+    async def tts_bytes(request: Request):
+        body = await request.json()
+        sample_rate = body.get("output_format", {}).get("sample_rate", 24000)
+        # Roughly 0.3s of 16-bit mono audio per word.
+        total = int(len(body.get("transcript", "").split()) * 0.3 * sample_rate) * 2
+
+        async def audio():
+            await asyncio.sleep(_jittered(args.tts_ttfb, args.jitter, rng))
+            sent = 0
+            while sent < total:
+                size = min(args.tts_chunk_bytes, total - sent)
+                sent += size
+                yield bytes(size)
+                await asyncio.sleep(0)
+
+        return StreamingResponse(audio(), media_type="application/octet-stream")
+
+    @app.get("/cartesia/voices")
+    async def voices():
+        return []
+
+    @app.websocket("/deepgram/v1/listen")
+    async def listen(websocket: WebSocket):
+        await websocket.accept()
+        frames = 0
+        try:
+            while True:
+                message = await websocket.receive()
+                if message.get("type") == "websocket.disconnect":
+                    return
+                if message.get("text"):
+                    if json.loads(message["text"]).get("type") == "CloseStream":
+                        break
+                    continue
+                frames += 1
+                if frames % args.asr_frames_per_result == 0:
+                    await asyncio.sleep(_jittered(args.asr_latency, args.jitter, rng))
+                    await websocket.send_json({
+                        "type": "Results",
+                        "is_final": False,
+                        "channel": {"alternatives": [{"transcript": "stub transcript", "confidence": 0.99}]},
+                    })
+        except WebSocketDisconnect:
+            return
+        await websocket.close()
+
+    return app
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- fraction applied to every latency")
+    parser.add_argument("--llm-ttft", type=float, default=0.3, help="seconds before the first completion token")
+    parser.add_argument("--llm-token-interval", type=float, default=0.01, help="seconds between streamed tokens")
+    parser.add_argument("--reply-sentences", type=int, default=2)
+    parser.add_argument("--tool-call-rate", type=float, default=0.2,
+                        help="share of completions that call --tool-name when the request offers it")
+    parser.add_argument("--tool-name", default="recall_memory")
+    parser.add_argument("--embedding-latency", type=float, default=0.08)
+    parser.add_argument("--tts-ttfb", type=float, default=0.15, help="seconds before the first audio byte")
+    parser.add_argument("--tts-chunk-bytes", type=int, default=4096)
+    parser.add_argument("--asr-latency", type=float, default=0.05)
+    parser.add_argument("--asr-frames-per-result", type=int, default=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,382 @@
+"""Offline load test of the chat and voice endpoints against stubbed providers.
+
+Starts benchmarks.provider_stubs and the API (uvicorn, pointed at the stubs
+through GROQ_BASE_URL, OPENAI_BASE_URL, DEEPGRAM_WS_URL and CARTESIA_BASE_URL)
+as subprocesses, seeds DATABASE_URL with synthetic users, goals and embedded
+entries, then replays scripted conversations:
+
+  chat   POST /api/v1/chat/sessions/{id}/messages, reading the SSE stream;
+         TTFT is the first content event
+  voice  /api/v1/voice/chat websocket, a few silent audio frames then a
+         speech_end transcript per turn; TTFT is the first assistant_text,
+         "voice:audio" the first audio frame
+
+``--concurrency`` virtual users run at once per endpoint, each playing
+``--turns`` turns. The report has throughput and p50/p95/p99 TTFT and turn
+latency per endpoint; ``--json`` writes the same numbers for comparing runs.
+Client-side rate limits are turned off in the API so they don't cap the run.
+Seeded users are deleted afterwards unless ``--keep-data`` is given.
+
+    python -m benchmarks.replay_load --concurrency 20 --turns 5 --llm-ttft 0.3
+    python -m benchmarks.replay_load --endpoints chat --script conversations.jsonl --json run.json
+
+``--script`` is JSONL, one conversation per line: {"turns": ["...", ...]}.
+Pass ``--api-url`` to drive an API you started yourself (with the stub URLs
+set) instead; the stub flags then have no effect.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import httpx
+import websockets
+from sqlalchemy import delete
+
+from app.core.database import async_session_maker
+from app.core.security import create_access_token, get_password_hash
+from app.models.entry import Entry
+from app.models.goal import Goal
+from app.models.user import User
+from benchmarks.provider_stubs import add_stub_arguments, fake_embedding
+
+CONVERSATIONS = [
+    [
+        "I went for a run this morning and felt great afterwards.",
+        "Work was stressful though, the deadline got moved up.",
+        "I think I need to plan my week better.",
+        "Can you remind me what I wrote about sleep last week?",
+        "Thanks, that helps.",
+    ],
+    [
+        "I'm anxious about the move next month.",
+        "Mostly the packing and finding a new gym.",
+        "How am I doing on my reading goal?",
+        "I read two chapters last night.",
+        "Okay, I'll try to keep that up.",
+    ],
+    [
+        "Dinner with Sam was really nice.",
+        "We talked about the trip to Lisbon.",
+        "I want to save a bit more for it.",
+        "What patterns do you see in my mood lately?",
+        "That's fair, I'll keep journaling in the evenings.",
+    ],
+]
+
+ENTRY_SENTENCES = [
+    "Slept badly again, woke up at four and couldn't get back to sleep.",
+    "Finished the design review; the team finally agreed on the layout.",
+    "Ran 5k before work and felt calm for most of the day.",
+    "Argued with my brother about the holidays, need to call him back.",
+    "Read two chapters of the novel before bed.",
+    "Feeling behind on everything at work this week.",
+    "Cooked a proper dinner for once, which felt good.",
+    "Spent the afternoon packing boxes for the move.",
+]
+
+GOALS = ["Read 20 books this year", "Run a half marathon", "Sleep before midnight", "Save for Lisbon"]
+
+# 100ms of 16kHz 16-bit silence.
+AUDIO_FRAME = bytes(3200)
+
+
+@dataclass
+class TurnResult:
+    ok: bool
+    ttft: Optional[float] = None
+    total: Optional[float] = None
+    first_audio: Optional[float] = None
+
+
+@dataclass
+class EndpointRun:
+    name: str
+    turns: List[TurnResult] = field(default_factory=list)
+    wall_time: float = 0.0
+
+
+def load_script(path: Optional[str]) -> List[List[str]]:
+    if not path:
+        return CONVERSATIONS
+    with open(path) as f:
+        return [json.loads(line)["turns"] for line in f if line.strip()]
+
+
+async def seed(args) -> tuple:
+    """Synthetic users with goals and embedded entries; returns (email prefix, [(user_id, token)])."""
+    rng = random.Random(args.seed)
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    password_hash = get_password_hash("benchmark")
+    now = datetime.utcnow()
+    users = []
+
+    async with async_session_maker() as db:
+        for i in range(args.users):
+            user = User(email=f"{prefix}{i}@example.com", password_hash=password_hash, name=f"Bench {i}")
+            db.add(user)
+            await db.flush()
+            for title in rng.sample(GOALS, k=2):
+                db.add(Goal(user_id=user.id, title=title, progress=rng.randint(0, 80)))
+            for day in range(args.entries_per_user):
+                content = " ".join(rng.choices(ENTRY_SENTENCES, k=3))
+                db.add(Entry(
+                    user_id=user.id,
+                    title=content.split(".")[0][:60],
+                    content=content,
+                    mood=rng.choice(["good", "okay", "bad"]),
+                    embedding=fake_embedding(content),
+                    created_at=now - timedelta(days=day),
+                ))
+            users.append((user.id, create_access_token(str(user.id), timedelta(hours=6))))
+        await db.commit()
+    return prefix, users
+
+
+async def cleanup(prefix: str) -> None:
+    async with async_session_maker() as db:
+        await db.execute(delete(User).where(User.email.like(f"{prefix}%")))
+        await db.commit()
+
+
+async def chat_user(client: httpx.AsyncClient, token: str, script: List[str], args, run: EndpointRun):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.post("/api/v1/chat/sessions", json={}, headers=headers)
+    response.raise_for_status()
+    session_id = response.json()["id"]
+
+    for text in script[:args.turns]:
+        result = TurnResult(ok=False)
+        start = time.perf_counter()
+        try:
+            async with client.stream(
+                "POST", f"/api/v1/chat/sessions/{session_id}/messages", json={"content": text}, headers=headers
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[6:])
+                    if event.get("content") and result.ttft is None:
+                        result.ttft = time.perf_counter() - start
+                    if event.get("error"):
+                        break
+                    if event.get("done"):
+                        result.ok = True
+                        break
+        except httpx.HTTPError:
+            pass
+        result.total = time.perf_counter() - start
+        run.turns.append(result)
+        await asyncio.sleep(args.think_time)
+
+
+async def _voice_turn(ws, text: str, args) -> TurnResult:
+    result = TurnResult(ok=False)
+    for _ in range(args.audio_frames):
+        await ws.send(AUDIO_FRAME)
+    await ws.send(json.dumps({"type": "speech_end", "transcript": text}))
+    start = time.perf_counter()
+    while True:
+        message = await ws.recv()
+        if isinstance(message, bytes):
+            if result.first_audio is None:
+                result.first_audio = time.perf_counter() - start
+            continue
+        event = json.loads(message)
+        if event["type"] == "assistant_text" and event["data"].get("text") and result.ttft is None:
+            result.ttft = time.perf_counter() - start
+        elif event["type"] == "assistant_done":
+            result.ok = True
+            break
+        elif event["type"] == "error":
+            break
+    result.total = time.perf_counter() - start
+    return result
+
+
+async def voice_user(ws_url: str, token: str, script: List[str], args, run: EndpointRun):
+    async with websockets.connect(f"{ws_url}/api/v1/voice/chat?token={token}", max_size=None) as ws:
+        # Wait out the greeting before the first turn.
+        while True:
+            message = await ws.recv()
+            if isinstance(message, str):
+                event = json.loads(message)
+                if event["type"] == "assistant_done":
+                    break
+                if event["type"] == "error":
+                    raise RuntimeError(event["data"].get("message"))
+
+        for text in script[:args.turns]:
+            try:
+                result = await asyncio.wait_for(_voice_turn(ws, text, args), args.timeout)
+            except (asyncio.TimeoutError, websockets.ConnectionClosed):
+                run.turns.append(TurnResult(ok=False))
+                return
+            run.turns.append(result)
+            await asyncio.sleep(args.think_time)
+
+
+async def run_endpoint(name: str, users: list, scripts: List[List[str]], args) -> EndpointRun:
+    run = EndpointRun(name)
+    rng = random.Random(args.seed)
+    assignments = [(users[i % len(users)][1], rng.choice(scripts)) for i in range(args.concurrency)]
+
+    async def guarded(coro):
+        try:
+            await coro
+        except Exception as e:
+            print(f"{name} user failed: {e!r}", file=sys.stderr)
+            run.turns.append(TurnResult(ok=False))
+
+    start = time.perf_counter()
+    if name == "chat":
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.api_url, timeout=args.timeout, limits=limits) as client:
+            await asyncio.gather(*(guarded(chat_user(client, token, script, args, run)) for token, script in assignments))
+    else:
+        ws_url = args.api_url.replace("http", "ws", 1)
+        await asyncio.gather(*(guarded(voice_user(ws_url, token, script, args, run)) for token, script in assignments))
+    run.wall_time = time.perf_counter() - start
+    return run
+
+
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    ordered = sorted(values)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000
+    return {"p50_ms": statistics.median(ordered) * 1000, "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def summarize(run: EndpointRun) -> List[dict]:
+    ok = [t for t in run.turns if t.ok]
+    base = {
+        "turns": len(run.turns),
+        "errors": len(run.turns) - len(ok),
+        "turns_per_s": len(ok) / run.wall_time if run.wall_time else 0.0,
+    }
+    rows = [{
+        "endpoint": run.name,
+        **base,
+        "ttft": _percentiles([t.ttft for t in ok if t.ttft is not None]),
+        "total": _percentiles([t.total for t in ok]),
+    }]
+    if run.name == "voice":
+        rows.append({
+            "endpoint": "voice:audio",
+            **base,
+            "ttft": _percentiles([t.first_audio for t in ok if t.first_audio is not None]),
+            "total": _percentiles([t.total for t in ok]),
+        })
+    return rows
+
+
+def _subprocess_env(args) -> dict:
+    stubs = f"http://127.0.0.1:{args.stub_port}"
+    env = dict(os.environ)
+    env.update({
+        "GROQ_BASE_URL": f"{stubs}/groq",
+        "OPENAI_BASE_URL": f"{stubs}/openai/v1",
+        "DEEPGRAM_WS_URL": f"ws://127.0.0.1:{args.stub_port}/deepgram/v1/listen",
+        "CARTESIA_BASE_URL": f"{stubs}/cartesia",
+        "RATE_LIMIT_GROQ_PER_MINUTE": "0",
+        "RATE_LIMIT_OPENAI_PER_MINUTE": "0",
+        "RATE_LIMIT_DEEPGRAM_PER_MINUTE": "0",
+        "RATE_LIMIT_CARTESIA_PER_MINUTE": "0",
+    })
+    # The services refuse to run without a key; the stubs ignore it.
+    for key in ("GROQ_API_KEY", "OPENAI_API_KEY", "DEEPGRAM_API_KEY", "CARTESIA_API_KEY"):
+        env.setdefault(key, "benchmark")
+    return env
+
+
+def _stub_argv(args) -> List[str]:
+    argv = [sys.executable, "-m", "benchmarks.provider_stubs", "--port", str(args.stub_port)]
+    for name in ("seed", "jitter", "llm_ttft", "llm_token_interval", "reply_sentences", "tool_call_rate",
+                 "tool_name", "embedding_latency", "tts_ttfb", "tts_chunk_bytes", "asr_latency",
+                 "asr_frames_per_result"):
+        argv += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    return argv
+
+
+async def _wait_healthy(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+async def main(args):
+    processes = []
+    if not args.api_url:
+        env = _subprocess_env(args)
+        processes.append(subprocess.Popen(_stub_argv(args), env=env))
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.api_port), "--log-level", "warning"],
+            env=env,
+        ))
+        args.api_url = f"http://127.0.0.1:{args.api_port}"
+        await _wait_healthy(f"http://127.0.0.1:{args.stub_port}/cartesia/voices")
+    await _wait_healthy(f"{args.api_url}/health")
+
+    prefix, users = await seed(args)
+    scripts = load_script(args.script)
+    rows = []
+    try:
+        for name in args.endpoints:
+            rows += summarize(await run_endpoint(name, users, scripts, args))
+    finally:
+        if not args.keep_data:
+            await cleanup(prefix)
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print(f"concurrency={args.concurrency} turns={args.turns} users={args.users} "
+          f"llm_ttft={args.llm_ttft}s tts_ttfb={args.tts_ttfb}s embedding={args.embedding_latency}s")
+    print(f"{'endpoint':<13}{'turns':>7}{'errors':>8}{'turns/s':>9}"
+          f"{'ttft p50':>10}{'p95':>8}{'p99':>8}{'total p50':>11}{'p95':>8}{'p99':>8}")
+    for r in rows:
+        t, total = r["ttft"], r["total"]
+        print(f"{r['endpoint']:<13}{r['turns']:>7}{r['errors']:>8}{r['turns_per_s']:>9.2f}"
+              f"{t['p50_ms']:>10.0f}{t['p95_ms']:>8.0f}{t['p99_ms']:>8.0f}"
+              f"{total['p50_ms']:>11.0f}{total['p95_ms']:>8.0f}{total['p99_ms']:>8.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "json"}, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", type=lambda v: v.split(","), default=["chat", "voice"])
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users at once per endpoint")
+    parser.add_argument("--turns", type=int, default=5, help="turns per virtual user")
+    parser.add_argument("--users", type=int, default=10, help="seeded users the virtual users are spread over")
+    parser.add_argument("--entries-per-user", type=int, default=30)
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between a user's turns")
+    parser.add_argument("--audio-frames", type=int, default=10, help="100ms audio frames sent before each voice turn")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a turn counts as failed")
+    parser.add_argument("--script", help="JSONL conversations to replay instead of the built-in ones")
+    parser.add_argument("--api-url", help="drive an already running API instead of starting one")
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--keep-data", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    add_stub_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
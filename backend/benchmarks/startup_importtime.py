@@ -0,0 +1,73 @@
+"""Measure how long importing the API takes, using ``python -X importtime``.
+
+Imports ``app.main`` in fresh interpreters (what every worker does before it
+can serve /health) and reports the median cumulative import time plus the
+slowest modules. Heavy SDKs (langchain, langgraph, groq, tiktoken) should
+not appear; they load lazily or in the post-startup warm-up.
+
+    python -m benchmarks.startup_importtime --runs 5 --top 15
+    python -m benchmarks.startup_importtime --max-ms 2500   # exit 1 if slower
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+HEAVY_MODULES = ("langchain", "langgraph", "groq", "tiktoken")
+
+
+def import_once(module: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            # Keep the outermost (first-import) figure for each module.
+            cumulative.setdefault(match.group(4), int(match.group(2)))
+    return cumulative
+
+
+def main(args):
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module] / 1000 for run in runs]
+
+    per_module = defaultdict(list)
+    for run in runs:
+        for name, us in run.items():
+            per_module[name].append(us / 1000)
+
+    median_total = statistics.median(totals_ms)
+    print(f"import {args.module}: median {median_total:.0f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.0f}, max {max(totals_ms):.0f})")
+
+    print(f"\nslowest modules (median cumulative ms):")
+    slowest = sorted(per_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, times in slowest[: args.top]:
+        print(f"  {statistics.median(times):8.1f}  {name}")
+
+    heavy = sorted(name for name in per_module if name.split(".")[0].startswith(HEAVY_MODULES))
+    if heavy:
+        print(f"\nheavy modules imported at startup: {', '.join(heavy[:10])}")
+
+    if args.max_ms is not None and median_total > args.max_ms:
+        print(f"\nFAIL: {median_total:.0f} ms exceeds --max-ms {args.max_ms}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None)
+    main(parser.parse_args())
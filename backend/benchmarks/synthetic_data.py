@@ -0,0 +1,370 @@
+"""Bulk-load synthetic power users for scale testing.
+
+Generates users with years of entries (with 1536-d embeddings), goals with
+progress histories, text and voice chat sessions with their messages, and the
+XP events those would have earned, and loads them with COPY, table by table
+in foreign-key order. Columns come from the models in app/models, so a new
+nullable column is simply left NULL and a scalar model default is applied.
+
+Everything is derived from ``--seed`` (and the user's index), so the same
+flags load the same rows; timestamps are laid out backwards from ``--until``,
+which defaults to today, so pass it too for identical reruns. Embeddings are
+clustered around a few shared topic directions rather than uniformly random,
+so nearest-neighbour queries behave like they do on real journals.
+
+    python -m benchmarks.synthetic_data --users 5 --entries-per-user 10000 --seed 7
+    python -m benchmarks.synthetic_data --users 5 --seed 7 --until 2026-10-01 --replace
+
+Users are named synthetic-s<seed>-u<n>@example.com (password "synthetic");
+``--replace`` deletes the seed's earlier users first, otherwise a rerun with
+the same seed fails on the duplicate rows. Tables are ANALYZEd at the end.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Iterable, List
+
+import asyncpg
+
+from app.config import settings
+from app.core.security import get_password_hash
+from app.models.chat import ChatMessage, ChatSession
+from app.models.entry import Entry
+from app.models.goal import Goal, GoalProgressUpdate
+from app.models.user import User
+from app.models.xp_event import XPEvent
+from app.services.gamification import XP_VALUES, gamification_service
+
+TOPICS = {
+    "work": [
+        "The design review ran long again but we agreed on the layout.",
+        "My manager asked me to take over the onboarding project.",
+        "I feel behind on everything at work this week.",
+        "Shipped the release today and nothing broke.",
+    ],
+    "health": [
+        "Ran 5k before work and felt calm for most of the day.",
+        "Slept badly again and woke up at four.",
+        "Skipped the gym, I was too tired after work.",
+        "Cooked a proper dinner for once, which felt good.",
+    ],
+    "family": [
+        "Called my mum, she sounded tired but happy.",
+        "Argued with my brother about the holidays.",
+        "Dinner with Sam was great, we talked about Lisbon for ages.",
+        "Spent the afternoon helping my dad clear the garage.",
+    ],
+    "growth": [
+        "Read two chapters of the novel before bed.",
+        "Practised Portuguese for twenty minutes.",
+        "Tried saying no to an extra project and it went fine.",
+        "Wrote down three things I'm grateful for.",
+    ],
+    "money": [
+        "Moved a bit more into the travel savings.",
+        "The rent went up again, need to rethink the budget.",
+        "Cancelled two subscriptions I never use.",
+        "Spent too much on takeaway this week.",
+    ],
+}
+MOODS = ["great", "good", "okay", "bad", "terrible"]
+MOOD_WEIGHTS = [2, 4, 3, 2, 1]
+JOURNAL_TYPES = ["morning", "evening", "freeform", None]
+JOURNAL_TYPE_WEIGHTS = [3, 3, 2, 2]
+GOAL_TITLES = [
+    "Read 20 books this year", "Run a half marathon", "Sleep before midnight",
+    "Save for Lisbon", "Learn Portuguese", "Call family every week", "Cook at home 4x a week",
+]
+GOAL_STATUSES = ["active", "completed", "paused", "abandoned"]
+GOAL_STATUS_WEIGHTS = [6, 2.5, 1, 0.5]
+ASSISTANT_REPLIES = [
+    "That sounds like a lot to carry.",
+    "What do you think made it feel that way?",
+    "It's good that you noticed that.",
+    "How does that connect to your goals right now?",
+]
+
+# Norm of the per-entry noise added to a unit topic direction: at 0.9 entries
+# of the same topic sit around 0.55 cosine similarity, other topics near 0.
+EMBEDDING_SPREAD = 0.9
+# Rows serialized per COPY data chunk.
+COPY_BATCH_ROWS = 1000
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _vector_literal(vector: List[float]) -> str:
+    return "[" + ",".join(f"{v:.5f}" for v in vector) + "]"
+
+
+def _row(table, values: dict) -> list:
+    """Values in the table's column order; omitted columns get their scalar model default or NULL."""
+    row = []
+    for column in table.columns:
+        value = values.get(column.name)
+        if value is None and column.default is not None and column.default.is_scalar:
+            value = column.default.arg
+        row.append(value)
+    return row
+
+
+class UserDataset:
+    """All rows for one synthetic user, keyed by table name."""
+
+    def __init__(self, args, index: int, centroids: Dict[str, List[float]], password_hash: str):
+        self.rng = random.Random(f"{args.seed}:{index}")
+        self.args = args
+        self.centroids = centroids
+        self.user_id = _uuid(self.rng)
+        self.end = args.until
+        self.start = self.end - timedelta(days=args.days)
+        self.tables: Dict[str, list] = {}
+
+        entries = self._entries()
+        sessions, messages = self._sessions(entries)
+        goals, updates = self._goals(sessions)
+        xp_events = self._xp_events(entries, goals)
+        total_xp = sum(e["xp_amount"] for e in xp_events)
+
+        self.tables = {
+            User.__tablename__: [_row(User.__table__, {
+                "id": self.user_id,
+                "email": f"synthetic-s{args.seed}-u{index}@example.com",
+                "password_hash": password_hash,
+                "name": f"Synthetic User {index}",
+                "total_xp": total_xp,
+                "level": gamification_service.calculate_level(total_xp)[0],
+                "created_at": self.start,
+                "updated_at": self.end,
+            })],
+            Entry.__tablename__: [_row(Entry.__table__, e) for e in entries],
+            Goal.__tablename__: [_row(Goal.__table__, g) for g in goals],
+            ChatSession.__tablename__: [_row(ChatSession.__table__, s) for s in sessions],
+            ChatMessage.__tablename__: [_row(ChatMessage.__table__, m) for m in messages],
+            GoalProgressUpdate.__tablename__: [_row(GoalProgressUpdate.__table__, u) for u in updates],
+            XPEvent.__tablename__: [_row(XPEvent.__table__, e) for e in xp_events],
+        }
+
+    def _timestamps(self, count: int, start: datetime = None) -> List[datetime]:
+        start = start or self.start
+        span = (self.end - start).total_seconds()
+        return sorted(start + timedelta(seconds=self.rng.random() * span) for _ in range(count))
+
+    def _embedding(self, topic: str) -> str:
+        sigma = EMBEDDING_SPREAD / math.sqrt(settings.embedding_dimension)
+        centroid = self.centroids[topic]
+        return _vector_literal(_unit([c + self.rng.gauss(0.0, sigma) for c in centroid]))
+
+    def _entries(self) -> List[dict]:
+        entries = []
+        for created_at in self._timestamps(self.args.entries_per_user):
+            topic = self.rng.choice(list(TOPICS))
+            sentences = self.rng.choices(TOPICS[topic], k=self.rng.randint(2, 6))
+            entries.append({
+                "id": _uuid(self.rng),
+                "user_id": self.user_id,
+                "title": sentences[0][:60],
+                "content": " ".join(sentences),
+                "mood": self.rng.choices(MOODS, MOOD_WEIGHTS)[0],
+                "journal_type": self.rng.choices(JOURNAL_TYPES, JOURNAL_TYPE_WEIGHTS)[0],
+                "embedding": self._embedding(topic) if self.rng.random() >= self.args.missing_embedding_rate else None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        return entries
+
+    def _sessions(self, entries: List[dict]) -> tuple:
+        sessions, messages = [], []
+        for created_at in self._timestamps(self.args.sessions_per_user):
+            session_type = "voice" if self.rng.random() < self.args.voice_session_rate else "text"
+            topic = self.rng.choice(list(TOPICS))
+            session = {
+                "id": _uuid(self.rng),
+                "user_id": self.user_id,
+                "session_type": session_type,
+                "created_at": created_at,
+            }
+            if session_type == "voice":
+                session["summary"] = " ".join(self.rng.sample(TOPICS[topic], k=2))
+                session["key_topics"] = topic
+            elif entries and self.rng.random() < 0.3:
+                session["entry_id"] = self.rng.choice(entries)["id"]
+            sessions.append(session)
+
+            for i in range(self.args.messages_per_session):
+                role = "user" if i % 2 == 0 else "assistant"
+                content = self.rng.choice(TOPICS[topic] if role == "user" else ASSISTANT_REPLIES)
+                messages.append({
+                    "id": _uuid(self.rng),
+                    "session_id": session["id"],
+                    "role": role,
+                    "content": content,
+                    # Estimated rather than tokenized; history trimming only needs the magnitude.
+                    "token_count": len(content) // 4 + 1,
+                    "created_at": created_at + timedelta(seconds=30 * i),
+                })
+        return sessions, messages
+
+    def _goals(self, sessions: List[dict]) -> tuple:
+        goals, updates = [], []
+        titles = self.rng.sample(GOAL_TITLES, k=min(self.args.goals_per_user, len(GOAL_TITLES)))
+        for title, created_at in zip(titles, self._timestamps(len(titles))):
+            status = self.rng.choices(GOAL_STATUSES, GOAL_STATUS_WEIGHTS)[0]
+            goal = {
+                "id": _uuid(self.rng),
+                "user_id": self.user_id,
+                "title": title,
+                "description": f"Synthetic goal: {title.lower()}.",
+                "status": status,
+                "journaling_schedule": self.rng.choice(["daily", "weekly", None]),
+                "created_at": created_at,
+            }
+            final = 100 if status == "completed" else self.rng.randint(0, 95)
+            # Progress climbs to its final value over the goal's history.
+            steps = sorted(self.rng.randint(0, final) for _ in range(self.args.updates_per_goal - 1)) + [final]
+            previous = 0
+            for progress, updated_at in zip(steps, self._timestamps(len(steps), created_at)):
+                updates.append({
+                    "id": _uuid(self.rng),
+                    "goal_id": goal["id"],
+                    "session_id": self.rng.choice(sessions)["id"] if sessions and self.rng.random() < 0.3 else None,
+                    "previous_progress": previous,
+                    "new_progress": progress,
+                    "notes": f"Moved from {previous}% to {progress}%.",
+                    "created_at": updated_at,
+                })
+                previous = progress
+            goal["progress"] = final
+            goal["updated_at"] = updates[-1]["created_at"]
+            goals.append(goal)
+        return goals, updates
+
+    def _xp_events(self, entries: List[dict], goals: List[dict]) -> List[dict]:
+        events = []
+
+        def award(event_type: str, reference_id: uuid.UUID, created_at: datetime):
+            events.append({
+                "id": _uuid(self.rng),
+                "user_id": self.user_id,
+                "event_type": event_type,
+                "xp_amount": XP_VALUES[event_type],
+                "reference_id": reference_id,
+                "created_at": created_at,
+            })
+
+        for entry in entries:
+            award("entry_created", entry["id"], entry["created_at"])
+            if entry["journal_type"] in ("morning", "evening"):
+                award(f"{entry['journal_type']}_journal", entry["id"], entry["created_at"])
+        for goal in goals:
+            award("goal_created", goal["id"], goal["created_at"])
+            if goal["status"] == "completed":
+                award("goal_completed", goal["id"], goal["updated_at"])
+        return events
+
+
+async def _csv_chunks(rows: Iterable[list]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(v.isoformat() if isinstance(v, datetime) else v for v in row)
+        if i % COPY_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+LOAD_ORDER = [User, Entry, Goal, ChatSession, ChatMessage, GoalProgressUpdate, XPEvent]
+
+
+async def load_user(conn: asyncpg.Connection, dataset: UserDataset, totals: Dict[str, int]) -> None:
+    async with conn.transaction():
+        for model in LOAD_ORDER:
+            table = model.__table__
+            rows = dataset.tables[table.name]
+            if rows:
+                await conn.copy_to_table(
+                    table.name,
+                    source=_csv_chunks(rows),
+                    columns=[c.name for c in table.columns],
+                    format="csv",
+                )
+            totals[table.name] = totals.get(table.name, 0) + len(rows)
+
+
+async def main(args):
+    conn = await asyncpg.connect(args.database_url.replace("postgresql+asyncpg://", "postgresql://"))
+    try:
+        if args.replace:
+            status = await conn.execute(
+                f"DELETE FROM {User.__tablename__} WHERE email LIKE $1", f"synthetic-s{args.seed}-u%"
+            )
+            print(f"replace: {status}")
+
+        topic_rng = random.Random(f"{args.seed}:topics")
+        centroids = {
+            topic: _unit([topic_rng.gauss(0.0, 1.0) for _ in range(settings.embedding_dimension)])
+            for topic in TOPICS
+        }
+        password_hash = get_password_hash("synthetic")
+        totals: Dict[str, int] = {}
+        start = time.perf_counter()
+
+        for index in range(args.users):
+            generated = time.perf_counter()
+            dataset = UserDataset(args, index, centroids, password_hash)
+            loaded = time.perf_counter()
+            await load_user(conn, dataset, totals)
+            print(f"user {index}: {dataset.user_id} generated in {loaded - generated:.1f}s, "
+                  f"copied in {time.perf_counter() - loaded:.1f}s")
+
+        for model in LOAD_ORDER:
+            await conn.execute(f"ANALYZE {model.__tablename__}")
+        elapsed = time.perf_counter() - start
+    finally:
+        await conn.close()
+
+    print(f"{'table':<24}{'rows':>12}")
+    for name, count in totals.items():
+        print(f"{name:<24}{count:>12}")
+    total_rows = sum(totals.values())
+    print(f"{total_rows} rows in {elapsed:.1f}s ({total_rows / elapsed:.0f} rows/s)")
+
+
+def _date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--entries-per-user", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=3 * 365, help="history length before --until")
+    parser.add_argument("--until", type=_date, default=today, help="YYYY-MM-DD end of the history (UTC)")
+    parser.add_argument("--missing-embedding-rate", type=float, default=0.01,
+                        help="share of entries left without an embedding, as if the job hadn't run")
+    parser.add_argument("--goals-per-user", type=int, default=5)
+    parser.add_argument("--updates-per-goal", type=int, default=20)
+    parser.add_argument("--sessions-per-user", type=int, default=300)
+    parser.add_argument("--messages-per-session", type=int, default=12)
+    parser.add_argument("--voice-session-rate", type=float, default=0.4)
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--replace", action="store_true", help="delete this seed's users before loading")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+"""Benchmark context truncation on long voice transcripts.
+
+Compares the previous pattern used by the context builder (count the text,
+then truncate_to_tokens re-encoding it, then count the result again) with
+TokenManager.fit_to_tokens, which encodes once and only encodes a prefix
+when the text is far over budget. The token cache is cleared before every
+call so both sides pay for tokenization.
+
+    python -m benchmarks.token_truncation --budget 4000 --repeat 20
+"""
+import argparse
+import random
+import time
+
+from app.services.token_manager import token_manager
+
+SENTENCES = [
+    "I woke up early and went for a run before work.",
+    "The meeting with the design team ran long again, but we finally agreed on the layout.",
+    "Honestly I've been feeling a bit anxious about the move next month.",
+    "Dinner with Sam was great, we talked about the trip to Lisbon for ages.",
+    "I want to get better at saying no to extra projects.",
+    "Progress on the reading goal: two more chapters tonight.",
+]
+
+
+def make_transcript(approx_tokens: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    tokens = 0
+    while tokens < approx_tokens:
+        speaker = "You" if len(lines) % 2 == 0 else "JournalBuddy"
+        line = f"{speaker}: " + " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4)))
+        lines.append(line)
+        tokens += len(line) // 4
+    return "\n".join(lines)
+
+
+def legacy_truncate(text: str, budget: int, suffix: str) -> int:
+    encoding = token_manager.encoding
+    if len(encoding.encode(text)) > budget:
+        tokens = encoding.encode(text)
+        available = budget - len(encoding.encode(suffix))
+        text = encoding.decode(tokens[:available]) + suffix
+    return len(encoding.encode(text))
+
+
+def fit_truncate(text: str, budget: int, suffix: str) -> int:
+    return token_manager.fit_to_tokens(text, budget, suffix=suffix).tokens
+
+
+def timed(fn, text: str, budget: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        token_manager._token_cache.clear()
+        start = time.perf_counter()
+        fn(text, budget, "\n[Content truncated...]")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(args):
+    print(f"budget={args.budget} tokens, best of {args.repeat}")
+    print(f"{'transcript':>12}{'legacy ms':>12}{'fit ms':>10}{'speedup':>10}")
+    for size in args.sizes:
+        text = make_transcript(size)
+        legacy = timed(legacy_truncate, text, args.budget, args.repeat)
+        fit = timed(fit_truncate, text, args.budget, args.repeat)
+        print(f"{size:>12,}{legacy:>12.2f}{fit:>10.2f}{legacy / fit:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sizes", type=lambda v: [int(x) for x in v.split(",")], default=[2_000, 20_000, 200_000])
+    main(parser.parse_args())
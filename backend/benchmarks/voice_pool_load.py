@@ -0,0 +1,118 @@
+"""Connection-pool load test for voice conversations.
+
+Simulates concurrent voice users against an engine capped at ``--pool-size``
+connections (no overflow) and reports, per user count, how many turns failed
+with a pool timeout and the p50/p95 turn latency overhead. Two strategies:
+
+  socket  one AsyncSession for the whole websocket, as /voice/chat used to do
+          with Depends(get_db): the connection checked out by the turn's
+          context reads stays pinned through the LLM/TTS phase until the
+          assistant message is committed
+  turn    a short-lived session per operation, as VoiceChatSession does now:
+          the connection is only held while a query runs
+
+A turn is: context reads -> LLM + TTS (no DB) -> message write, followed by
+the user's think time. Queries are simulated with pg_sleep, so only
+DATABASE_URL is needed, not the app schema.
+
+    python -m benchmarks.voice_pool_load --pool-size 10 --users 10,25,50,100,200
+
+A pool of N supports roughly N / (db_time / turn_time) users in "turn" mode
+versus about N * (think_time + turn_time) / turn_time in "socket" mode; the
+table shows where each strategy starts timing out.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+
+
+async def _query(db: AsyncSession, seconds: float) -> None:
+    await db.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+
+
+async def _socket_user(maker, args, stats):
+    async with maker() as db:
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            try:
+                await _query(db, args.read_time)
+                await asyncio.sleep(args.llm_time)
+                await _query(db, args.write_time)
+                await db.commit()
+                stats["latency"].append(time.perf_counter() - start - args.llm_time)
+            except PoolTimeoutError:
+                stats["timeouts"] += 1
+                await db.rollback()
+            await asyncio.sleep(args.think_time)
+
+
+async def _turn_user(maker, args, stats):
+    for _ in range(args.turns):
+        start = time.perf_counter()
+        try:
+            async with maker() as db:
+                await _query(db, args.read_time)
+            await asyncio.sleep(args.llm_time)
+            async with maker() as db:
+                await _query(db, args.write_time)
+                await db.commit()
+            stats["latency"].append(time.perf_counter() - start - args.llm_time)
+        except PoolTimeoutError:
+            stats["timeouts"] += 1
+        await asyncio.sleep(args.think_time)
+
+
+async def run_scenario(mode: str, users: int, args) -> dict:
+    engine = create_async_engine(
+        settings.database_url,
+        pool_size=args.pool_size,
+        max_overflow=0,
+        pool_timeout=args.pool_timeout,
+    )
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    stats = {"latency": [], "timeouts": 0}
+    user_fn = _socket_user if mode == "socket" else _turn_user
+
+    await asyncio.gather(*(user_fn(maker, args, stats) for _ in range(users)))
+    await engine.dispose()
+
+    latency = sorted(stats["latency"]) or [0.0]
+    return {
+        "mode": mode,
+        "users": users,
+        "turns": len(stats["latency"]),
+        "timeouts": stats["timeouts"],
+        "p50_ms": statistics.median(latency) * 1000,
+        "p95_ms": latency[int(len(latency) * 0.95) - 1 if len(latency) > 1 else 0] * 1000,
+    }
+
+
+async def main(args):
+    print(f"pool_size={args.pool_size} pool_timeout={args.pool_timeout}s "
+          f"read={args.read_time}s llm={args.llm_time}s write={args.write_time}s think={args.think_time}s")
+    print(f"{'mode':<8}{'users':>7}{'turns':>8}{'timeouts':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for users in args.users:
+        for mode in ("socket", "turn"):
+            r = await run_scenario(mode, users, args)
+            print(f"{r['mode']:<8}{r['users']:>7}{r['turns']:>8}{r['timeouts']:>10}"
+                  f"{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--users", type=lambda v: [int(x) for x in v.split(",")], default=[10, 25, 50, 100, 200])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--read-time", type=float, default=0.02, help="seconds of DB time for context reads")
+    parser.add_argument("--write-time", type=float, default=0.005, help="seconds of DB time for message writes")
+    parser.add_argument("--llm-time", type=float, default=1.5, help="seconds of LLM + TTS per turn")
+    parser.add_argument("--think-time", type=float, default=4.0, help="seconds the user talks between turns")
+    asyncio.run(main(parser.parse_args()))
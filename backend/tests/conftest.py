@@ -0,0 +1,10 @@
+import pytest_asyncio
+
+from app.services.rate_limiter import rate_limiter
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_rate_limiter():
+    """Stop the shared buckets' dispatchers before each test's event loop closes."""
+    yield
+    await rate_limiter.close()
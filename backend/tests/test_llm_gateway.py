@@ -0,0 +1,238 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import llm_gateway as gateway_module
+from app.services.llm_gateway import CallPolicy, CircuitBreaker, LLMGateway, LLMUnavailableError
+from app.services.model_routing import RequestClass
+
+# No rate limit is configured for this provider, so only the gateway's own logic applies.
+PROVIDER = "test"
+
+
+class APIConnectionError(Exception):
+    """Named like the groq SDK error the gateway treats as retryable."""
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeStream:
+    def __init__(self, chunks, first_delay: float = 0.0):
+        self.chunks = list(chunks)
+        self.first_delay = first_delay
+        self.started = False
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.started:
+            self.started = True
+            await asyncio.sleep(self.first_delay)
+        if not self.chunks:
+            raise StopAsyncIteration
+        return self.chunks.pop(0)
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(gateway_module, "BACKOFF_BASE_SECONDS", 0.001)
+    monkeypatch.setattr(settings, "llm_max_concurrency", 1)
+    monkeypatch.setattr(settings, "llm_breaker_failure_threshold", 3)
+    monkeypatch.setattr(settings, "llm_breaker_reset_seconds", 0.05)
+    return LLMGateway()
+
+
+def _policy(monkeypatch, request_class: RequestClass, **overrides) -> None:
+    values = dict(deadline=2.0, first_token_timeout=0.2, chunk_timeout=0.2, retries=2, hedge=False)
+    values.update(overrides)
+    monkeypatch.setitem(gateway_module.CALL_POLICIES, request_class, CallPolicy(**values))
+
+
+def _slot_free(gateway: LLMGateway) -> bool:
+    return gateway._slot(PROVIDER)._value == settings.llm_max_concurrency
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [APIConnectionError("reset"), StatusError(503), StatusError(429)])
+async def test_retryable_errors_are_retried(gateway, monkeypatch, error):
+    _policy(monkeypatch, RequestClass.SUMMARY)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise error
+        return "ok"
+
+    assert await gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER) == "ok"
+    assert calls == 3
+    assert _slot_free(gateway)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [ValueError("bad prompt"), StatusError(400)])
+async def test_non_retryable_errors_propagate_at_once(gateway, monkeypatch, error):
+    _policy(monkeypatch, RequestClass.SUMMARY)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise error
+
+    with pytest.raises(type(error)):
+        await gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER)
+    assert calls == 1
+    assert gateway.breaker(PROVIDER).failures == 0
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_raise_unavailable(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.SUMMARY, retries=1)
+
+    async def call():
+        raise APIConnectionError("reset")
+
+    with pytest.raises(LLMUnavailableError):
+        await gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER)
+    assert gateway.breaker(PROVIDER).failures == 2
+
+
+def test_breaker_opens_and_lets_one_probe_through(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(gateway_module.time, "monotonic", lambda: clock[0])
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock[0] += 31
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one probe until it reports back.
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock[0] += 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_without_calling(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.SUMMARY, retries=0)
+    for _ in range(settings.llm_breaker_failure_threshold):
+        gateway.breaker(PROVIDER).record_failure()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    with pytest.raises(LLMUnavailableError):
+        await gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER)
+    assert calls == 0
+
+    # After reset_seconds the half-open probe goes through and closes the circuit.
+    await asyncio.sleep(settings.llm_breaker_reset_seconds + 0.01)
+    assert await gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER) == "ok"
+    assert gateway.breaker(PROVIDER).state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_hedge_winner_closes_the_losing_stream(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.VOICE_TURN, first_token_timeout=1.0, retries=0, hedge=True)
+    monkeypatch.setattr(gateway_module, "HEDGE_MIN_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "llm_max_concurrency", 2)
+    stats = gateway.latency[RequestClass.VOICE_TURN.value]
+    for _ in range(gateway_module.HEDGE_MIN_SAMPLES):
+        stats.record(0.01)
+
+    slow = FakeStream(["slow"], first_delay=0.5)
+    fast = FakeStream(["fast", " reply"])
+    streams = iter([slow, fast])
+
+    chunks = [c async for c in gateway.stream(RequestClass.VOICE_TURN, lambda: next(streams), provider=PROVIDER)]
+
+    assert chunks == ["fast", " reply"]
+    assert gateway.hedged_requests == 1
+    assert slow.closed
+    assert fast.closed
+    assert _slot_free(gateway)
+
+
+@pytest.mark.asyncio
+async def test_slot_released_when_call_times_out(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.SUMMARY, first_token_timeout=0.05, retries=0)
+
+    async def call():
+        await asyncio.sleep(1)
+
+    with pytest.raises(LLMUnavailableError):
+        await gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER)
+    assert _slot_free(gateway)
+
+
+@pytest.mark.asyncio
+async def test_slot_released_when_stream_first_chunk_times_out(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.TEXT_CHAT, first_token_timeout=0.05, retries=0)
+    stream = FakeStream(["late"], first_delay=1)
+
+    with pytest.raises(LLMUnavailableError):
+        async for _ in gateway.stream(RequestClass.TEXT_CHAT, lambda: stream, provider=PROVIDER):
+            pass
+    assert stream.closed
+    assert _slot_free(gateway)
+
+
+@pytest.mark.asyncio
+async def test_slot_released_when_caller_is_cancelled(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.SUMMARY, first_token_timeout=5.0)
+    started = asyncio.Event()
+
+    async def call():
+        started.set()
+        await asyncio.sleep(5)
+
+    task = asyncio.create_task(gateway.complete(RequestClass.SUMMARY, call, provider=PROVIDER))
+    await started.wait()
+    assert not _slot_free(gateway)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert _slot_free(gateway)
+
+
+@pytest.mark.asyncio
+async def test_slot_released_when_stream_consumer_stops_early(gateway, monkeypatch):
+    _policy(monkeypatch, RequestClass.TEXT_CHAT)
+    stream = FakeStream(["a", "b", "c"])
+
+    chunks = gateway.stream(RequestClass.TEXT_CHAT, lambda: stream, provider=PROVIDER)
+    assert await chunks.__anext__() == "a"
+    assert not _slot_free(gateway)
+    await chunks.aclose()
+
+    assert stream.closed
+    assert _slot_free(gateway)
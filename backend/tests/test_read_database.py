@@ -0,0 +1,67 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.api.deps import ReadDatabase, ReadUser
+from app.core.database import engine
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+class FakeReplicaSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def primary_checkouts(monkeypatch):
+    """Record every connection checkout from the primary pool instead of connecting."""
+    checkouts = []
+
+    def do_get():
+        checkouts.append(1)
+        raise ConnectionRefusedError("primary checked out")
+
+    monkeypatch.setattr(engine.sync_engine.pool, "_do_get", do_get)
+    return checkouts
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def get_by_id(db, user_id):
+        if not isinstance(db, FakeReplicaSession):
+            await db.connection()
+        return User(id=user_id, email="reader@example.com", name="Reader")
+
+    monkeypatch.setattr(deps, "read_session_maker", lambda user_id: FakeReplicaSession)
+    monkeypatch.setattr(deps.user_crud, "get_by_id", get_by_id)
+
+    app = FastAPI()
+
+    @app.get("/read")
+    async def read(current_user: ReadUser, db: ReadDatabase):
+        return {"user_id": str(current_user.id), "replica": isinstance(db, FakeReplicaSession)}
+
+    return TestClient(app)
+
+
+def test_read_database_request_checks_out_no_primary_connection(client, primary_checkouts):
+    user_id = uuid4()
+    response = client.get("/read", headers={"Authorization": f"Bearer {create_access_token(str(user_id))}"})
+
+    assert response.status_code == 200
+    assert response.json() == {"user_id": str(user_id), "replica": True}
+    assert primary_checkouts == []
+
+
+def test_read_database_rejects_a_bad_token(client, primary_checkouts):
+    response = client.get("/read", headers={"Authorization": "Bearer not-a-token"})
+
+    assert response.status_code == 401
+    assert primary_checkouts == []